@@ -10,9 +10,54 @@ import subprocess
 import threading
 import time
 import re
+import argparse
+import hashlib
+import json
+import shutil
+import struct
+import uuid
+import zlib
+import signal
+import codecs
+import stat
+import socket
+import select
+import tempfile
+import bisect
+import fnmatch
+import queue
+import heapq
+import mmap
+import ast
+import multiprocessing
+import sqlite3
+import itertools
+import builtins
+import symtable
+import importlib
+import importlib.util
+import importlib.machinery
+import pkgutil
+from array import array
+from collections import namedtuple, deque
+from concurrent.futures import (
+    ThreadPoolExecutor, ProcessPoolExecutor, CancelledError, FIRST_COMPLETED, wait
+)
 from pathlib import Path
 from typing import Optional, List
 
+try:
+    import re._parser as sre_parse
+except ImportError:
+    import sre_parse
+
+try:
+    import pty
+    import fcntl
+    import termios
+except ImportError:
+    pty = fcntl = termios = None
+
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
     QTextEdit, QTreeView, QSplitter, QTabWidget, QToolBar,
@@ -20,17 +65,20 @@ from PyQt6.QtWidgets import (
     QFileDialog, QInputDialog, QMessageBox, QMenu, QMenuBar,
     QPlainTextEdit, QCompleter, QCheckBox, QDialogButtonBox,
     QFrame, QScrollArea, QListWidget, QListWidgetItem, QGroupBox,
-    QSpinBox, QComboBox, QSplashScreen
+    QSpinBox, QComboBox, QSplashScreen, QAbstractScrollArea, QToolTip,
+    QTreeWidget, QTreeWidgetItem, QDockWidget, QFileIconProvider
 )
 from PyQt6.QtGui import (
     QAction, QFont, QColor, QPalette, QSyntaxHighlighter,
     QTextCharFormat, QTextCursor, QKeySequence, QPainter,
-    QPixmap, QShortcut, QTextFormat, QFileSystemModel
+    QPixmap, QShortcut, QTextFormat, QTextDocument,
+    QPen, QFontMetrics
 )
 from PyQt6.QtCore import (
     Qt, QTimer, QThread, pyqtSignal, QSettings, QSize, QPoint,
     QPropertyAnimation, QEasingCurve, QRegularExpression,
-    QDateTime, QModelIndex
+    QDateTime, QModelIndex, QObject, QAbstractItemModel, QEvent, QFileSystemWatcher, QStringListModel,
+    QSocketNotifier
 )
 
 
@@ -46,6 +94,7 @@ class ThemeManager:
         'secondary': '#cba6f7',
         'success': '#a6e3a1',
         'error': '#f38ba8',
+        'warning': '#f9e2af',
         'border': '#45475a',
         'line_bg': '#313244',
         'syntax': {
@@ -58,8 +107,41 @@ class ThemeManager:
         }
     }
     
+    LIGHT_THEME = {
+        'bg': '#eff1f5',
+        'bg_light': '#e6e9ef',
+        'fg': '#4c4f69',
+        'primary': '#1e66f5',
+        'secondary': '#8839ef',
+        'success': '#40a02b',
+        'error': '#d20f39',
+        'warning': '#df8e1d',
+        'border': '#9ca0b0',
+        'line_bg': '#dce0e8',
+        'syntax': {
+            'keyword': '#8839ef',
+            'string': '#40a02b',
+            'comment': '#8c8fa1',
+            'function': '#1e66f5',
+            'number': '#fe640b',
+            'operator': '#04a5e5'
+        }
+    }
+
+    THEMES = {'dark': DARK_THEME, 'light': LIGHT_THEME}
+    current = 'dark'
+    
     def __init__(self):
-        self.theme = self.DARK_THEME
+        self.name = ThemeManager.current
+        self.theme = self.THEMES[self.name]
+
+    @classmethod
+    def set_theme(cls, name):
+        if name == cls.current:
+            return False
+        cls.current = name
+        HighlightRuleCache.invalidate()
+        return True
         
     def apply_theme(self, app):
         palette = QPalette()
@@ -312,8 +394,268 @@ class ThemeManager:
 
 
 
-class PythonHighlighter(QSyntaxHighlighter):
+PYTHON_KEYWORDS = frozenset([
+    'and', 'or', 'not', 'if', 'elif', 'else', 'for', 'while',
+    'break', 'continue', 'pass', 'return', 'def', 'class',
+    'import', 'from', 'as', 'with', 'try', 'except', 'finally',
+    'raise', 'assert', 'lambda', 'yield', 'None', 'True', 'False',
+    'async', 'await', 'nonlocal', 'global', 'del', 'in', 'is'
+])
+
+
+class PythonTokenizer:
+    """Single-pass scanner producing non-overlapping (start, length, kind) spans.
+
+    Block state packs the open triple-quoted string kind into the low bits and
+    the bracket depth above them, so QSyntaxHighlighter only re-highlights the
+    following block when one of them actually changes.
+    """
+
+    STATE_NONE = 0
+    STATE_SQ3 = 1
+    STATE_DQ3 = 2
+    STATE_F_SQ3 = 3
+    STATE_F_DQ3 = 4
+    MODE_BITS = 3
+    MODE_MASK = (1 << MODE_BITS) - 1
+    MAX_DEPTH = 0xFFFF
+
+    SQ3 = "'" * 3
+    DQ3 = '"' * 3
+    MODE_QUOTES = {
+        STATE_SQ3: SQ3, STATE_DQ3: DQ3,
+        STATE_F_SQ3: SQ3, STATE_F_DQ3: DQ3,
+    }
+
+    _PREFIX = r"(?:(?<!\w)[rRbBuUfF]{1,2})?"
+    _SQ3_BODY = r"(?:[^'\\]|\\.|'(?!''))*"
+    _DQ3_BODY = r'(?:[^"\\]|\\.|"(?!""))*'
+
+    TOKEN_RE = re.compile(
+        r"(?P<comment>\#.*)"
+        r"|(?P<tstring>" + _PREFIX + "(?:" + SQ3 + _SQ3_BODY + SQ3 + "|" + DQ3 + _DQ3_BODY + DQ3 + "))"
+        r"|(?P<topen>" + _PREFIX + "(?:" + SQ3 + "|" + DQ3 + "))"
+        r"|(?P<string>" + _PREFIX + r"""(?:"(?:[^"\\]|\\.)*(?:"|$)|'(?:[^'\\]|\\.)*(?:'|$)))"""
+        r"|(?P<decorator>@[^\W\d]\w*)"
+        r"|(?P<number>\b(?:0[xX][0-9a-fA-F_]+|0[bB][01_]+|0[oO][0-7_]+"
+        r"|\d[\d_]*(?:\.[\d_]*)?(?:[eE][+-]?\d+)?[jJ]?)\b)"
+        r"|(?P<ident>[^\W\d]\w*)"
+        r"|(?P<bracket>[()\[\]{}])"
+        r"|(?P<operator>\*\*=?|//=?|<<=?|>>=?|[-+*/%=!<>&|^~]=?)"
+    )
+
+    TRIPLE_END = {
+        SQ3: re.compile(_SQ3_BODY + SQ3),
+        DQ3: re.compile(_DQ3_BODY + DQ3),
+    }
+
+    # A new top-level definition is a safe resynchronisation point: resetting
+    # the depth there keeps an unclosed bracket from re-highlighting the rest
+    # of the file on every keystroke.
+    TOP_LEVEL_RE = re.compile(r"(?:async\s+def|def|class)\b|@")
+
+    STRING_PREFIX_CHARS = frozenset('rRbBuUfF')
+    OPEN_BRACKETS = frozenset('([{')
+
+    def tokenize(self, text, state=0):
+        spans = []
+        if state > 0:
+            mode = state & self.MODE_MASK
+            depth = state >> self.MODE_BITS
+        else:
+            mode = depth = 0
+        pos = 0
+
+        if mode:
+            is_f = mode >= self.STATE_F_SQ3
+            match = self.TRIPLE_END[self.MODE_QUOTES[mode]].match(text)
+            if match is None:
+                self._emit_string(text, 0, len(text), is_f, spans)
+                return spans, state
+            pos = match.end()
+            self._emit_string(text, 0, pos, is_f, spans)
+            mode = self.STATE_NONE
+        elif depth and self.TOP_LEVEL_RE.match(text):
+            depth = 0
+
+        append = spans.append
+        keywords = PYTHON_KEYWORDS
+        length = len(text)
+        for match in self.TOKEN_RE.finditer(text, pos):
+            kind = match.lastgroup
+            start, end = match.span()
+            if kind == 'ident':
+                word = match.group()
+                if word in keywords:
+                    kind = 'keyword'
+                elif end < length and text[end] == '(':
+                    kind = 'function'
+                else:
+                    continue
+            elif kind == 'bracket':
+                if text[start] in self.OPEN_BRACKETS:
+                    depth += 1
+                elif depth:
+                    depth -= 1
+                continue
+            elif kind == 'string' or kind == 'tstring':
+                self._emit_string(text, start, end, self._is_fstring(text, start), spans)
+                continue
+            elif kind == 'topen':
+                is_f = self._is_fstring(text, start)
+                if text[end - 3:end] == self.SQ3:
+                    mode = self.STATE_F_SQ3 if is_f else self.STATE_SQ3
+                else:
+                    mode = self.STATE_F_DQ3 if is_f else self.STATE_DQ3
+                self._emit_string(text, start, length, is_f, spans)
+                break
+            append((start, end - start, kind))
+
+        return spans, mode | (min(depth, self.MAX_DEPTH) << self.MODE_BITS)
+
+    def _is_fstring(self, text, start):
+        i = start
+        while text[i] in self.STRING_PREFIX_CHARS:
+            i += 1
+        return 'f' in text[start:i].lower()
+
+    def _emit_string(self, text, start, end, is_f, spans):
+        if not is_f:
+            spans.append((start, end - start, 'string'))
+            return
+        literal = i = start
+        while i < end:
+            if text[i] != '{':
+                i += 1
+                continue
+            if i + 1 < end and text[i + 1] == '{':
+                i += 2
+                continue
+            close = self._field_end(text, i + 1, end)
+            if close < 0:
+                break
+            if i > literal:
+                spans.append((literal, i - literal, 'string'))
+            spans.append((i, 1, 'operator'))
+            inner, _ = self.tokenize(text[i + 1:close])
+            spans.extend((s + i + 1, n, k) for s, n, k in inner)
+            spans.append((close, 1, 'operator'))
+            literal = i = close + 1
+        if end > literal:
+            spans.append((literal, end - literal, 'string'))
+
+    @staticmethod
+    def _field_end(text, pos, end):
+        nesting = 0
+        for i in range(pos, end):
+            char = text[i]
+            if char in '([{':
+                nesting += 1
+            elif char in ')]}':
+                if nesting == 0:
+                    return i if char == '}' else -1
+                nesting -= 1
+        return -1
+
+
+class HighlightRules:
+
+    def __init__(self, tokenizer, formats):
+        self.tokenizer = tokenizer
+        self.formats = formats
   
+
+class HighlightRuleCache:
+    """Process-wide compiled rule sets and formats, keyed by (language, theme)."""
+
+    _entries = {}
+    generation = 0
+
+    @classmethod
+    def get(cls, language='python', theme_name=None):
+        key = (language, theme_name or ThemeManager.current)
+        rules = cls._entries.get(key)
+        if rules is None:
+            rules = cls._build(language, ThemeManager.THEMES[key[1]]['syntax'])
+            cls._entries[key] = rules
+        return rules
+
+    @classmethod
+    def invalidate(cls):
+        cls._entries.clear()
+        cls.generation += 1
+
+    @staticmethod
+    def _build(language, syntax):
+        if language != 'python':
+            raise ValueError(f"unsupported language: {language}")
+
+        keyword_fmt = QTextCharFormat()
+        keyword_fmt.setForeground(QColor(syntax['keyword']))
+        keyword_fmt.setFontWeight(QFont.Weight.Bold)
+
+        string_fmt = QTextCharFormat()
+        string_fmt.setForeground(QColor(syntax['string']))
+
+        comment_fmt = QTextCharFormat()
+        comment_fmt.setForeground(QColor(syntax['comment']))
+        comment_fmt.setFontItalic(True)
+
+        number_fmt = QTextCharFormat()
+        number_fmt.setForeground(QColor(syntax['number']))
+
+        func_fmt = QTextCharFormat()
+        func_fmt.setForeground(QColor(syntax['function']))
+
+        op_fmt = QTextCharFormat()
+        op_fmt.setForeground(QColor(syntax['operator']))
+
+        formats = {
+            'keyword': keyword_fmt,
+            'string': string_fmt,
+            'comment': comment_fmt,
+            'number': number_fmt,
+            'function': func_fmt,
+            'decorator': func_fmt,
+            'operator': op_fmt,
+        }
+        return HighlightRules(PythonTokenizer(), formats)
+
+
+class PythonHighlighter(QSyntaxHighlighter):
+
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.deferred = False
+        self.sweeping = False
+        self.pending_from = None
+        self.refresh_rules()
+
+    def refresh_rules(self):
+        rules = HighlightRuleCache.get('python')
+        self.tokenizer = rules.tokenizer
+        self.formats = rules.formats
+
+    def highlightBlock(self, text):
+        if self.deferred:
+            return
+        # Blocks the progressive sweep has not reached yet keep an unknown
+        # state, so an edit there cannot cascade to the end of the document.
+        pending = (self.pending_from is not None
+                   and self.currentBlock().blockNumber() >= self.pending_from)
+        if pending and self.sweeping:
+            self.setCurrentBlockState(-1)
+            return
+        formats = self.formats
+        spans, state = self.tokenizer.tokenize(text, self.previousBlockState())
+        for start, length, kind in spans:
+            self.setFormat(start, length, formats[kind])
+        self.setCurrentBlockState(-1 if pending else state)
+
+
+class RuleListHighlighter(QSyntaxHighlighter):
+    """The original one-regex-per-rule highlighter, kept as a benchmark baseline."""
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -322,23 +664,13 @@ class PythonHighlighter(QSyntaxHighlighter):
         self.setup_rules()
         
     def setup_rules(self):
-
-        keywords = [
-            'and', 'or', 'not', 'if', 'elif', 'else', 'for', 'while',
-            'break', 'continue', 'pass', 'return', 'def', 'class',
-            'import', 'from', 'as', 'with', 'try', 'except', 'finally',
-            'raise', 'assert', 'lambda', 'yield', 'None', 'True', 'False',
-            'async', 'await', 'nonlocal', 'global', 'del', 'in', 'is'
-        ]
-        
         keyword_fmt = QTextCharFormat()
         keyword_fmt.setForeground(QColor(self.theme['keyword']))
         keyword_fmt.setFontWeight(QFont.Weight.Bold)
         
-        for word in keywords:
+        for word in sorted(PYTHON_KEYWORDS):
             pattern = rf'\b{word}\b'
             self.rules.append((re.compile(pattern), keyword_fmt))
-        
       
         string_fmt = QTextCharFormat()
         string_fmt.setForeground(QColor(self.theme['string']))
@@ -349,12 +681,10 @@ class PythonHighlighter(QSyntaxHighlighter):
             (re.compile(r"'''.*?'''", re.DOTALL), string_fmt)
         ])
         
-     
         comment_fmt = QTextCharFormat()
         comment_fmt.setForeground(QColor(self.theme['comment']))
         comment_fmt.setFontItalic(True)
         self.rules.append((re.compile(r'#[^\n]*'), comment_fmt))
-        
      
         number_fmt = QTextCharFormat()
         number_fmt.setForeground(QColor(self.theme['number']))
@@ -365,16 +695,13 @@ class PythonHighlighter(QSyntaxHighlighter):
             (re.compile(r'\b0[oO][0-7]+\b'), number_fmt)
         ])
         
-      
         func_fmt = QTextCharFormat()
         func_fmt.setForeground(QColor(self.theme['function']))
         self.rules.append((re.compile(r'\b[A-Za-z_][A-Za-z0-9_]*(?=\()'), func_fmt))
         
-     
         decorator_fmt = QTextCharFormat()
         decorator_fmt.setForeground(QColor(self.theme['function']))
         self.rules.append((re.compile(r'@[A-Za-z_][A-Za-z0-9_]*'), decorator_fmt))
-        
      
         op_fmt = QTextCharFormat()
         op_fmt.setForeground(QColor(self.theme['operator']))
@@ -391,19 +718,264 @@ class PythonHighlighter(QSyntaxHighlighter):
 
 
 
+class HighlightScheduler(QObject):
+    """Highlights the viewport first, then sweeps the rest of the document in time slices."""
+
+    finished = pyqtSignal()
+
+    def __init__(self, editor, highlighter, slice_ms=8):
+        super().__init__(editor)
+        self.editor = editor
+        self.highlighter = highlighter
+        self.slice_ms = slice_ms
+        self._next_block = None
+        self._visible_pending = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._run_slice)
+
+        editor.verticalScrollBar().valueChanged.connect(self.prioritize_visible)
+        editor.document().contentsChange.connect(self._on_contents_change)
+
+    def is_active(self):
+        return self._next_block is not None
+
+    def start(self):
+        self._next_block = 0
+        self.highlighter.pending_from = 0
+        self._visible_pending = True
+        self._timer.start()
+
+    def cancel(self):
+        self._timer.stop()
+        self._next_block = None
+        self.highlighter.pending_from = None
+
+    def set_slice_ms(self, slice_ms):
+        self.slice_ms = max(1, slice_ms)
+
+    def prioritize_visible(self, *_):
+        if self.is_active():
+            self._visible_pending = True
+            self._timer.start()
+
+    def _on_contents_change(self, position, removed, added):
+        if not self.is_active():
+            return
+        number = self.editor.document().findBlock(position).blockNumber()
+        if 0 <= number < self._next_block:
+            self._next_block = number
+            self.highlighter.pending_from = number
+
+    def _highlight_visible(self):
+        block = self.editor.firstVisibleBlock()
+        top = self.editor.blockBoundingGeometry(block).translated(
+            self.editor.contentOffset()).top()
+        bottom = self.editor.viewport().height()
+        while block.isValid() and top <= bottom:
+            if block.blockNumber() >= self._next_block:
+                self.highlighter.rehighlightBlock(block)
+            top += self.editor.blockBoundingRect(block).height()
+            block = block.next()
+
+    def _run_slice(self):
+        if not self.is_active():
+            return
+        deadline = time.perf_counter() + self.slice_ms / 1000.0
+        if self._visible_pending:
+            self._visible_pending = False
+            self._highlight_visible()
+
+        block = self.editor.document().findBlockByNumber(self._next_block)
+        highlighter = self.highlighter
+        highlighter.sweeping = True
+        try:
+            while block.isValid():
+                highlighter.pending_from = block.blockNumber() + 1
+                highlighter.rehighlightBlock(block)
+                block = block.next()
+                if time.perf_counter() >= deadline:
+                    break
+        finally:
+            highlighter.sweeping = False
+
+        if block.isValid():
+            self._next_block = block.blockNumber()
+            self._timer.start()
+        else:
+            self._next_block = None
+            highlighter.pending_from = None
+            self.finished.emit()
+
+
+
+def app_data_dir(*parts):
+    base = os.environ.get("ZENITHFLOW_HOME") or os.path.join(os.path.expanduser("~"), ".zenithflow")
+    path = os.path.join(base, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def atomic_write_bytes(path, data):
+    path = os.path.abspath(path)
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class DiskState:
+
+    def __init__(self, mtime_ns=None, size=None, digest=None):
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self.digest = digest
+
+    @classmethod
+    def of(cls, path, digest=None):
+        st = os.stat(path)
+        return cls(st.st_mtime_ns, st.st_size, digest)
+
+    def matches(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        return (st.st_mtime_ns, st.st_size) == (self.mtime_ns, self.size)
+
+
+class SaveResult:
+
+    def __init__(self, path, revision):
+        self.path = path
+        self.revision = revision
+        self.ok = False
+        self.skipped = False
+        self.handled = False
+        self.automatic = False
+        self.error = ""
+        self.disk_state = None
+
+
+class FileSaveWorker(QThread):
+    """Encodes, hashes and atomically writes a document snapshot off the GUI thread."""
+
+    completed = pyqtSignal(object)
+
+    _active = set()
+
+    def __init__(self, path, text, revision, disk_state=None):
+        super().__init__()
+        self.path = path
+        self.text = text
+        self.disk_state = disk_state
+        self.result = SaveResult(path, revision)
+        self.finished.connect(self._release)
+
+    @classmethod
+    def launch(cls, worker):
+        cls._active.add(worker)
+        worker.start()
+
+    @classmethod
+    def wait_all(cls, timeout_ms=10000):
+        for worker in list(cls._active):
+            worker.wait(timeout_ms)
+
+    def _release(self):
+        FileSaveWorker._active.discard(self)
+
+    def run(self):
+        result = self.result
+        try:
+            text = self.text
+            if os.linesep != '\n':
+                text = text.replace('\n', os.linesep)
+            data = text.encode('utf-8')
+            digest = hashlib.sha256(data).hexdigest()
+
+            on_disk = None
+            if os.path.exists(self.path):
+                cached = self.disk_state
+                if cached is not None and cached.digest and cached.matches(self.path):
+                    on_disk = cached.digest
+                else:
+                    on_disk = file_sha256(self.path)
+
+            if on_disk == digest:
+                result.skipped = True
+            else:
+                atomic_write_bytes(self.path, data)
+            result.disk_state = DiskState.of(self.path, digest)
+            result.ok = True
+        except (OSError, UnicodeError, ValueError) as e:
+            result.error = str(e)
+        finally:
+            # Always report back, or the tab would stay "saving" forever.
+            self.completed.emit(result)
+
+
+
 class PythonEditor(QPlainTextEdit):
    
     
     cursorChanged = pyqtSignal(int, int)
+    saveFinished = pyqtSignal(str, bool, str, bool)
+
+    PROGRESSIVE_HIGHLIGHT_LINES = 5000
+    COMPLETION_SNAPSHOT_INTERVAL = 1.0
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.file_path = None
+        self.disk_state = None
+        # Recovered buffers are never auto-saved over the file; the user saves them explicitly.
+        self.recovered = False
+        self.save_workers = set()
+        self.extra_selection_layers = {}
+        self.completion_engine = None
+        self.completion_generation = -1
+        self.diagnostics = []
+        self.diagnostics_revision = -1
         self.setup_editor()
         self.setup_highlighter()
+        self.setup_completer()
         
     def setup_editor(self):
       
+        self.gutter = GutterRenderer(self)
+        self.line_number_area = LineNumberArea(self)
         font = QFont("Courier New", 11)
         font.setStyleHint(QFont.StyleHint.Monospace)
         self.setFont(font)
@@ -413,7 +985,6 @@ class PythonEditor(QPlainTextEdit):
         self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
         
         
-        self.line_number_area = LineNumberArea(self)
         self.blockCountChanged.connect(self.update_line_number_width)
         self.updateRequest.connect(self.update_line_number_area)
         self.cursorPositionChanged.connect(self.highlight_current_line)
@@ -426,10 +997,173 @@ class PythonEditor(QPlainTextEdit):
         
     def setup_highlighter(self):
         self.highlighter = PythonHighlighter(self.document())
+        slice_ms = QSettings("ZenithFlow", "IDE").value("highlight_slice_ms", 8, type=int)
+        self.highlight_scheduler = HighlightScheduler(self, self.highlighter, slice_ms)
+
+    def set_text_progressive(self, text):
+        self.highlight_scheduler.cancel()
+        if text.count('\n') < self.PROGRESSIVE_HIGHLIGHT_LINES:
+            self.setPlainText(text)
+            return
+        self.highlighter.deferred = True
+        try:
+            self.setPlainText(text)
+        finally:
+            self.highlighter.deferred = False
+        self.highlight_scheduler.start()
+
+    def setup_completer(self):
+        self.completer = QCompleter(self)
+        self.completer.setWidget(self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.completion_model = QStringListModel(self.completer)
+        self.completer.setModel(self.completion_model)
+        self.completer.activated[str].connect(self.insert_completion)
+        self.completion_prefix = ''
+        self.completion_revision = -1
+        self.completion_snapshot_at = 0.0
+        self.completion_missing = None
+
+    def set_completion_engine(self, engine):
+        self.completion_engine = engine
+        engine.completed.connect(self.show_completions)
+
+    def keyPressEvent(self, event):
+        popup = self.completer.popup()
+        if popup.isVisible() and event.key() in (
+                Qt.Key.Key_Enter, Qt.Key.Key_Return, Qt.Key.Key_Tab,
+                Qt.Key.Key_Backtab, Qt.Key.Key_Escape):
+            event.ignore()
+            return
+        explicit = (event.key() == Qt.Key.Key_Space
+                    and event.modifiers() & Qt.KeyboardModifier.ControlModifier)
+        if not explicit:
+            super().keyPressEvent(event)
+        text = event.text()
+        if explicit or (text and (text[-1].isalnum() or text[-1] in '_.')):
+            self.request_completion(explicit)
+        elif popup.isVisible() and event.key() == Qt.Key.Key_Backspace:
+            self.request_completion()
+        elif text or event.key() in (Qt.Key.Key_Left, Qt.Key.Key_Right):
+            self.cancel_completion()
+
+    def request_completion(self, explicit=False):
+        engine = self.completion_engine
+        if engine is None:
+            return
+        cursor = self.textCursor()
+        before = cursor.block().text()[:cursor.positionInBlock()]
+        match = re.search(r'(?:([A-Za-z_][\w.]*)\.)?([A-Za-z_]\w*)?$', before)
+        qualifier, prefix = match.group(1) or '', match.group(2) or ''
+        if not before.endswith('.') and not prefix:
+            qualifier = ''
+        if (not prefix and not qualifier and not explicit) or \
+                (not qualifier and len(prefix) < 2 and not explicit) or \
+                before.lstrip().startswith('#'):
+            self.cancel_completion()
+            return
+        document = None
+        if qualifier:
+            context = self.enclosing_class(cursor.block()) if qualifier == 'self' else ''
+            if self.completion_snapshot_needed(engine, qualifier.split('.')[0], context):
+                document = self.toPlainText()
+        else:
+            context = self.nearby_text(cursor.block())
+        self.completion_generation = engine.request(self, prefix, qualifier, context, document)
+
+    def completion_snapshot_needed(self, engine, head, context):
+        """Whether to hand the engine a fresh copy of the buffer for member completion.
+
+        Copies are made at most once a second while typing, plus once for a
+        qualifier the last snapshot could not resolve (e.g. a new import).
+        """
+        revision = self.document().revision()
+        if revision == self.completion_revision:
+            return False
+        known = engine.knows(self, head, context)
+        now = time.monotonic()
+        if self.completion_revision >= 0 and now - self.completion_snapshot_at < self.COMPLETION_SNAPSHOT_INTERVAL \
+                and (known or self.completion_missing == (head, context)):
+            return False
+        self.completion_revision = revision
+        self.completion_snapshot_at = now
+        self.completion_missing = None if known else (head, context)
+        return True
+
+    def cancel_completion(self):
+        if self.completion_engine is not None:
+            self.completion_engine.cancel()
+        self.completer.popup().hide()
+
+    def nearby_text(self, block, radius=100):
+        lines = []
+        up = block.previous()
+        down = block.next()
+        for _ in range(radius):
+            if up.isValid():
+                lines.append(up.text())
+                up = up.previous()
+            if down.isValid():
+                lines.append(down.text())
+                down = down.next()
+        return '\n'.join(lines)
+
+    def enclosing_class(self, block):
+        indent = len(block.text()) - len(block.text().lstrip())
+        while block.isValid():
+            text = block.text()
+            stripped = text.lstrip()
+            if stripped and len(text) - len(stripped) < indent:
+                match = re.match(r'class\s+([A-Za-z_]\w*)', stripped)
+                if match:
+                    return match.group(1)
+                indent = len(text) - len(stripped)
+            block = block.previous()
+        return ''
+
+    def show_completions(self, requester, generation, prefix, items):
+        if requester is not self or generation != self.completion_generation:
+            return
+        if not items or (len(items) == 1 and items[0][0] == prefix):
+            self.completer.popup().hide()
+            return
+        self.completion_prefix = prefix
+        self.completion_model.setStringList([name for name, _ in items])
+        popup = self.completer.popup()
+        popup.setCurrentIndex(self.completion_model.index(0, 0))
+        rect = self.cursorRect()
+        rect.setWidth(popup.sizeHintForColumn(0) + popup.verticalScrollBar().sizeHint().width())
+        self.completer.complete(rect)
+
+    def insert_completion(self, completion):
+        if self.completer.widget() is not self:
+            return
+        cursor = self.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.Left,
+                            QTextCursor.MoveMode.KeepAnchor, len(self.completion_prefix))
+        cursor.insertText(completion)
+        self.setTextCursor(cursor)
+
+    def dispose(self):
+        self.highlight_scheduler.cancel()
+        if self.completion_engine is not None:
+            self.completion_engine.completed.disconnect(self.show_completions)
+            self.completion_engine.forget(self)
+
+    def apply_theme(self):
+        self.highlighter.refresh_rules()
+        if self.blockCount() >= self.PROGRESSIVE_HIGHLIGHT_LINES:
+            self.highlight_scheduler.start()
+        else:
+            self.highlight_scheduler.cancel()
+            self.highlighter.rehighlight()
+        self.highlight_current_line()
+        self.gutter.invalidate()
+        self.line_number_area.update()
         
     def line_number_width(self):
-        digits = len(str(max(1, self.blockCount())))
-        return 5 + self.fontMetrics().horizontalAdvance('9') * digits
+        return self.gutter.width_for(self.blockCount())
         
     def update_line_number_width(self):
         self.setViewportMargins(self.line_number_width(), 0, 0, 0)
@@ -448,28 +1182,15 @@ class PythonEditor(QPlainTextEdit):
             cr.left(), cr.top(), self.line_number_width(), cr.height()
         )
         
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.Type.FontChange:
+            self.gutter.invalidate()
+            self.update_line_number_width()
+            self.line_number_area.update()
+
     def line_number_area_paint_event(self, event):
-        painter = QPainter(self.line_number_area)
-        painter.fillRect(event.rect(), QColor(ThemeManager().theme['bg']))
-        
-        block = self.firstVisibleBlock()
-        block_number = block.blockNumber()
-        top = self.blockBoundingGeometry(block).translated(self.contentOffset()).top()
-        bottom = top + self.blockBoundingRect(block).height()
-        
-        while block.isValid() and top <= event.rect().bottom():
-            if block.isVisible() and bottom >= event.rect().top():
-                number = str(block_number + 1)
-                painter.setPen(QColor(ThemeManager().theme['border']))
-                painter.drawText(0, int(top), 
-                                self.line_number_area.width() - 5,
-                                self.fontMetrics().height(),
-                                Qt.AlignmentFlag.AlignRight, number)
-            
-            block = block.next()
-            top = bottom
-            bottom = top + self.blockBoundingRect(block).height()
-            block_number += 1
+        self.gutter.paint(self.line_number_area, event)
             
     def highlight_current_line(self):
         extra_selections = []
@@ -481,8 +1202,98 @@ class PythonEditor(QPlainTextEdit):
             selection.cursor = self.textCursor()
             selection.cursor.clearSelection()
             extra_selections.append(selection)
-        self.setExtraSelections(extra_selections)
-        
+        self.set_extra_selections('current_line', extra_selections)
+
+    def set_extra_selections(self, layer, selections):
+        self.extra_selection_layers[layer] = selections
+        combined = []
+        for layer_selections in self.extra_selection_layers.values():
+            combined.extend(layer_selections)
+        self.setExtraSelections(combined)
+
+    def set_diagnostics(self, diagnostics, revision):
+        self.diagnostics = diagnostics
+        self.diagnostics_revision = revision
+        theme = ThemeManager().theme
+        colors = {'error': QColor(theme['error']), 'warning': QColor(theme['warning'])}
+        doc = self.document()
+        selections = []
+        markers = {}
+        for diagnostic in diagnostics:
+            block = doc.findBlockByNumber(diagnostic.line - 1)
+            if not block.isValid():
+                continue
+            if markers.get(diagnostic.line - 1) != 'error':
+                markers[diagnostic.line - 1] = diagnostic.severity
+            text = block.text()
+            start = min(diagnostic.col, len(text))
+            end = diagnostic.end_col if diagnostic.end_col is not None else len(text)
+            if end <= start:
+                start, end = max(0, min(start, len(text) - 1)), max(start + 1, len(text))
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setUnderlineStyle(QTextCharFormat.UnderlineStyle.SpellCheckUnderline)
+            selection.format.setUnderlineColor(colors[diagnostic.severity])
+            selection.cursor = QTextCursor(block)
+            selection.cursor.setPosition(block.position() + start)
+            selection.cursor.setPosition(block.position() + min(end, len(text)),
+                                         QTextCursor.MoveMode.KeepAnchor)
+            selections.append(selection)
+        self.gutter.markers = markers
+        self.set_extra_selections('diagnostics', selections)
+        self.line_number_area.update()
+
+    def set_gutter_annotations(self, annotations):
+        """Per-line gutter notes keyed by 1-based line, e.g. memory allocated on that line."""
+        annotations = {line - 1: text for line, text in annotations.items()}
+        if annotations == self.gutter.annotations:
+            return
+        self.gutter.set_annotations(annotations)
+        self.update_line_number_width()
+        cr = self.contentsRect()
+        self.line_number_area.setGeometry(cr.left(), cr.top(), self.line_number_width(), cr.height())
+        self.line_number_area.update()
+
+    def diagnostics_at(self, line, column):
+        return [d for d in self.diagnostics
+                if d.line == line and (d.end_col is None or d.col <= column <= d.end_col)]
+
+    def event(self, event):
+        if event.type() == QEvent.Type.ToolTip and self.diagnostics:
+            cursor = self.cursorForPosition(self.viewport().mapFromGlobal(event.globalPos()))
+            found = self.diagnostics_at(cursor.blockNumber() + 1, cursor.positionInBlock())
+            if found:
+                QToolTip.showText(event.globalPos(), "\n".join(d.message for d in found), self)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().event(event)
+
+    def replace_range(self, start, end, text):
+        cursor = QTextCursor(self.document())
+        cursor.setPosition(start)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        large = text.count('\n') + self.blockCount() >= self.PROGRESSIVE_HIGHLIGHT_LINES
+        if large:
+            self.highlight_scheduler.cancel()
+            self.highlighter.deferred = True
+        cursor.beginEditBlock()
+        try:
+            cursor.insertText(text)
+        finally:
+            cursor.endEditBlock()
+            if large:
+                self.highlighter.deferred = False
+                self.highlight_scheduler.start()
+        
+    def goto_line(self, line, column=0):
+        block = self.document().findBlockByNumber(max(0, line - 1))
+        if not block.isValid():
+            block = self.document().lastBlock()
+        cursor = QTextCursor(block)
+        cursor.setPosition(block.position() + min(column, max(0, block.length() - 1)))
+        self.setTextCursor(cursor)
+        self.centerCursor()
+
     def emit_cursor_position(self):
         cursor = self.textCursor()
         line = cursor.blockNumber() + 1
@@ -492,26 +1303,159 @@ class PythonEditor(QPlainTextEdit):
     def load_file(self, path):
         try:
             with open(path, 'r', encoding='utf-8') as f:
-                self.setPlainText(f.read())
+                self.set_text_progressive(f.read())
             self.file_path = path
+            self.disk_state = DiskState.of(path)
             self.document().setModified(False)
             return True
         except Exception as e:
             QMessageBox.critical(self, "خطا", f"خطا در باز کردن فایل: {str(e)}")
             return False
             
-    def save_file(self, path=None):
+    def save_file(self, path=None, automatic=False):
         if path:
+            if path != self.file_path:
+                self.disk_state = None
             self.file_path = path
-        if self.file_path:
-            try:
-                with open(self.file_path, 'w', encoding='utf-8') as f:
-                    f.write(self.toPlainText())
-                self.document().setModified(False)
-                return True
-            except Exception as e:
-                QMessageBox.critical(self, "خطا", f"خطا در ذخیره فایل: {str(e)}")
-        return False
+        if not self.file_path:
+            return False
+        worker = FileSaveWorker(self.file_path, self.toPlainText(),
+                                self.document().revision(), self.disk_state)
+        worker.result.automatic = automatic
+        worker.completed.connect(self.on_save_completed)
+        self.save_workers.add(worker)
+        FileSaveWorker.launch(worker)
+        return True
+
+    def on_save_completed(self, result):
+        if result.handled:
+            return
+        result.handled = True
+        self.save_workers = {w for w in self.save_workers if w.result is not result}
+        if result.ok:
+            if result.path == self.file_path:
+                self.disk_state = result.disk_state
+                if not result.automatic:
+                    self.recovered = False
+                if self.document().revision() == result.revision:
+                    self.document().setModified(False)
+            message = "بدون تغییر" if result.skipped else "ذخیره شد"
+        else:
+            message = result.error
+        self.saveFinished.emit(result.path, result.ok, message, result.automatic)
+
+    def flush_saves(self, timeout_ms=10000):
+        failed = []
+        for worker in list(self.save_workers):
+            worker.wait(timeout_ms)
+            self.on_save_completed(worker.result)
+            if not worker.result.ok:
+                failed.append(worker.result)
+        return failed
+
+class GutterRenderer:
+    """Paints line numbers from cached pens, fonts and number strings."""
+
+    MARKER_WIDTH = 6
+
+    def __init__(self, editor):
+        self.editor = editor
+        self.theme_name = None
+        self.background = None
+        self.pen = None
+        self.font = None
+        self.line_height = 0
+        self.digit_width = 0
+        self.align = Qt.AlignmentFlag.AlignRight
+        self.numbers = []
+        self.markers = {}
+        self.marker_colors = {}
+        self.annotations = {}
+        self.annotation_width = 0
+        self.annotation_pen = None
+
+    def invalidate(self):
+        self.theme_name = None
+
+    def ensure(self):
+        if self.theme_name == ThemeManager.current:
+            return
+        theme = ThemeManager().theme
+        self.theme_name = ThemeManager.current
+        self.background = QColor(theme['bg'])
+        self.pen = QPen(QColor(theme['border']))
+        self.font = QFont(self.editor.font())
+        metrics = QFontMetrics(self.font)
+        self.line_height = metrics.height()
+        self.digit_width = metrics.horizontalAdvance('9')
+        self.marker_colors = {
+            'error': QColor(theme['error']), 'warning': QColor(theme['warning'])}
+        self.annotation_pen = QPen(QColor(theme['secondary']))
+        self.measure_annotations()
+
+    def set_annotations(self, annotations):
+        """Short texts per 0-based line, drawn between the markers and the line numbers."""
+        self.ensure()
+        self.annotations = annotations
+        self.measure_annotations()
+
+    def measure_annotations(self):
+        metrics = QFontMetrics(self.font)
+        widths = [metrics.horizontalAdvance(text) for text in self.annotations.values()]
+        self.annotation_width = max(widths) + 6 if widths else 0
+
+    def width_for(self, block_count):
+        self.ensure()
+        digits = len(str(max(1, block_count)))
+        return 5 + self.MARKER_WIDTH + self.annotation_width + self.digit_width * digits
+
+    def number_text(self, index):
+        numbers = self.numbers
+        if index >= len(numbers):
+            numbers.extend(str(n + 1) for n in range(len(numbers), index + 1024))
+        return numbers[index]
+
+    def paint(self, area, event):
+        self.ensure()
+        editor = self.editor
+        rect = event.rect()
+        rect_top = rect.top()
+        rect_bottom = rect.bottom()
+        width = area.width() - 5
+        height = self.line_height
+        align = self.align
+
+        painter = QPainter(area)
+        painter.fillRect(rect, self.background)
+        painter.setPen(self.pen)
+        painter.setFont(self.font)
+        markers = self.markers
+        annotations = self.annotations
+
+        block = editor.firstVisibleBlock()
+        number = block.blockNumber()
+        top = editor.blockBoundingGeometry(block).translated(editor.contentOffset()).top()
+        while block.isValid() and top <= rect_bottom:
+            bottom = top + editor.blockBoundingRect(block).height()
+            if bottom >= rect_top and block.isVisible():
+                painter.drawText(0, int(top), width, height, align, self.number_text(number))
+                severity = markers.get(number)
+                if severity is not None:
+                    size = self.MARKER_WIDTH - 2
+                    painter.fillRect(1, int(top) + (height - size) // 2, size, size,
+                                     self.marker_colors[severity])
+                note = annotations.get(number)
+                if note is not None:
+                    painter.setPen(self.annotation_pen)
+                    painter.drawText(self.MARKER_WIDTH + 1, int(top), self.annotation_width, height,
+                                     Qt.AlignmentFlag.AlignLeft, note)
+                    painter.setPen(self.pen)
+            block = block.next()
+            top = bottom
+            number += 1
+        painter.end()
+
+
 
 class LineNumberArea(QWidget):
     def __init__(self, editor):
@@ -526,283 +1470,5833 @@ class LineNumberArea(QWidget):
 
 
 
-class PythonTerminal(QWidget):
+class LineOffsetIndex(QObject):
+    """Line start offsets of a mapped file, built incrementally on a background thread."""
 
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.current_dir = os.getcwd()
-        self.history = []
-        self.history_index = -1
-        self.setup_ui()
-        
-    def setup_ui(self):
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-   
-        self.output = QPlainTextEdit()
-        self.output.setReadOnly(True)
-        self.output.setFont(QFont("Courier New", 10))
-        layout.addWidget(self.output)
-        
-       
-        input_layout = QHBoxLayout()
-        self.prompt = QLabel(f"{self.current_dir}>")
-        self.prompt.setFont(QFont("Courier New", 10))
-        input_layout.addWidget(self.prompt)
-        
-        self.input = QLineEdit()
-        self.input.setFont(QFont("Courier New", 10))
-        self.input.returnPressed.connect(self.execute_command)
-        input_layout.addWidget(self.input)
-        
-    
-        clear_btn = QPushButton("🗑️")
-        clear_btn.setFixedSize(30, 30)
-        clear_btn.clicked.connect(self.clear_output)
-        input_layout.addWidget(clear_btn)
-        
-        layout.addLayout(input_layout)
-        self.setLayout(layout)
-        
+    progress = pyqtSignal(int)
+    finished = pyqtSignal(int)
 
-        QShortcut(QKeySequence("Ctrl+Up"), self.input, self.history_up)
-        QShortcut(QKeySequence("Ctrl+Down"), self.input, self.history_down)
+    BATCH = 65536
+
+    def __init__(self, buffer, size, parent=None):
+        super().__init__(parent)
+        self.buffer = buffer
+        self.size = size
+        self.offsets = array('Q', [0])
+        self.complete = False
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._build, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+        if self._thread is not None:
+            self._thread.join(0.5)
+
+    def line_count(self):
+        if self.complete:
+            return len(self.offsets)
+        return len(self.offsets) - 1
+
+    def line_span(self, line):
+        offsets = self.offsets
+        start = offsets[line]
+        if line + 1 < len(offsets):
+            return start, offsets[line + 1] - 1
+        return start, self.size
+
+    def line_of_offset(self, offset):
+        return max(0, bisect.bisect_right(self.offsets, offset) - 1)
+
+    def _build(self):
+        find = self.buffer.find
+        offsets = self.offsets
+        batch = array('Q')
+        pos = 0
+        try:
+            while not self._cancel.is_set():
+                newline = find(b'\n', pos)
+                if newline < 0:
+                    break
+                pos = newline + 1
+                batch.append(pos)
+                if len(batch) >= self.BATCH:
+                    offsets.extend(batch)
+                    batch = array('Q')
+                    self.progress.emit(len(offsets) - 1)
+        except ValueError:
+            return
+        if self._cancel.is_set():
+            return
+        offsets.extend(batch)
+        self.complete = True
+        self.finished.emit(len(offsets))
+
+
+class MappedSearch(QObject):
+    """Searches a mapped buffer off the GUI thread, wrapping around once."""
+
+    found = pyqtSignal(int, int)
+    not_found = pyqtSignal()
+
+    CHUNK = 8 << 20
+    OVERLAP = 4096
+
+    def __init__(self, buffer, size, parent=None):
+        super().__init__(parent)
+        self.buffer = buffer
+        self.size = size
+        self._cancel = threading.Event()
+        self._thread = None
+
+    def cancel(self):
+        self._cancel.set()
+        if self._thread is not None:
+            self._thread.join(0.5)
+        self._cancel = threading.Event()
+
+    def search(self, pattern, start, regex=False, case_sensitive=True):
+        self.cancel()
+        flags = 0 if case_sensitive else re.IGNORECASE
+        needle = pattern.encode('utf-8')
+        if regex or not case_sensitive:
+            compiled = re.compile(needle if regex else re.escape(needle), flags)
+        else:
+            compiled = None
+        cancel = self._cancel
+        self._thread = threading.Thread(
+            target=self._run, args=(needle, compiled, start, cancel), daemon=True)
+        self._thread.start()
+
+    def _run(self, needle, compiled, start, cancel):
+        try:
+            for begin, end in ((start, self.size), (0, min(start + len(needle), self.size))):
+                hit = self._scan(needle, compiled, begin, end, cancel)
+                if cancel.is_set():
+                    return
+                if hit is not None:
+                    self.found.emit(*hit)
+                    return
+        except ValueError:
+            return
+        self.not_found.emit()
+
+    def _scan(self, needle, compiled, begin, end, cancel):
+        if compiled is None:
+            pos = begin
+            while pos < end and not cancel.is_set():
+                stop = min(end, pos + self.CHUNK + len(needle))
+                hit = self.buffer.find(needle, pos, stop)
+                if hit >= 0:
+                    return hit, len(needle)
+                if stop >= end:
+                    break
+                pos = stop - len(needle) + 1
+            return None
+        pos = begin
+        while pos < end and not cancel.is_set():
+            stop = min(end, pos + self.CHUNK)
+            chunk = self.buffer[pos:min(self.size, stop + self.OVERLAP)]
+            match = compiled.search(chunk)
+            if match and match.start() < stop - pos:
+                return pos + match.start(), max(1, match.end() - match.start())
+            pos = stop
+        return None
+
+
+class MappedTextView(QAbstractScrollArea):
+    """Renders only the visible lines of a memory-mapped file."""
+
+    topLineChanged = pyqtSignal(int)
+
+    MAX_LINE_CHARS = 4096
+
+    def __init__(self, buffer, index, parent=None):
+        super().__init__(parent)
+        self.buffer = buffer
+        self.index = index
+        self.match = None
+        font = QFont("Courier New", 11)
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.setFont(font)
+        self.apply_theme()
+        self.index.progress.connect(self.update_scrollbars)
+        self.index.finished.connect(self.update_scrollbars)
+        self.verticalScrollBar().valueChanged.connect(self.topLineChanged.emit)
+        self.update_scrollbars()
+
+    def apply_theme(self):
+        theme = ThemeManager().theme
+        self.background = QColor(theme['bg_light'])
+        self.gutter_background = QColor(theme['bg'])
+        self.text_pen = QPen(QColor(theme['fg']))
+        self.number_pen = QPen(QColor(theme['border']))
+        self.match_color = QColor(theme['primary'])
+        self.match_color.setAlpha(90)
+        metrics = QFontMetrics(self.font())
+        self.line_height = metrics.height()
+        self.ascent = metrics.ascent()
+        self.char_width = metrics.horizontalAdvance('9')
+        self.viewport().update()
+
+    def visible_rows(self):
+        return max(1, self.viewport().height() // self.line_height)
+
+    def gutter_width(self):
+        return 10 + self.char_width * len(str(max(1, self.index.line_count())))
+
+    def update_scrollbars(self, *_):
+        rows = self.visible_rows()
+        vbar = self.verticalScrollBar()
+        vbar.setRange(0, max(0, self.index.line_count() - rows))
+        vbar.setPageStep(rows)
+        hbar = self.horizontalScrollBar()
+        columns = max(1, (self.viewport().width() - self.gutter_width()) // self.char_width)
+        hbar.setRange(0, max(0, self.MAX_LINE_CHARS - columns))
+        hbar.setPageStep(columns)
+        self.viewport().update()
+
+    def line_text(self, line):
+        start, end = self.index.line_span(line)
+        end = min(end, start + self.MAX_LINE_CHARS * 4)
+        text = self.buffer[start:end].decode('utf-8', 'replace')
+        return text.rstrip('\r').expandtabs(4)[:self.MAX_LINE_CHARS]
+
+    def goto_line(self, line):
+        line = max(0, min(line, self.index.line_count() - 1))
+        self.verticalScrollBar().setValue(line - self.visible_rows() // 3)
+
+    def show_match(self, offset, length):
+        line = self.index.line_of_offset(offset)
+        start, _ = self.index.line_span(line)
+        prefix = self.buffer[start:offset].decode('utf-8', 'replace').expandtabs(4)
+        text = self.buffer[offset:offset + length].decode('utf-8', 'replace')
+        self.match = (line, len(prefix), len(text))
+        self.goto_line(line)
+        self.viewport().update()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scrollbars()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        rect = self.viewport().rect()
+        painter.fillRect(rect, self.background)
+        gutter = self.gutter_width()
+        painter.fillRect(0, 0, gutter, rect.height(), self.gutter_background)
+        painter.setFont(self.font())
+
+        first = self.verticalScrollBar().value()
+        column = self.horizontalScrollBar().value()
+        count = self.index.line_count()
+        line_height = self.line_height
+        char_width = self.char_width
+        right = Qt.AlignmentFlag.AlignRight
+
+        for row in range(self.visible_rows() + 1):
+            line = first + row
+            if line >= count:
+                break
+            y = row * line_height
+            painter.setPen(self.number_pen)
+            painter.drawText(0, y, gutter - 5, line_height, right, str(line + 1))
+            painter.setClipRect(gutter, 0, rect.width() - gutter, rect.height())
+            if self.match and self.match[0] == line:
+                x = gutter + (self.match[1] - column) * char_width
+                painter.fillRect(x, y, self.match[2] * char_width, line_height, self.match_color)
+            painter.setPen(self.text_pen)
+            painter.drawText(gutter, y + self.ascent, self.line_text(line)[column:])
+            painter.setClipping(False)
+        painter.end()
+
+
+class LargeFileViewer(QWidget):
+    """Read-only, memory-mapped view for files too large to load into an editor."""
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.file_path = path
+        self._file = open(path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.index = LineOffsetIndex(self.buffer, self.size, self)
+        self.searcher = MappedSearch(self.buffer, self.size, self)
+        self.search_from = 0
+        self.setup_ui()
+        self.index.progress.connect(self.update_info)
+        self.index.finished.connect(self.update_info)
+        self.searcher.found.connect(self.on_found)
+        self.searcher.not_found.connect(self.on_not_found)
+        self.index.start()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        bar = QHBoxLayout()
+        self.info = QLabel()
+        bar.addWidget(self.info)
+        bar.addStretch()
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("جستجو...")
+        self.search_input.returnPressed.connect(self.find_next)
+        bar.addWidget(self.search_input)
+
+        self.regex_check = QCheckBox("Regex")
+        bar.addWidget(self.regex_check)
+        self.case_check = QCheckBox("Aa")
+        self.case_check.setChecked(True)
+        bar.addWidget(self.case_check)
+
+        find_btn = QPushButton("بعدی")
+        find_btn.clicked.connect(self.find_next)
+        bar.addWidget(find_btn)
+
+        self.goto_input = QLineEdit()
+        self.goto_input.setPlaceholderText("برو به خط")
+        self.goto_input.setFixedWidth(100)
+        self.goto_input.returnPressed.connect(self.goto_line)
+        bar.addWidget(self.goto_input)
+
+        layout.addLayout(bar)
+
+        self.view = MappedTextView(self.buffer, self.index)
+        layout.addWidget(self.view, 1)
+        self.setLayout(layout)
+        self.update_info()
+
+    def update_info(self, *_):
+        state = "" if self.index.complete else " (در حال فهرست‌سازی...)"
+        self.info.setText(f"فقط خواندنی · {self.size / (1 << 20):.1f} MB · "
+                          f"{self.index.line_count():,} خط{state}")
+
+    def find_next(self):
+        pattern = self.search_input.text()
+        if not pattern:
+            return
+        try:
+            self.searcher.search(pattern, self.search_from,
+                                 regex=self.regex_check.isChecked(),
+                                 case_sensitive=self.case_check.isChecked())
+        except re.error as e:
+            self.info.setText(f"عبارت نامعتبر: {e}")
+
+    def on_found(self, offset, length):
+        self.search_from = offset + length
+        if offset >= self.index.offsets[-1] and not self.index.complete:
+            self.info.setText("نتیجه پیدا شد، اما هنوز فهرست‌سازی به آن نرسیده است")
+            return
+        self.view.show_match(offset, length)
+
+    def on_not_found(self):
+        self.info.setText("نتیجه‌ای یافت نشد")
+
+    def goto_line(self):
+        try:
+            line = int(self.goto_input.text()) - 1
+        except ValueError:
+            return
+        if line >= self.index.line_count() and not self.index.complete:
+            self.info.setText("این خط هنوز فهرست نشده است")
+            return
+        self.view.goto_line(line)
+
+    def apply_theme(self):
+        self.view.apply_theme()
+
+    def dispose(self):
+        self.index.cancel()
+        self.searcher.cancel()
+        self.buffer.close()
+        self._file.close()
+
+
+
+class OutputView(QPlainTextEdit):
+    """Read-only log view bounded to a line cap, rendered at most once per display frame.
+
+    Writes go to a pending buffer that never holds more lines than the view can
+    show; with spill enabled every byte is also appended to a scrollback file.
+    """
+
+    scrollback_requested = pyqtSignal(str)
+
+    def __init__(self, name, parent=None):
+        super().__init__(parent)
+        self.name = name
+        self.setReadOnly(True)
+        self.setUndoRedoEnabled(False)
+        self.setFont(QFont("Courier New", 10))
+        self.pending = deque()
+        self.pending_lines = 0
+        self.at_line_start = True
+        self.max_lines = 0
+        self.spill = None
+        self.spill_path = None
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.timeout.connect(self.flush)
+        screen = QApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None else 60.0
+        self.flush_timer.setInterval(max(8, int(1000 / (rate or 60.0))))
+
+        settings = QSettings("ZenithFlow", "IDE")
+        self.configure(settings.value("output_max_lines", 10000, type=int),
+                       settings.value("output_spill", False, type=bool))
+
+    def configure(self, max_lines, spill):
+        self.max_lines = max(100, max_lines)
+        self.setMaximumBlockCount(self.max_lines + 1)
+        if spill and self.spill is None:
+            self.spill_path = os.path.join(
+                app_data_dir('scrollback'), f"{self.name}-{os.getpid()}.log")
+            self.spill = open(self.spill_path, 'w', encoding='utf-8', buffering=1 << 20)
+        elif not spill and self.spill is not None:
+            self.close_spill()
+
+    def close_spill(self):
+        if self.spill is None:
+            return
+        self.spill.close()
+        self.spill = None
+        try:
+            os.remove(self.spill_path)
+        except OSError:
+            pass
+
+    def write(self, text, stream='stdout'):
+        if not text:
+            return
+        if self.spill is not None:
+            self.spill.write(text)
+        lines = text.count('\n')
+        if lines > self.max_lines:
+            text = '\n'.join(text.split('\n')[-self.max_lines - 1:])
+            lines = self.max_lines
+        self.pending.append((stream, text, lines))
+        self.pending_lines += lines
+        while len(self.pending) > 1 and self.pending_lines - self.pending[0][2] >= self.max_lines:
+            self.pending_lines -= self.pending.popleft()[2]
+        self.at_line_start = text.endswith('\n')
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def append(self, text, stream='stdout'):
+        self.write(('' if self.at_line_start else '\n') + text + '\n', stream)
+
+    def appendPlainText(self, text):
+        self.append(text)
+
+    def flush(self):
+        if not self.pending:
+            self.flush_timer.stop()
+            if self.spill is not None:
+                self.spill.flush()
+            return
+        runs = []
+        for stream, text, _ in self.pending:
+            if runs and runs[-1][0] == stream:
+                runs[-1][1].append(text)
+            else:
+                runs.append((stream, [text]))
+        self.pending.clear()
+        self.pending_lines = 0
+
+        theme = ThemeManager().theme
+        formats = {'stdout': QTextCharFormat(), 'stderr': QTextCharFormat(),
+                   'info': QTextCharFormat()}
+        formats['stderr'].setForeground(QColor(theme['error']))
+        formats['info'].setForeground(QColor(theme['primary']))
+        scrollbar = self.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum() - 2
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.beginEditBlock()
+        for stream, texts in runs:
+            self.insert_run(cursor, ''.join(texts), self.stream_format(stream, formats))
+        cursor.endEditBlock()
+        if at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def stream_format(self, stream, formats):
+        return formats.get(stream, formats['stdout'])
+
+    def insert_run(self, cursor, text, fmt):
+        cursor.insertText(text, fmt)
+
+    def clear(self):
+        self.pending.clear()
+        self.pending_lines = 0
+        self.at_line_start = True
+        if self.spill is not None:
+            self.spill.seek(0)
+            self.spill.truncate()
+        super().clear()
+
+    def contextMenuEvent(self, event):
+        menu = self.createStandardContextMenu()
+        if self.spill is not None:
+            menu.addSeparator()
+            action = menu.addAction("باز کردن خروجی کامل")
+            action.triggered.connect(self.open_scrollback)
+        menu.exec(event.globalPos())
+
+    def open_scrollback(self):
+        if self.spill is not None:
+            self.spill.flush()
+            self.scrollback_requested.emit(self.spill_path)
+
+    def dispose(self):
+        self.flush_timer.stop()
+        self.close_spill()
+
+
+class AnsiParser:
+    """Incremental ANSI escape parser: feed() text chunks, get back (text, style) runs.
+
+    Sequences may be split across chunks; the parser state carries over. A style is
+    a hashable (fg, bg, bold, italic, underline) tuple, where colours are None, a
+    0-255 palette index or a '#rrggbb' string. Only SGR and screen clears are
+    interpreted; other control sequences are consumed and dropped.
+    """
+
+    DEFAULT_STYLE = (None, None, False, False, False)
+    CLEAR = 'clear'
+    TEXT, ESCAPE, CSI, OSC, OSC_ESCAPE, CHARSET = range(6)
+    CONTROL_CHARS = {c: None for c in range(32) if chr(c) not in '\n\r\b\t'}
+    CONTROL_CHARS[127] = None
+
+    def __init__(self):
+        self.state = self.TEXT
+        self.params = []
+        self.style = self.DEFAULT_STYLE
+
+    def feed(self, text):
+        runs = []
+        buffer = []
+        i = 0
+        n = len(text)
+        while i < n:
+            state = self.state
+            if state == self.TEXT:
+                j = text.find('\x1b', i)
+                if j < 0:
+                    buffer.append(text[i:])
+                    break
+                buffer.append(text[i:j])
+                self.state = self.ESCAPE
+                i = j + 1
+                continue
+            ch = text[i]
+            i += 1
+            if state == self.ESCAPE:
+                if ch == '[':
+                    self.state = self.CSI
+                    self.params = []
+                elif ch == ']':
+                    self.state = self.OSC
+                elif ch in '()*+':
+                    self.state = self.CHARSET
+                else:
+                    self.state = self.TEXT
+            elif state == self.CSI:
+                if '\x20' <= ch <= '\x3f':
+                    self.params.append(ch)
+                    continue
+                self.state = self.TEXT
+                params = ''.join(self.params)
+                if ch == 'm' and not params.startswith('?'):
+                    style = self.apply_sgr(params)
+                    if style != self.style:
+                        self.flush(runs, buffer)
+                        self.style = style
+                elif ch == 'J' and params in ('2', '3'):
+                    self.flush(runs, buffer)
+                    runs.append(('', self.CLEAR))
+            elif state == self.OSC:
+                if ch == '\x07':
+                    self.state = self.TEXT
+                elif ch == '\x1b':
+                    self.state = self.OSC_ESCAPE
+            elif state == self.OSC_ESCAPE:
+                self.state = self.TEXT if ch == '\\' else self.OSC
+            else:
+                self.state = self.TEXT
+        self.flush(runs, buffer)
+        return runs
+
+    def flush(self, runs, buffer):
+        text = ''.join(buffer).translate(self.CONTROL_CHARS)
+        buffer.clear()
+        if text:
+            runs.append((text, self.style))
+
+    def apply_sgr(self, params):
+        fg, bg, bold, italic, underline = self.style
+        codes = [int(p) if p.isdigit() else 0 for p in params.replace(':', ';').split(';')] if params else [0]
+        i = 0
+        while i < len(codes):
+            code = codes[i]
+            i += 1
+            if code == 0:
+                fg, bg, bold, italic, underline = self.DEFAULT_STYLE
+            elif code == 1:
+                bold = True
+            elif code == 3:
+                italic = True
+            elif code == 4:
+                underline = True
+            elif code == 22:
+                bold = False
+            elif code == 23:
+                italic = False
+            elif code == 24:
+                underline = False
+            elif 30 <= code <= 37:
+                fg = code - 30
+            elif 90 <= code <= 97:
+                fg = code - 90 + 8
+            elif code == 39:
+                fg = None
+            elif 40 <= code <= 47:
+                bg = code - 40
+            elif 100 <= code <= 107:
+                bg = code - 100 + 8
+            elif code == 49:
+                bg = None
+            elif code in (38, 48) and i < len(codes):
+                if codes[i] == 5 and i + 1 < len(codes):
+                    color = codes[i + 1] & 255
+                    i += 2
+                elif codes[i] == 2 and i + 3 < len(codes):
+                    color = '#%02x%02x%02x' % tuple(c & 255 for c in codes[i + 1:i + 4])
+                    i += 4
+                else:
+                    continue
+                if code == 38:
+                    fg = color
+                else:
+                    bg = color
+        return (fg, bg, bold, italic, underline)
+
+
+ANSI_PALETTE = [
+    '#45475a', '#f38ba8', '#a6e3a1', '#f9e2af', '#89b4fa', '#f5c2e7', '#94e2d5', '#bac2de',
+    '#585b70', '#f38ba8', '#a6e3a1', '#f9e2af', '#89b4fa', '#f5c2e7', '#94e2d5', '#a6adc8',
+]
+
+
+def ansi_color(color):
+    if isinstance(color, str):
+        return QColor(color)
+    if color < 16:
+        return QColor(ANSI_PALETTE[color])
+    if color < 232:
+        color -= 16
+        steps = [0, 95, 135, 175, 215, 255]
+        return QColor(steps[color // 36], steps[color // 6 % 6], steps[color % 6])
+    level = 8 + (color - 232) * 10
+    return QColor(level, level, level)
+
+
+class TerminalView(OutputView):
+    """OutputView for a pseudo-terminal: ANSI colours, carriage-return overwrites and resize."""
+
+    grid_resized = pyqtSignal(int, int)
+
+    def __init__(self, name, parent=None):
+        super().__init__(name, parent)
+        self.parser = AnsiParser()
+        self.style_formats = {}
+        self.overwrite = False
+        self.grid = None
+
+    def feed(self, text):
+        for run, style in self.parser.feed(text):
+            if style == AnsiParser.CLEAR:
+                self.clear()
+            else:
+                self.write(run, style)
+
+    def stream_format(self, stream, formats):
+        if isinstance(stream, str):
+            return super().stream_format(stream, formats)
+        key = (ThemeManager.current, stream)
+        fmt = self.style_formats.get(key)
+        if fmt is None:
+            fg, bg, bold, italic, underline = stream
+            fmt = QTextCharFormat()
+            if fg is not None:
+                fmt.setForeground(ansi_color(fg))
+            if bg is not None:
+                fmt.setBackground(ansi_color(bg))
+            if bold:
+                fmt.setFontWeight(QFont.Weight.Bold)
+            fmt.setFontItalic(italic)
+            fmt.setFontUnderline(underline)
+            self.style_formats[key] = fmt
+        return fmt
+
+    def insert_run(self, cursor, text, fmt):
+        if '\r' not in text and '\b' not in text and not self.overwrite:
+            cursor.insertText(text, fmt)
+            return
+        for piece in re.split(r'(\r\n|\r|\b)', text):
+            if piece == '\r':
+                self.overwrite = True
+            elif piece == '\b':
+                if cursor.positionInBlock() > 0:
+                    cursor.deletePreviousChar()
+            elif piece:
+                if piece == '\r\n':
+                    piece = '\n'
+                if self.overwrite and not piece.startswith('\n'):
+                    cursor.movePosition(QTextCursor.MoveOperation.StartOfBlock,
+                                        QTextCursor.MoveMode.KeepAnchor)
+                    cursor.removeSelectedText()
+                self.overwrite = False
+                cursor.insertText(piece, fmt)
+
+    def clear(self):
+        self.overwrite = False
+        super().clear()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        metrics = QFontMetrics(self.font())
+        viewport = self.viewport()
+        grid = (max(20, viewport.width() // max(1, metrics.horizontalAdvance('M'))),
+                max(5, viewport.height() // max(1, metrics.lineSpacing())))
+        if grid != self.grid:
+            self.grid = grid
+            self.grid_resized.emit(*grid)
+
+
+class ProcessJob(QObject):
+    """Runs a command in its own process group with piped output.
+
+    Reader threads queue raw chunks for the GUI to drain; the queue is bounded,
+    so a process that outpaces the display blocks on its pipe instead of
+    growing memory. A waiter thread reaps the process and records its rusage.
+    """
+
+    finished = pyqtSignal(int)
+
+    CHUNK_SIZE = 1 << 16
+    MAX_QUEUED_CHUNKS = 256
+    KILL_GRACE = 2.0
+
+    def __init__(self, args, cwd, shell=False, env=None, label=None, parent=None):
+        super().__init__(parent)
+        self.args = args
+        self.cwd = cwd
+        self.shell = shell
+        self.env = env
+        self.label = label or (args if isinstance(args, str) else ' '.join(args))
+        self.process = None
+        self.exit_code = None
+        self.error = None
+        self.timed_out = False
+        self.stopped = False
+        self.deadline = None
+        self.started_at = None
+        self.wall_time = 0.0
+        self.cpu_time = None
+        self.max_rss = None
+        self.chunks = queue.Queue(maxsize=self.MAX_QUEUED_CHUNKS)
+        self.decoders = {
+            'stdout': codecs.getincrementaldecoder('utf-8')('replace'),
+            'stderr': codecs.getincrementaldecoder('utf-8')('replace'),
+        }
+        self._pending = 3
+        self._lock = threading.Lock()
+
+    def start(self):
+        flags = subprocess.CREATE_NEW_PROCESS_GROUP if os.name == 'nt' else 0
+        self.started_at = time.monotonic()
+        self.process = subprocess.Popen(
+            self.args, cwd=self.cwd, shell=self.shell, env=self.env,
+            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            start_new_session=os.name == 'posix', creationflags=flags)
+        for name, pipe in (('stdout', self.process.stdout), ('stderr', self.process.stderr)):
+            threading.Thread(target=self._pump, args=(name, pipe), daemon=True).start()
+        threading.Thread(target=self._wait, daemon=True).start()
+
+    def fail(self, message):
+        self.error = message
+        self.exit_code = -1
+        self.finished.emit(-1)
+
+    def _pump(self, name, pipe):
+        fd = pipe.fileno()
+        try:
+            while True:
+                data = os.read(fd, self.CHUNK_SIZE)
+                if not data:
+                    break
+                self.chunks.put((name, data))
+        except OSError:
+            pass
+        finally:
+            pipe.close()
+            self._done()
+
+    def _reap(self):
+        """Waits for the process; returns (exit code, cpu seconds, max rss bytes)."""
+        process = self.process
+        if hasattr(os, 'wait4'):
+            try:
+                _, status, usage = os.wait4(process.pid, 0)
+            except ChildProcessError:
+                return process.wait(), None, None
+            code = os.waitstatus_to_exitcode(status)
+            process.returncode = code
+            return (code, usage.ru_utime + usage.ru_stime,
+                    usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024))
+        return process.wait(), None, None
+
+    def _wait(self):
+        code, self.cpu_time, self.max_rss = self._reap()
+        self.wall_time = time.monotonic() - self.started_at
+        self.exit_code = code
+        # Pipes stay open while orphaned children hold them; take the group down with the leader.
+        if self.stopped or self.timed_out:
+            self._signal_group(getattr(signal, 'SIGKILL', signal.SIGTERM))
+        self._done()
+
+    def _done(self):
+        with self._lock:
+            self._pending -= 1
+            last = self._pending == 0
+        if last:
+            self.finished.emit(self.exit_code)
+
+    def _signal_group(self, sig):
+        if self.process is None:
+            return
+        try:
+            if os.name == 'posix':
+                os.killpg(self.process.pid, sig)
+            else:
+                subprocess.run(['taskkill', '/T', '/F', '/PID', str(self.process.pid)],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except (ProcessLookupError, PermissionError, OSError):
+            pass
+
+    def terminate(self, timed_out=False):
+        """Stops the whole process group: SIGTERM, then SIGKILL after a grace period."""
+        if self.process is None or self.stopped:
+            return
+        self.stopped = True
+        self.timed_out = timed_out
+        self._signal_group(signal.SIGTERM)
+        if hasattr(signal, 'SIGKILL'):
+            timer = threading.Timer(self.KILL_GRACE, self._signal_group, args=(signal.SIGKILL,))
+            timer.daemon = True
+            timer.start()
+
+    def is_running(self):
+        return self.process is not None and self.exit_code is None
+
+    def read_available(self, max_bytes=None):
+        """Decoded output queued so far as [(stream, text)], merging adjacent same-stream chunks."""
+        batches = []
+        total = 0
+        while max_bytes is None or total < max_bytes:
+            try:
+                name, data = self.chunks.get_nowait()
+            except queue.Empty:
+                break
+            total += len(data)
+            text = self.decoders[name].decode(data).replace('\r\n', '\n')
+            if batches and batches[-1][0] == name:
+                batches[-1] = (name, batches[-1][1] + text)
+            else:
+                batches.append((name, text))
+        return batches
+
+    def report(self):
+        if self.error:
+            return f"✖ {self.label} · {self.error}"
+        if self.timed_out:
+            icon, status = "⏱", "مهلت زمانی تمام شد"
+        elif self.stopped:
+            icon, status = "⏹", "متوقف شد"
+        else:
+            icon = "✔" if self.exit_code == 0 else "✖"
+            status = f"کد خروج {self.exit_code}"
+        parts = [f"{icon} {self.label}", status, f"زمان {self.wall_time:.2f}s"]
+        if self.cpu_time is not None:
+            parts.append(f"CPU {self.cpu_time:.2f}s")
+        if self.max_rss is not None:
+            parts.append(f"حداکثر حافظه {self.max_rss / (1 << 20):.1f} MB")
+        return " · ".join(parts)
+
+
+WARM_SERVER_SOURCE = r'''
+import importlib, json, os, runpy, select, signal, socket, sys, traceback
+
+sock = socket.socket(fileno=int(sys.argv[1]))
+failed = []
+for name in json.loads(sys.argv[2]):
+    try:
+        importlib.import_module(name)
+    except BaseException as e:
+        failed.append(f"{name}: {e}")
+sock.sendall(json.dumps({"ready": os.getpid(), "failed": failed}).encode() + b"\n")
+
+wake_r, wake_w = os.pipe()
+os.set_blocking(wake_w, False)
+signal.set_wakeup_fd(wake_w)
+signal.signal(signal.SIGCHLD, lambda *args: None)
+scale = 1 if sys.platform == "darwin" else 1024
+
+
+def run_child(request, fds):
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    os.setsid()
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    sock.close()
+    os.close(wake_r)
+    os.close(wake_w)
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    sys.argv = request["argv"]
+    sys.path[0] = os.path.dirname(os.path.abspath(sys.argv[0]))
+    for stream in (sys.stdout, sys.stderr):
+        stream.reconfigure(write_through=True)
+    code = 0
+    try:
+        runpy.run_path(sys.argv[0], run_name="__main__")
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            code = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code)
+
+
+buffer = b""
+pending_fds = []
+while True:
+    readable, _, _ = select.select([sock, wake_r], [], [])
+    if wake_r in readable:
+        os.read(wake_r, 4096)
+    while True:
+        try:
+            pid, status, usage = os.wait4(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if not pid:
+            break
+        sock.sendall(json.dumps({"exit": pid, "code": os.waitstatus_to_exitcode(status),
+                                 "cpu": usage.ru_utime + usage.ru_stime,
+                                 "rss": usage.ru_maxrss * scale}).encode() + b"\n")
+    if sock not in readable:
+        continue
+    data, fds, _, _ = socket.recv_fds(sock, 1 << 16, 64)
+    if not data:
+        break
+    buffer += data
+    pending_fds += fds
+    # One read may carry several requests; each names how many of the fds are its own.
+    while b"\n" in buffer:
+        line, _, buffer = buffer.partition(b"\n")
+        try:
+            request = json.loads(line)
+            count = request["fds"]
+        except (ValueError, KeyError, TypeError) as e:
+            request, count = None, 0
+            error = f"bad request: {e}"
+        fds, pending_fds = pending_fds[:count], pending_fds[count:]
+        if request is not None:
+            try:
+                pid = os.fork()
+            except OSError as e:
+                request, error = None, str(e)
+        if request is None:
+            for fd in fds:
+                os.close(fd)
+            sock.sendall(json.dumps({"error": error}).encode() + b"\n")
+            continue
+        if pid == 0:
+            try:
+                run_child(request, fds)
+            finally:
+                os._exit(1)
+        for fd in fds:
+            os.close(fd)
+        sock.sendall(json.dumps({"pid": pid}).encode() + b"\n")
+'''
+
+
+class WarmInterpreterPool:
+    """Fork server that imports the preload list once and forks a fresh child per Run.
+
+    The server is keyed by the interpreter binary and the preload list; a run
+    that finds the key changed (interpreter upgraded, venv switched, list edited)
+    restarts it rather than forking from stale state. Children run in their own
+    session, so ProcessJob's group signals reach them directly; the server reaps
+    them and reports exit codes and rusage back over the socket.
+    """
+
+    supported = os.name == 'posix' and hasattr(os, 'fork') and hasattr(socket, 'send_fds')
+
+    START_TIMEOUT = 60.0
+    SPAWN_TIMEOUT = 10.0
+
+    def __init__(self, preload=()):
+        self.preload = [name for name in preload if name]
+        self.key = None
+        self.server = None
+        self.sock = None
+        self.failed = []
+        self.replies = queue.Queue()
+        self.exits = {}
+        self.ready = threading.Event()
+        self.starting = False
+        self._cond = threading.Condition()
+        self._spawn_lock = threading.Lock()
+
+    @staticmethod
+    def parse_preload(text):
+        return [name.strip() for name in text.replace('\n', ',').split(',') if name.strip()]
+
+    def current_key(self):
+        executable = os.path.realpath(sys.executable)
+        try:
+            st = os.stat(executable)
+        except OSError:
+            return None
+        return (executable, st.st_mtime_ns, st.st_size, tuple(self.preload))
+
+    def set_preload(self, preload):
+        preload = [name for name in preload if name]
+        if preload != self.preload:
+            self.preload = preload
+            self.shutdown()
+
+    def is_ready(self):
+        """True when a run can be forked now; otherwise (re)starts the server in the background."""
+        if not self.supported:
+            return False
+        server = self.server
+        if self.ready.is_set() and server is not None and server.poll() is None \
+                and self.current_key() == self.key:
+            return True
+        self.warm_up()
+        return False
+
+    def warm_up(self):
+        with self._cond:
+            if self.starting:
+                return
+            self.starting = True
+        threading.Thread(target=self._start, daemon=True).start()
+
+    def _start(self):
+        try:
+            self.shutdown()
+            key = self.current_key()
+            parent_sock, child_sock = socket.socketpair()
+            try:
+                server = subprocess.Popen(
+                    [sys.executable, '-c', WARM_SERVER_SOURCE, str(child_sock.fileno()),
+                     json.dumps(self.preload)],
+                    pass_fds=[child_sock.fileno()], stdin=subprocess.DEVNULL,
+                    stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                    start_new_session=True)
+            except OSError:
+                parent_sock.close()
+                return
+            finally:
+                child_sock.close()
+            replies = queue.Queue()
+            self.server, self.sock, self.key, self.replies = server, parent_sock, key, replies
+            threading.Thread(target=self._read, args=(parent_sock, replies), daemon=True).start()
+            try:
+                message = replies.get(timeout=self.START_TIMEOUT)
+            except queue.Empty:
+                self.shutdown()
+                return
+            if message.get('ready'):
+                self.failed = message.get('failed', [])
+                self.ready.set()
+        finally:
+            with self._cond:
+                self.starting = False
+
+    def _read(self, sock, replies):
+        reader = sock.makefile('rb')
+        try:
+            for line in reader:
+                message = json.loads(line)
+                if 'exit' in message:
+                    with self._cond:
+                        self.exits[message['exit']] = message
+                        self._cond.notify_all()
+                else:
+                    replies.put(message)
+        except (OSError, ValueError):
+            pass
+        finally:
+            reader.close()
+            replies.put({'error': 'warm pool exited'})
+            with self._cond:
+                if self.sock is sock:
+                    self.ready.clear()
+                self._cond.notify_all()
+
+    def spawn(self, argv, cwd, env, fds):
+        """Forks a child running argv[0] as __main__ with fds as its stdin/stdout/stderr."""
+        request = json.dumps({'argv': argv, 'cwd': cwd, 'env': env, 'fds': len(fds)}).encode() + b'\n'
+        with self._spawn_lock:
+            if not self.ready.is_set():
+                raise OSError("warm pool is not running")
+            try:
+                socket.send_fds(self.sock, [request], fds)
+                reply = self.replies.get(timeout=self.SPAWN_TIMEOUT)
+            except (OSError, queue.Empty) as e:
+                self.shutdown()
+                raise OSError(f"warm pool: {e or 'no reply'}")
+        if 'pid' not in reply:
+            raise OSError(reply.get('error', "warm pool failed to fork"))
+        return reply['pid']
+
+    def wait_exit(self, pid):
+        """Blocks until the server reports pid's exit; returns its status message."""
+        with self._cond:
+            while pid not in self.exits:
+                if not self.ready.is_set() and not self.starting:
+                    try:
+                        os.kill(pid, 0)
+                    except OSError:
+                        return {'code': -1}
+                self._cond.wait(0.5)
+            return self.exits.pop(pid)
+
+    def shutdown(self):
+        self.ready.clear()
+        server, sock = self.server, self.sock
+        self.server = self.sock = self.key = None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        if server is not None:
+            try:
+                server.wait(timeout=1.0)
+            except subprocess.TimeoutExpired:
+                server.kill()
+                server.wait()
+
+
+class WarmProcess:
+    """The subset of Popen that ProcessJob uses, for a child forked by the warm pool."""
+
+    def __init__(self, pid, stdout, stderr):
+        self.pid = pid
+        self.stdout = stdout
+        self.stderr = stderr
+        self.returncode = None
+
+
+class WarmProcessJob(ProcessJob):
+    """ProcessJob whose script is forked from a WarmInterpreterPool instead of exec'd."""
+
+    def __init__(self, pool, args, cwd, env=None, label=None, parent=None):
+        super().__init__(args, cwd, env=env, label=label, parent=parent)
+        self.pool = pool
+
+    def start(self):
+        self.started_at = time.monotonic()
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        try:
+            with open(os.devnull, 'rb') as devnull:
+                pid = self.pool.spawn(self.args, self.cwd, self.env or dict(os.environ),
+                                      [devnull.fileno(), out_w, err_w])
+        except OSError:
+            os.close(out_r)
+            os.close(err_r)
+            raise
+        finally:
+            os.close(out_w)
+            os.close(err_w)
+        self.process = WarmProcess(pid, os.fdopen(out_r, 'rb', 0), os.fdopen(err_r, 'rb', 0))
+        for name, pipe in (('stdout', self.process.stdout), ('stderr', self.process.stderr)):
+            threading.Thread(target=self._pump, args=(name, pipe), daemon=True).start()
+        threading.Thread(target=self._wait, daemon=True).start()
+
+    def _reap(self):
+        status = self.pool.wait_exit(self.process.pid)
+        self.process.returncode = status['code']
+        return status['code'], status.get('cpu'), status.get('rss')
+
+
+class ProcessManager(QObject):
+    """Owns every launched ProcessJob: concurrency limit, per-job timeouts and Stop."""
+
+    job_queued = pyqtSignal(object)
+    job_started = pyqtSignal(object)
+    job_finished = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.running = []
+        self.pending = deque()
+        self.max_jobs = 4
+        self.timeout = 0
+        settings = QSettings("ZenithFlow", "IDE")
+        self.configure(settings.value("max_jobs", 4, type=int),
+                       settings.value("job_timeout", 0, type=int))
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setInterval(250)
+        self.timeout_timer.timeout.connect(self.check_timeouts)
+
+    def configure(self, max_jobs, timeout):
+        self.max_jobs = max(1, max_jobs)
+        self.timeout = max(0, timeout)
+        while self.pending and len(self.running) < self.max_jobs:
+            self._start(self.pending.popleft())
+
+    def submit(self, job):
+        job.finished.connect(lambda _code, job=job: self._on_finished(job))
+        if len(self.running) < self.max_jobs:
+            self._start(job)
+        else:
+            self.pending.append(job)
+            self.job_queued.emit(job)
+
+    def _start(self, job):
+        try:
+            job.start()
+        except OSError as e:
+            job.fail(str(e))
+            return
+        if self.timeout:
+            job.deadline = job.started_at + self.timeout
+        self.running.append(job)
+        self.timeout_timer.start()
+        self.job_started.emit(job)
+
+    def check_timeouts(self):
+        now = time.monotonic()
+        for job in self.running:
+            if job.deadline is not None and now > job.deadline and not job.stopped:
+                job.terminate(timed_out=True)
+        if not self.running:
+            self.timeout_timer.stop()
+
+    def stop(self, job):
+        if job in self.pending:
+            self.pending.remove(job)
+            job.stopped = True
+            job.fail("لغو شد")
+        else:
+            job.terminate()
+
+    def stop_all(self):
+        for job in list(self.pending) + list(self.running):
+            self.stop(job)
+
+    def _on_finished(self, job):
+        if job in self.running:
+            self.running.remove(job)
+        self.job_finished.emit(job)
+        while self.pending and len(self.running) < self.max_jobs:
+            self._start(self.pending.popleft())
+
+
+class ShellSession(QObject):
+    """Long-lived interactive shell on a pseudo-terminal, read through a QSocketNotifier."""
+
+    output = pyqtSignal(str)
+    exited = pyqtSignal(int)
+
+    supported = pty is not None
+    READ_BYTES = 1 << 20
+
+    def __init__(self, cwd, parent=None):
+        super().__init__(parent)
+        self.cwd = cwd
+        self.pid = None
+        self.fd = None
+        self.notifier = None
+        self.decoder = codecs.getincrementaldecoder('utf-8')('replace')
+
+    def start(self, columns=80, rows=24):
+        shell = os.environ.get('SHELL') or shutil.which('bash') or '/bin/sh'
+        env = dict(os.environ, TERM='xterm-256color', COLORTERM='truecolor')
+        pid, fd = pty.fork()
+        if pid == 0:
+            try:
+                os.chdir(self.cwd)
+                os.execvpe(shell, [shell, '-i'], env)
+            finally:
+                os._exit(127)
+        self.pid, self.fd = pid, fd
+        os.set_blocking(fd, False)
+        self.resize(columns, rows)
+        self.notifier = QSocketNotifier(fd, QSocketNotifier.Type.Read, self)
+        self.notifier.activated.connect(self.on_readable)
+
+    def is_alive(self):
+        return self.fd is not None
+
+    def on_readable(self):
+        chunks = []
+        total = 0
+        closed = False
+        while total < self.READ_BYTES:
+            try:
+                data = os.read(self.fd, 1 << 16)
+            except BlockingIOError:
+                break
+            except OSError:
+                closed = True
+                break
+            if not data:
+                closed = True
+                break
+            chunks.append(data)
+            total += len(data)
+        if chunks:
+            self.output.emit(self.decoder.decode(b''.join(chunks)))
+        if closed:
+            self.close()
+
+    def write(self, text):
+        if self.fd is None:
+            return
+        data = text.encode('utf-8')
+        while data:
+            try:
+                data = data[os.write(self.fd, data):]
+            except BlockingIOError:
+                select.select([], [self.fd], [], 0.1)
+            except OSError:
+                return
+
+    def interrupt(self):
+        self.write('\x03')
+
+    def resize(self, columns, rows):
+        """Sets the pty window size; the kernel delivers SIGWINCH to the foreground job."""
+        if self.fd is not None:
+            try:
+                fcntl.ioctl(self.fd, termios.TIOCSWINSZ, struct.pack('HHHH', rows, columns, 0, 0))
+            except OSError:
+                pass
+
+    def current_dir(self):
+        """The shell's working directory where the platform exposes it, else the last known one."""
+        if self.pid is not None:
+            try:
+                self.cwd = os.readlink(f'/proc/{self.pid}/cwd')
+            except OSError:
+                pass
+        return self.cwd
+
+    def close(self):
+        if self.fd is None:
+            return
+        self.notifier.setEnabled(False)
+        self.notifier.deleteLater()
+        os.close(self.fd)
+        self.fd = None
+        try:
+            os.kill(self.pid, signal.SIGHUP)
+        except OSError:
+            pass
+        threading.Thread(target=self._reap, args=(self.pid,), daemon=True).start()
+
+    def _reap(self, pid):
+        try:
+            _, status = os.waitpid(pid, 0)
+        except ChildProcessError:
+            self.exited.emit(-1)
+        else:
+            self.exited.emit(os.waitstatus_to_exitcode(status))
+
+
+class PythonTerminal(QWidget):
+
+    FRAME_MS = 16
+    FRAME_BYTES = 1 << 20
+    # Each tab spills to its own scrollback file.
+    numbers = itertools.count(1)
+    
+    def __init__(self, manager=None, cwd=None, parent=None):
+        super().__init__(parent)
+        self.number = next(PythonTerminal.numbers)
+        self.manager = manager if manager is not None else ProcessManager(self)
+        self.current_dir = cwd or os.getcwd()
+        self.history = []
+        self.history_index = -1
+        self.jobs = []
+        self.warm_pool = None
+        self.session = None
+        self.closed = False
+        self.drain_timer = QTimer(self)
+        self.drain_timer.setInterval(self.FRAME_MS)
+        self.drain_timer.timeout.connect(self.drain_jobs)
+        self.cwd_timer = QTimer(self)
+        self.cwd_timer.setSingleShot(True)
+        self.cwd_timer.setInterval(150)
+        self.cwd_timer.timeout.connect(self.refresh_cwd)
+        self.setup_ui()
+        self.start_shell()
+        
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+   
+        self.output = TerminalView(f"terminal{self.number}")
+        self.output.grid_resized.connect(self.on_grid_resized)
+        layout.addWidget(self.output)
+        
+       
+        input_layout = QHBoxLayout()
+        self.prompt = QLabel(f"{self.current_dir}>")
+        self.prompt.setFont(QFont("Courier New", 10))
+        input_layout.addWidget(self.prompt)
+        
+        self.input = QLineEdit()
+        self.input.setFont(QFont("Courier New", 10))
+        self.input.returnPressed.connect(self.execute_command)
+        input_layout.addWidget(self.input)
+        
+    
+        clear_btn = QPushButton("🗑️")
+        clear_btn.setFixedSize(30, 30)
+        clear_btn.clicked.connect(self.clear_output)
+        input_layout.addWidget(clear_btn)
+        
+        layout.addLayout(input_layout)
+        self.setLayout(layout)
+        
+
+        # Widget-scoped: several terminal tabs (and the editor's Ctrl+C) share one window.
+        for key, slot in (("Ctrl+Up", self.history_up), ("Ctrl+Down", self.history_down),
+                          ("Ctrl+C", self.interrupt),
+                          ("Ctrl+D", lambda: self.send_to_shell('\x04'))):
+            shortcut = QShortcut(QKeySequence(key), self.input, slot)
+            shortcut.setContext(Qt.ShortcutContext.WidgetShortcut)
+
+    def start_shell(self):
+        if not ShellSession.supported:
+            return
+        self.session = ShellSession(self.current_dir, self)
+        self.session.output.connect(self.on_shell_output)
+        self.session.exited.connect(self.on_shell_exited)
+        try:
+            self.session.start(*(self.output.grid or (80, 24)))
+        except OSError as e:
+            self.output.append(f"اجرای پوسته ناموفق بود: {e}", 'stderr')
+            self.session = None
+
+    def shell_alive(self):
+        return self.session is not None and self.session.is_alive()
+
+    def send_to_shell(self, text):
+        if self.shell_alive():
+            self.session.write(text)
+
+    def interrupt(self):
+        if self.input.hasSelectedText():
+            self.input.copy()
+        elif self.shell_alive():
+            self.session.interrupt()
+        else:
+            for job in list(self.jobs):
+                self.manager.stop(job)
+
+    def on_shell_output(self, text):
+        self.output.feed(text)
+        self.cwd_timer.start()
+
+    def on_shell_exited(self, code):
+        if self.closed:
+            return
+        self.output.append(f"[پوسته بسته شد، کد خروج {code}]", 'info')
+        self.session = None
+
+    def on_grid_resized(self, columns, rows):
+        if self.session is not None:
+            self.session.resize(columns, rows)
+
+    def refresh_cwd(self):
+        if self.session is not None:
+            self.current_dir = self.session.current_dir()
+            self.prompt.setText(f"{self.current_dir}>")
+        
+    def execute_command(self):
+        if self.shell_alive():
+            line = self.input.text()
+            if line.strip():
+                self.history.append(line)
+                self.history_index = len(self.history)
+            self.input.clear()
+            if line.strip() == 'clear':
+                self.clear_output()
+                line = ''
+            self.session.write(line + '\r')
+            return
+
+        cmd = self.input.text().strip()
+        if not cmd:
+            return
+            
+        self.history.append(cmd)
+        self.history_index = len(self.history)
+        
+        self.output.appendPlainText(f"{self.current_dir}> {cmd}")
+        self.input.clear()
+        
+        if cmd.startswith('cd '):
+            self.change_dir(cmd[3:].strip())
+        elif cmd == 'pwd':
+            self.output.appendPlainText(self.current_dir)
+        elif cmd == 'ls' or cmd == 'dir':
+            self.list_files()
+        elif cmd == 'clear':
+            self.clear_output()
+        elif cmd.startswith('python '):
+            self.run_python(cmd[7:].strip())
+        elif cmd == 'help':
+            self.show_help()
+        else:
+            self.run_system(cmd)
+            
+    def change_dir(self, path):
+        try:
+            if path.startswith('~'):
+                path = os.path.expanduser(path)
+            new_path = os.path.abspath(os.path.join(self.current_dir, path))
+            if os.path.exists(new_path) and os.path.isdir(new_path):
+                self.current_dir = new_path
+                self.prompt.setText(f"{self.current_dir}>")
+            else:
+                self.output.appendPlainText(f"دایرکتوری یافت نشد: {path}")
+        except Exception as e:
+            self.output.appendPlainText(f"خطا: {str(e)}")
+            
+    def list_files(self):
+        try:
+            files = os.listdir(self.current_dir)
+            for f in sorted(files):
+                path = os.path.join(self.current_dir, f)
+                if os.path.isdir(path):
+                    self.output.appendPlainText(f"📁 {f}/")
+                else:
+                    self.output.appendPlainText(f"📄 {f}")
+        except Exception as e:
+            self.output.appendPlainText(f"خطا: {str(e)}")
+            
+    def run_python(self, script, runner=None):
+        """Starts script as a job; runner (e.g. ProfileRun) supplies a wrapping command line."""
+        self.refresh_cwd()
+        script_path = os.path.join(self.current_dir, script)
+        if os.path.exists(script_path):
+            self.output.appendPlainText(f"در حال اجرای {script}...")
+            env = dict(os.environ, PYTHONUNBUFFERED='1')
+            name = os.path.basename(script)
+            if runner is not None:
+                return self.start_job(runner.command(script_path), env=env,
+                                      label=f"{runner.LABEL} {name}")
+            if self.warm_pool is not None and self.warm_pool.is_ready():
+                for failure in self.warm_pool.failed:
+                    self.output.append(f"پیش‌بارگذاری ناموفق: {failure}", 'stderr')
+                self.warm_pool.failed = []
+                return self.submit_job(WarmProcessJob(self.warm_pool, [script_path], self.current_dir,
+                                                      env=env, label=f"⚡ {name}", parent=self))
+            return self.start_job([sys.executable, script_path], env=env, label=name)
+        self.output.appendPlainText(f"فایل یافت نشد: {script}")
+        return None
+            
+    def run_system(self, cmd):
+        self.start_job(cmd, shell=True)
+
+    def start_job(self, args, shell=False, env=None, label=None):
+        return self.submit_job(
+            ProcessJob(args, self.current_dir, shell=shell, env=env, label=label, parent=self))
+
+    def submit_job(self, job):
+        job.finished.connect(lambda code, job=job: self.on_job_finished(job, code))
+        self.jobs.append(job)
+        self.manager.submit(job)
+        if job in self.manager.pending:
+            self.output.append(f"در صف اجرا: {job.label}", 'info')
+        self.drain_timer.start()
+        return job
+
+    def drain_jobs(self):
+        if not self.jobs:
+            self.drain_timer.stop()
+        for job in self.jobs:
+            for stream, text in job.read_available(self.FRAME_BYTES):
+                self.output.write(text, stream)
+
+    def on_job_finished(self, job, code):
+        if self.closed:
+            job.deleteLater()
+            return
+        for stream, text in job.read_available():
+            self.output.write(text, stream)
+        if job in self.jobs:
+            self.jobs.remove(job)
+        if job.error:
+            self.output.append(f"خطا: {job.error}", 'stderr')
+        elif code:
+            self.output.append(f"[کد خروج {code}]", 'info')
+        job.deleteLater()
+            
+    def clear_output(self):
+        self.output.clear()
+
+    def shutdown(self):
+        """Closes the shell and hands running jobs to the manager so they outlive this tab."""
+        self.closed = True
+        self.drain_timer.stop()
+        self.cwd_timer.stop()
+        for job in list(self.jobs):
+            job.setParent(self.manager)
+            self.manager.stop(job)
+        if self.session is not None:
+            self.session.setParent(None)
+            self.session.close()
+        self.output.dispose()
+        
+    def show_help(self):
+        help_text = """
+        دستورات موجود:
+        cd <path>    - تغییر دایرکتوری
+        pwd          - نمایش دایرکتوری جاری
+        ls/dir       - لیست فایل‌ها
+        clear        - پاک کردن صفحه
+        python <file>- اجرای فایل پایتون
+        help         - نمایش این راهنما
+        
+        کلیدهای میانبر:
+        Ctrl+Up      - دستور قبلی
+        Ctrl+Down    - دستور بعدی
+        """
+        self.output.appendPlainText(help_text)
+        
+    def history_up(self):
+        if self.history and self.history_index > 0:
+            self.history_index -= 1
+            self.input.setText(self.history[self.history_index])
+            
+    def history_down(self):
+        if self.history and self.history_index < len(self.history) - 1:
+            self.history_index += 1
+            self.input.setText(self.history[self.history_index])
+        else:
+            self.history_index = len(self.history)
+            self.input.clear()
+
+
+
+class TerminalTabs(QTabWidget):
+    """Terminal tabs, each with its own shell session; Run output goes to the current tab."""
+
+    scrollback_requested = pyqtSignal(str)
+
+    def __init__(self, manager, parent=None):
+        super().__init__(parent)
+        self.manager = manager
+        self.warm_pool = None
+        self.counter = 0
+        self.setTabsClosable(True)
+        self.setDocumentMode(True)
+        self.tabCloseRequested.connect(self.close_terminal)
+        add_btn = QPushButton("+")
+        add_btn.setFixedSize(24, 24)
+        add_btn.setToolTip("ترمینال جدید")
+        add_btn.clicked.connect(lambda: self.new_terminal())
+        self.setCornerWidget(add_btn)
+        self.new_terminal()
+
+    def new_terminal(self, cwd=None):
+        current = self.current_terminal()
+        terminal = PythonTerminal(self.manager, cwd or (current.current_dir if current else None))
+        terminal.warm_pool = self.warm_pool
+        terminal.output.scrollback_requested.connect(self.scrollback_requested)
+        self.counter += 1
+        self.setCurrentIndex(self.addTab(terminal, f"ترمینال {self.counter}"))
+        terminal.input.setFocus()
+        return terminal
+
+    def close_terminal(self, index):
+        terminal = self.widget(index)
+        self.removeTab(index)
+        terminal.shutdown()
+        terminal.deleteLater()
+        if not self.count():
+            self.new_terminal()
+
+    def terminals(self):
+        return [self.widget(i) for i in range(self.count())]
+
+    def current_terminal(self):
+        return self.currentWidget()
+
+    def set_warm_pool(self, pool):
+        self.warm_pool = pool
+        for terminal in self.terminals():
+            terminal.warm_pool = pool
+
+    def run_python(self, script, runner=None):
+        return self.current_terminal().run_python(script, runner)
+
+    def shutdown(self):
+        for terminal in self.terminals():
+            terminal.shutdown()
+
+
+class WorkspaceIgnore:
+    """.gitignore-style matcher applied to workspace-relative paths before any stat."""
+
+    DEFAULT_EXCLUDES = [
+        '.git/', '.hg/', '.svn/', 'node_modules/', '.venv/', 'venv/', '__pycache__/',
+        '.mypy_cache/', '.pytest_cache/', '.tox/', '.idea/', '.vscode/', 'build/', 'dist/',
+        '*.egg-info/', '*.pyc', '*.pyo', '.DS_Store',
+    ]
+
+    def __init__(self, root, extra_patterns=None):
+        self.root = os.path.abspath(root)
+        self.rules = []
+        self._loaded_dirs = set()
+        for pattern in self.DEFAULT_EXCLUDES + list(extra_patterns or []):
+            self.add_pattern(pattern, '')
+        self.load_gitignore('')
+
+    @classmethod
+    def from_settings(cls, root):
+        patterns = QSettings("ZenithFlow", "IDE").value("exclude_patterns", "", type=str)
+        return cls(root, [p.strip() for p in patterns.split(',') if p.strip()])
+
+    @staticmethod
+    def translate(pattern):
+        parts = []
+        i = 0
+        while i < len(pattern):
+            if pattern.startswith('**/', i):
+                parts.append('(?:.*/)?')
+                i += 3
+            elif pattern.startswith('**', i):
+                parts.append('.*')
+                i += 2
+            elif pattern[i] == '*':
+                parts.append('[^/]*')
+                i += 1
+            elif pattern[i] == '?':
+                parts.append('[^/]')
+                i += 1
+            elif pattern[i] == '[':
+                close = pattern.find(']', i + 1)
+                if close < 0:
+                    parts.append(re.escape(pattern[i]))
+                    i += 1
+                else:
+                    body = pattern[i + 1:close]
+                    if body.startswith('!'):
+                        body = '^' + body[1:]
+                    parts.append(f'[{body}]')
+                    i = close + 1
+            else:
+                parts.append(re.escape(pattern[i]))
+                i += 1
+        return ''.join(parts)
+
+    def add_pattern(self, pattern, base):
+        pattern = pattern.rstrip('\n').rstrip()
+        if not pattern or pattern.startswith('#'):
+            return
+        negate = pattern.startswith('!')
+        if negate:
+            pattern = pattern[1:]
+        dir_only = pattern.endswith('/')
+        pattern = pattern.rstrip('/')
+        anchored = '/' in pattern
+        pattern = pattern.lstrip('/')
+        body = self.translate(pattern)
+        prefix = re.escape(base + '/') if base else ''
+        if not anchored:
+            prefix += '(?:.*/)?'
+        regex = re.compile(f'^{prefix}{body}$')
+        self.rules.append((regex, negate, dir_only))
+
+    def load_gitignore(self, rel_dir):
+        if rel_dir in self._loaded_dirs:
+            return
+        self._loaded_dirs.add(rel_dir)
+        path = os.path.join(self.root, rel_dir, '.gitignore')
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    self.add_pattern(line, rel_dir)
+        except OSError:
+            pass
+
+    def matches(self, rel_path, is_dir):
+        ignored = False
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                ignored = not negate
+        return ignored
+
+    def is_ignored(self, path, is_dir=False):
+        rel = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, '/')
+        if rel == '.':
+            return False
+        if rel.startswith('../'):
+            return True
+        parts = rel.split('/')
+        for depth in range(1, len(parts)):
+            self.load_gitignore('/'.join(parts[:depth - 1]))
+            if self.matches('/'.join(parts[:depth]), True):
+                return True
+        self.load_gitignore('/'.join(parts[:-1]))
+        return self.matches(rel, is_dir)
+
+    def walk(self, cancel=None, start=''):
+        """Yields non-ignored file paths below the root, or below ``start`` relative to it."""
+        stack = [start]
+        while stack:
+            if cancel is not None and cancel.is_set():
+                return
+            rel_dir = stack.pop()
+            self.load_gitignore(rel_dir)
+            try:
+                entries = list(os.scandir(os.path.join(self.root, rel_dir)))
+            except OSError:
+                continue
+            for entry in entries:
+                rel = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if self.matches(rel, is_dir):
+                    continue
+                if is_dir:
+                    stack.append(rel)
+                elif entry.is_file():
+                    yield entry.path
+
+
+class ExplorerNode:
+
+    def __init__(self, name, path, rel, is_dir, parent=None, row=0):
+        self.name = name
+        self.path = path
+        self.rel = rel
+        self.is_dir = is_dir
+        self.parent = parent
+        self.row = row
+        self.children = []
+        self.pending = []
+        self.listed = False
+        self.listing = False
+        self.stat = None
+        self.stat_pending = False
+
+    def sort_key(self):
+        return (not self.is_dir, self.name.lower())
+
+
+def list_workspace_directory(ignore, path, rel):
+    """Sorted (name, is_dir) of a directory, ignore rules applied before anything is stat'ed."""
+    ignore.load_gitignore(rel)
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            child_rel = f'{rel}/{entry.name}' if rel else entry.name
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                continue
+            if not ignore.matches(child_rel, is_dir):
+                entries.append((entry.name, is_dir))
+    entries.sort(key=lambda e: (not e[1], e[0].lower()))
+    return entries
+
+
+class WorkspaceTreeModel(QAbstractItemModel):
+    """Lazy workspace tree for huge repositories.
+
+    Directories are listed on a worker thread the first time the view asks for
+    their rows, with WorkspaceIgnore applied to d_type information so ignored
+    trees are never entered or stat'ed. Rows are handed to the view BATCH_SIZE at
+    a time through fetchMore. Sizes and mtimes are stat'ed off-thread only when a
+    tooltip asks for them, and only directories the view has expanded are watched.
+    """
+
+    listed = pyqtSignal(object, int, object)
+    stat_ready = pyqtSignal(object, int, object)
+
+    BATCH_SIZE = 1000
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.root = None
+        self.ignore = None
+        self.lister = ThreadPoolExecutor(max_workers=1)
+        self.stater = ThreadPoolExecutor(max_workers=2)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.on_directory_changed)
+        self.watched = {}
+        self.icons = QFileIconProvider()
+        self.folder_icon = self.icons.icon(QFileIconProvider.IconType.Folder)
+        self.file_icon = self.icons.icon(QFileIconProvider.IconType.File)
+        self.listed.connect(self.on_listed)
+        self.stat_ready.connect(self.on_stat_ready)
+
+    def set_root(self, path):
+        path = os.path.abspath(path)
+        self.beginResetModel()
+        self.generation += 1
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.watched = {}
+        self.root = ExplorerNode(os.path.basename(path) or path, path, '', True)
+        self.ignore = WorkspaceIgnore.from_settings(path)
+        self.endResetModel()
+        self.watch_node(self.root)
+        self.request_listing(self.root)
+
+    def root_path(self):
+        return self.root.path if self.root is not None else None
+
+    def node(self, index):
+        return index.internalPointer() if index.isValid() else self.root
+
+    def file_path(self, index):
+        node = self.node(index)
+        return node.path if node is not None else None
+
+    def index_of(self, node):
+        if node is None or node is self.root:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, node)
+
+    def index(self, row, column, parent=QModelIndex()):
+        node = self.node(parent)
+        if node is None or column != 0 or not 0 <= row < len(node.children):
+            return QModelIndex()
+        return self.createIndex(row, 0, node.children[row])
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        return self.index_of(index.internalPointer().parent)
+
+    def rowCount(self, parent=QModelIndex()):
+        node = self.node(parent)
+        return len(node.children) if node is not None else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.node(parent)
+        if node is None or not node.is_dir:
+            return False
+        return not node.listed or bool(node.children or node.pending)
+
+    def canFetchMore(self, parent):
+        node = self.node(parent)
+        return node is not None and node.is_dir and (
+            (not node.listed and not node.listing) or bool(node.pending))
+
+    def fetchMore(self, parent):
+        node = self.node(parent)
+        if node is None:
+            return
+        if not node.listed:
+            self.request_listing(node)
+        elif node.pending:
+            self.insert_batch(node)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return node.name
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.folder_icon if node.is_dir else self.file_icon
+        if role == Qt.ItemDataRole.ToolTipRole:
+            if node.stat is None:
+                self.request_stat(node)
+                return node.rel
+            size, mtime = node.stat
+            when = QDateTime.fromSecsSinceEpoch(int(mtime)).toString("yyyy-MM-dd HH:mm")
+            if node.is_dir:
+                return f"{node.rel}\n{when}"
+            return f"{node.rel}\n{size:,} بایت · {when}"
+        return None
+
+    def request_listing(self, node):
+        if node.listing:
+            return
+        node.listing = True
+        generation = self.generation
+        ignore = self.ignore
+
+        def work():
+            try:
+                entries = list_workspace_directory(ignore, node.path, node.rel)
+            except OSError:
+                entries = []
+            self.listed.emit(node, generation, entries)
+        self.lister.submit(work)
+
+    def make_child(self, node, name, is_dir, row=0):
+        rel = f'{node.rel}/{name}' if node.rel else name
+        return ExplorerNode(name, os.path.join(node.path, name), rel, is_dir, node, row)
+
+    def is_attached(self, node):
+        while node is not self.root:
+            parent = node.parent
+            if parent is None or parent.children[node.row:node.row + 1] != [node]:
+                return False
+            node = parent
+        return True
+
+    def on_listed(self, node, generation, entries):
+        if generation != self.generation or not self.is_attached(node):
+            return
+        node.listing = False
+        if not node.listed:
+            node.listed = True
+            node.pending = [self.make_child(node, name, is_dir) for name, is_dir in entries]
+            if node.pending:
+                self.insert_batch(node)
+            elif node is not self.root:
+                parent = self.index_of(node)
+                self.dataChanged.emit(parent, parent)
+            return
+        self.merge_listing(node, entries)
+
+    def insert_batch(self, node):
+        batch = node.pending[:self.BATCH_SIZE]
+        del node.pending[:self.BATCH_SIZE]
+        first = len(node.children)
+        for offset, child in enumerate(batch):
+            child.row = first + offset
+        self.beginInsertRows(self.index_of(node), first, first + len(batch) - 1)
+        node.children.extend(batch)
+        self.endInsertRows()
+
+    def merge_listing(self, node, entries):
+        """Applies a re-listing after a change notification as row removals and insertions."""
+        current = {(child.name, child.is_dir) for child in node.children}
+        current.update((child.name, child.is_dir) for child in node.pending)
+        fresh = set(entries)
+        parent = self.index_of(node)
+        node.pending = [child for child in node.pending if (child.name, child.is_dir) in fresh]
+        for row in range(len(node.children) - 1, -1, -1):
+            child = node.children[row]
+            if (child.name, child.is_dir) not in fresh:
+                self.beginRemoveRows(parent, row, row)
+                del node.children[row]
+                for later in node.children[row:]:
+                    later.row -= 1
+                self.endRemoveRows()
+                self.unwatch_path(child.path)
+        for name, is_dir in entries:
+            if (name, is_dir) in current:
+                continue
+            child = self.make_child(node, name, is_dir)
+            key = child.sort_key()
+            if node.pending and key > node.children[-1].sort_key():
+                keys = [c.sort_key() for c in node.pending]
+                node.pending.insert(bisect.bisect(keys, key), child)
+                continue
+            row = bisect.bisect([c.sort_key() for c in node.children], key)
+            child.row = row
+            self.beginInsertRows(parent, row, row)
+            node.children.insert(row, child)
+            for later in node.children[row + 1:]:
+                later.row += 1
+            self.endInsertRows()
+
+    def find_node(self, path):
+        """The loaded node for path, or None when it is outside the root or not listed yet."""
+        path = os.path.abspath(path)
+        node = self.root
+        if node is None or path == node.path:
+            return node
+        if not path.startswith(os.path.join(node.path, '')):
+            return None
+        for name in path[len(os.path.join(node.path, '')):].split(os.sep):
+            node = next((child for child in node.children if child.name == name), None)
+            if node is None:
+                return None
+        return node
+
+    def refresh(self, path=None, recursive=False):
+        """Re-lists loaded directories in place; expanded nodes and their watches are kept."""
+        node = self.root if path is None else self.find_node(path)
+        stack = [node] if node is not None and node.is_dir else []
+        while stack:
+            node = stack.pop()
+            if not node.listed:
+                continue
+            self.request_listing(node)
+            if recursive:
+                stack.extend(child for child in node.children if child.is_dir)
+
+    def request_stat(self, node):
+        if node.stat_pending:
+            return
+        node.stat_pending = True
+        generation = self.generation
+
+        def work():
+            try:
+                st = os.stat(node.path)
+            except OSError:
+                return
+            self.stat_ready.emit(node, generation, (st.st_size, st.st_mtime))
+        self.stater.submit(work)
+
+    def on_stat_ready(self, node, generation, stat):
+        if generation != self.generation or not self.is_attached(node):
+            return
+        node.stat = stat
+        node.stat_pending = False
+        index = self.index_of(node)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.ToolTipRole])
+
+    def watch_node(self, node):
+        if node.is_dir and node.path not in self.watched:
+            self.watched[node.path] = node
+            self.watcher.addPath(node.path)
+
+    def watch(self, index):
+        self.watch_node(self.node(index))
+
+    def unwatch(self, index):
+        node = self.node(index)
+        if node is not self.root:
+            self.unwatch_path(node.path)
+
+    def unwatch_path(self, path):
+        prefix = path + os.sep
+        for watched in [p for p in self.watched if p == path or p.startswith(prefix)]:
+            del self.watched[watched]
+            self.watcher.removePath(watched)
+
+    def on_directory_changed(self, path):
+        node = self.watched.get(path)
+        if node is None:
+            return
+        if not os.path.isdir(path):
+            self.unwatch_path(path)
+            return
+        if node.listed:
+            self.request_listing(node)
+
+    def shutdown(self):
+        self.generation += 1
+        self.lister.shutdown(wait=False, cancel_futures=True)
+        self.stater.shutdown(wait=False, cancel_futures=True)
+
+
+def is_binary_file(path, sample_size=8192):
+    try:
+        with open(path, 'rb') as f:
+            return b'\0' in f.read(sample_size)
+    except OSError:
+        return True
+
+
+
+class FileExplorer(QWidget):
+
+    
+    file_open_request = pyqtSignal(str)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.current_root = os.getcwd()
+        self.setup_ui()
         
-    def execute_command(self):
-        cmd = self.input.text().strip()
-        if not cmd:
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        toolbar = QToolBar()
+        refresh_btn = QPushButton("🔄")
+        refresh_btn.setFixedSize(30, 30)
+        refresh_btn.clicked.connect(self.refresh)
+        toolbar.addWidget(refresh_btn)
+        
+        new_file_btn = QPushButton("📄")
+        new_file_btn.setFixedSize(30, 30)
+        new_file_btn.clicked.connect(self.new_file)
+        toolbar.addWidget(new_file_btn)
+        
+        new_folder_btn = QPushButton("📁")
+        new_folder_btn.setFixedSize(30, 30)
+        new_folder_btn.clicked.connect(self.new_folder)
+        toolbar.addWidget(new_folder_btn)
+        
+        layout.addWidget(toolbar)
+        
+
+        self.tree = QTreeView()
+        self.model = WorkspaceTreeModel(self)
+        self.model.set_root(self.current_root)
+        self.tree.setModel(self.model)
+        self.tree.setHeaderHidden(True)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setAnimated(True)
+        self.tree.setIndentation(20)
+        self.tree.doubleClicked.connect(self.on_double_click)
+        self.tree.expanded.connect(self.on_expanded)
+        self.tree.collapsed.connect(self.model.unwatch)
+        
+        layout.addWidget(self.tree)
+        self.setLayout(layout)
+        
+    def set_root(self, path):
+        if os.path.abspath(path) == self.model.root_path():
+            return
+        self.current_root = path
+        self.model.set_root(path)
+
+    def root_path(self):
+        return self.current_root
+        
+    def refresh(self):
+        self.model.refresh(recursive=True)
+
+    def on_expanded(self, index):
+        """Watches the expanded directory and any still-expanded descendants the view re-shows."""
+        self.model.watch(index)
+        for row in range(self.model.rowCount(index)):
+            child = self.model.index(row, 0, index)
+            if self.tree.isExpanded(child):
+                self.on_expanded(child)
+        
+    def new_file(self):
+        path, ok = QInputDialog.getText(self, "فایل جدید", "نام فایل:")
+        if ok and path:
+            if not path.endswith('.py'):
+                path += '.py'
+            full_path = os.path.join(self.root_path(), path)
+            try:
+                with open(full_path, 'w', encoding='utf-8') as f:
+                    f.write('# -*- coding: utf-8 -*-\n\n')
+                self.model.refresh(os.path.dirname(full_path))
+            except Exception as e:
+                QMessageBox.critical(self, "خطا", str(e))
+                
+    def new_folder(self):
+        name, ok = QInputDialog.getText(self, "پوشه جدید", "نام پوشه:")
+        if ok and name:
+            try:
+                full_path = os.path.normpath(os.path.join(self.root_path(), name))
+                os.mkdir(full_path)
+                self.model.refresh(os.path.dirname(full_path))
+            except Exception as e:
+                QMessageBox.critical(self, "خطا", str(e))
+                
+    def on_double_click(self, index):
+        path = self.model.file_path(index)
+        if os.path.isfile(path):
+            self.file_open_request.emit(path)
+
+
+
+class OutputPanel(QWidget):
+   
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        self.output = OutputView("output")
+        layout.addWidget(self.output)
+        
+        clear_btn = QPushButton("🗑️ پاک کردن")
+        clear_btn.clicked.connect(self.output.clear)
+        layout.addWidget(clear_btn)
+        
+        self.setLayout(layout)
+        
+    def append(self, text, stream='stdout'):
+        self.output.append(text, stream)
+
+
+
+class Utf16Index:
+    """Maps between Python string indices and QTextDocument (UTF-16) positions."""
+
+    ASTRAL_RE = re.compile('[\U00010000-\U0010FFFF]')
+
+    def __init__(self, text):
+        if text.isascii():
+            self.astral = []
+        else:
+            self.astral = [m.start() for m in self.ASTRAL_RE.finditer(text)]
+        self.astral_qt = [index + n for n, index in enumerate(self.astral)]
+
+    def to_qt(self, index):
+        if not self.astral:
+            return index
+        return index + bisect.bisect_left(self.astral, index)
+
+    def from_qt(self, position):
+        if not self.astral:
+            return position
+        return position - bisect.bisect_left(self.astral_qt, position - 1)
+
+
+def build_search_pattern(query, regex=False, whole_word=False, case_sensitive=False):
+    pattern = query if regex else re.escape(query)
+    if whole_word:
+        pattern = rf"\b(?:{pattern})\b"
+    flags = re.MULTILINE
+    if not case_sensitive:
+        flags |= re.IGNORECASE
+    return re.compile(pattern, flags)
+
+
+class DocumentSearch(QObject):
+    """Finds all matches in a text snapshot on a worker thread, streaming them in batches."""
+
+    batch = pyqtSignal(int, object)
+    done = pyqtSignal(int, int)
+
+    BATCH_SIZE = 2000
+    BATCH_SECONDS = 0.05
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+        self.generation += 1
+
+    def start(self, pattern, text):
+        self.cancel()
+        self._cancel = threading.Event()
+        thread = threading.Thread(
+            target=self._run, args=(self.generation, pattern, text, self._cancel), daemon=True)
+        thread.start()
+        return self.generation
+
+    def _run(self, generation, pattern, text, cancel):
+        index = Utf16Index(text)
+        to_qt = index.to_qt
+        found = []
+        count = 0
+        flushed_at = time.perf_counter()
+        for match in pattern.finditer(text):
+            if cancel.is_set():
+                return
+            start, end = match.span()
+            if start == end:
+                continue
+            found.append((to_qt(start), to_qt(end)))
+            if len(found) >= self.BATCH_SIZE or time.perf_counter() - flushed_at > self.BATCH_SECONDS:
+                count += len(found)
+                self.batch.emit(generation, found)
+                found = []
+                flushed_at = time.perf_counter()
+        if cancel.is_set():
+            return
+        count += len(found)
+        if found:
+            self.batch.emit(generation, found)
+        self.done.emit(generation, count)
+
+
+class FindBar(QWidget):
+    """Incremental find/replace for the current editor."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.editor = None
+        self.pattern = None
+        self.starts = []
+        self.ends = []
+        self.complete = False
+        self.current = -1
+        self.search = DocumentSearch(self)
+        self.search.batch.connect(self.on_batch)
+        self.search.done.connect(self.on_done)
+
+        self.research_timer = QTimer(self)
+        self.research_timer.setSingleShot(True)
+        self.research_timer.setInterval(150)
+        self.research_timer.timeout.connect(self.start_search)
+
+        self.visible_timer = QTimer(self)
+        self.visible_timer.setSingleShot(True)
+        self.visible_timer.setInterval(0)
+        self.visible_timer.timeout.connect(self.refresh_visible)
+
+        self.setup_ui()
+        self.hide()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(4, 2, 4, 2)
+
+        find_row = QHBoxLayout()
+        self.find_input = QLineEdit()
+        self.find_input.setPlaceholderText("جستجو")
+        self.find_input.textChanged.connect(self.schedule_search)
+        self.find_input.returnPressed.connect(self.find_next)
+        find_row.addWidget(self.find_input, 1)
+
+        self.case_check = QCheckBox("Aa")
+        self.word_check = QCheckBox("کلمه کامل")
+        self.regex_check = QCheckBox("Regex")
+        for check in (self.case_check, self.word_check, self.regex_check):
+            check.toggled.connect(self.schedule_search)
+            find_row.addWidget(check)
+
+        self.count_label = QLabel("")
+        self.count_label.setMinimumWidth(90)
+        find_row.addWidget(self.count_label)
+
+        prev_btn = QPushButton("▲")
+        prev_btn.clicked.connect(self.find_previous)
+        find_row.addWidget(prev_btn)
+        next_btn = QPushButton("▼")
+        next_btn.clicked.connect(self.find_next)
+        find_row.addWidget(next_btn)
+        close_btn = QPushButton("✕")
+        close_btn.clicked.connect(self.close_bar)
+        find_row.addWidget(close_btn)
+        layout.addLayout(find_row)
+
+        self.replace_row = QWidget()
+        replace_layout = QHBoxLayout()
+        replace_layout.setContentsMargins(0, 0, 0, 0)
+        self.replace_input = QLineEdit()
+        self.replace_input.setPlaceholderText("جایگزین")
+        replace_layout.addWidget(self.replace_input, 1)
+        replace_btn = QPushButton("جایگزینی")
+        replace_btn.clicked.connect(self.replace_current)
+        replace_layout.addWidget(replace_btn)
+        replace_all_btn = QPushButton("جایگزینی همه")
+        replace_all_btn.clicked.connect(self.replace_all)
+        replace_layout.addWidget(replace_all_btn)
+        self.replace_row.setLayout(replace_layout)
+        layout.addWidget(self.replace_row)
+
+        self.setLayout(layout)
+
+        QShortcut(QKeySequence("Escape"), self, self.close_bar)
+        QShortcut(QKeySequence("Shift+Return"), self.find_input, self.find_previous)
+
+    def open(self, editor, replace=False):
+        self.set_editor(editor)
+        self.replace_row.setVisible(replace)
+        selected = editor.textCursor().selectedText()
+        if selected and ' ' not in selected:
+            self.find_input.setText(selected)
+        self.show()
+        self.find_input.setFocus()
+        self.find_input.selectAll()
+        self.start_search()
+
+    def close_bar(self):
+        self.search.cancel()
+        if self.editor is not None:
+            self.editor.set_extra_selections('find', [])
+            self.editor.setFocus()
+        self.hide()
+
+    def set_editor(self, editor):
+        if editor is self.editor:
+            return
+        if self.editor is not None:
+            self.editor.set_extra_selections('find', [])
+            self.editor.document().contentsChanged.disconnect(self.schedule_search)
+            self.editor.verticalScrollBar().valueChanged.disconnect(self.schedule_visible)
+        self.editor = editor
+        if editor is not None:
+            editor.document().contentsChanged.connect(self.schedule_search)
+            editor.verticalScrollBar().valueChanged.connect(self.schedule_visible)
+            editor.destroyed.connect(self._on_editor_destroyed)
+        if self.isVisible():
+            self.start_search()
+
+    def _on_editor_destroyed(self, *_):
+        self.editor = None
+        self.search.cancel()
+
+    def schedule_search(self, *_):
+        if self.isVisible():
+            self.research_timer.start()
+
+    def schedule_visible(self, *_):
+        self.visible_timer.start()
+
+    def start_search(self):
+        self.starts = []
+        self.ends = []
+        self.current = -1
+        self.complete = False
+        query = self.find_input.text()
+        if self.editor is None or not query:
+            self.search.cancel()
+            self.pattern = None
+            self.count_label.setText("")
+            self.refresh_visible()
+            return
+        try:
+            self.pattern = build_search_pattern(
+                query, self.regex_check.isChecked(), self.word_check.isChecked(),
+                self.case_check.isChecked())
+        except re.error as e:
+            self.search.cancel()
+            self.pattern = None
+            self.count_label.setText("❌ regex")
+            self.count_label.setToolTip(str(e))
+            self.refresh_visible()
+            return
+        self.count_label.setToolTip("")
+        self.search.start(self.pattern, self.editor.toPlainText())
+        self.update_count()
+
+    def on_batch(self, generation, matches):
+        if generation != self.search.generation:
+            return
+        for start, end in matches:
+            self.starts.append(start)
+            self.ends.append(end)
+        self.update_count()
+        self.schedule_visible()
+
+    def on_done(self, generation, count):
+        if generation != self.search.generation:
+            return
+        self.complete = True
+        self.update_count()
+        self.schedule_visible()
+
+    def update_count(self):
+        total = len(self.starts)
+        suffix = "" if self.complete else "+"
+        if self.current >= 0:
+            self.count_label.setText(f"{self.current + 1}/{total}{suffix}")
+        else:
+            self.count_label.setText(f"{total}{suffix} مورد")
+
+    def refresh_visible(self):
+        editor = self.editor
+        if editor is None:
+            return
+        if not self.starts:
+            editor.set_extra_selections('find', [])
+            return
+        first = editor.firstVisibleBlock().position()
+        viewport = editor.viewport()
+        last = editor.cursorForPosition(QPoint(viewport.width(), viewport.height())).block()
+        last = last.position() + last.length()
+        lo = max(0, bisect.bisect_left(self.ends, first))
+        hi = bisect.bisect_right(self.starts, last)
+
+        theme = ThemeManager().theme
+        match_color = QColor(theme['secondary'])
+        match_color.setAlpha(80)
+        current_color = QColor(theme['primary'])
+        current_color.setAlpha(140)
+        document = editor.document()
+        selections = []
+        for i in range(lo, hi):
+            selection = QTextEdit.ExtraSelection()
+            selection.format.setBackground(current_color if i == self.current else match_color)
+            cursor = QTextCursor(document)
+            cursor.setPosition(self.starts[i])
+            cursor.setPosition(self.ends[i], QTextCursor.MoveMode.KeepAnchor)
+            selection.cursor = cursor
+            selections.append(selection)
+        editor.set_extra_selections('find', selections)
+
+    def select_match(self, index):
+        if not self.starts or self.editor is None:
+            return
+        self.current = index % len(self.starts)
+        cursor = self.editor.textCursor()
+        cursor.setPosition(self.starts[self.current])
+        cursor.setPosition(self.ends[self.current], QTextCursor.MoveMode.KeepAnchor)
+        self.editor.setTextCursor(cursor)
+        self.editor.ensureCursorVisible()
+        self.update_count()
+        self.refresh_visible()
+
+    def find_next(self):
+        if self.editor is None or not self.starts:
+            return
+        position = self.editor.textCursor().selectionEnd()
+        self.select_match(bisect.bisect_left(self.starts, position))
+
+    def find_previous(self):
+        if self.editor is None or not self.starts:
+            return
+        position = self.editor.textCursor().selectionStart()
+        self.select_match(bisect.bisect_left(self.starts, position) - 1)
+
+    def expand(self, match):
+        replacement = self.replace_input.text()
+        return match.expand(replacement) if self.regex_check.isChecked() else replacement
+
+    def replace_current(self):
+        if self.editor is None or self.pattern is None:
+            return
+        cursor = self.editor.textCursor()
+        match = self.pattern.fullmatch(cursor.selectedText()) if cursor.hasSelection() else None
+        if match is None:
+            self.find_next()
+            return
+        try:
+            cursor.insertText(self.expand(match))
+        except re.error as e:
+            QMessageBox.warning(self, "جایگزینی", str(e))
+            return
+        self.editor.setTextCursor(cursor)
+        self.research_timer.stop()
+        self.start_search()
+        self.find_next()
+
+    def replace_all(self):
+        if self.editor is None or self.pattern is None:
+            return
+        text = self.editor.toPlainText()
+        pieces = []
+        first = last = None
+        count = 0
+        try:
+            for match in self.pattern.finditer(text):
+                start, end = match.span()
+                if start == end:
+                    continue
+                if first is None:
+                    first = start
+                else:
+                    pieces.append(text[last:start])
+                pieces.append(self.expand(match))
+                last = end
+                count += 1
+        except re.error as e:
+            QMessageBox.warning(self, "جایگزینی", str(e))
+            return
+        if not count:
+            return
+        index = Utf16Index(text)
+        self.editor.replace_range(index.to_qt(first), index.to_qt(last), ''.join(pieces))
+        self.research_timer.stop()
+        self.start_search()
+        if self.editor.window() is not None:
+            status = self.editor.window().statusBar()
+            if status is not None:
+                status.showMessage(f"{count} مورد جایگزین شد", 3000)
+
+
+
+class FindInFilesSearch(QObject):
+    """Scans workspace files with a thread pool and queues matches for batched delivery."""
+
+    MAX_RESULTS = 20000
+    MAX_FILE_MATCHES = 1000
+    CHUNK_BYTES = 2 << 20
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.results = queue.Queue()
+        self.finished_generation = -1
+        self._cancel = threading.Event()
+        self._executor = None
+
+    def cancel(self):
+        self._cancel.set()
+        self.generation += 1
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def start(self, ignore, pattern, include=None, files=None):
+        self.cancel()
+        self._cancel = threading.Event()
+        self.results = queue.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=min(8, (os.cpu_count() or 2) + 2))
+        thread = threading.Thread(
+            target=self._run,
+            args=(self.generation, ignore, pattern, include, files,
+                  self._cancel, self._executor, self.results),
+            daemon=True)
+        thread.start()
+        return self.generation
+
+    def _run(self, generation, ignore, pattern, include, files, cancel, executor, results):
+        counter = [0]
+        lock = threading.Lock()
+        futures = []
+        try:
+            if callable(files):
+                files = files()
+            paths = files if files is not None else ignore.walk(cancel)
+            for path in paths:
+                if cancel.is_set():
+                    break
+                if include and not any(fnmatch.fnmatch(os.path.basename(path), g) for g in include):
+                    continue
+                futures.append(executor.submit(
+                    self._scan_file, path, pattern, cancel, results, counter, lock))
+            for future in futures:
+                if cancel.is_set():
+                    break
+                try:
+                    future.result()
+                except CancelledError:
+                    pass
+        except RuntimeError:
+            return
+        if not cancel.is_set():
+            results.put((None, counter[0] >= self.MAX_RESULTS))
+        self.finished_generation = generation
+
+    def _scan_file(self, path, pattern, cancel, results, counter, lock):
+        if cancel.is_set() or counter[0] >= self.MAX_RESULTS:
+            return
+        matches = []
+        try:
+            with open(path, 'rb') as f:
+                data = f.read(8192)
+                if b'\0' in data:
+                    return
+                line_no = 1
+                # Files are read in newline-aligned chunks so a huge log never sits in memory whole.
+                while data:
+                    more = f.read(self.CHUNK_BYTES)
+                    data += more
+                    cut = (data.rfind(b'\n') + 1 or len(data)) if more else len(data)
+                    chunk, data = data[:cut], data[cut:]
+                    line_no = self._collect(chunk.decode('utf-8', 'replace'), pattern, line_no, matches)
+                    if len(matches) >= self.MAX_FILE_MATCHES or cancel.is_set():
+                        break
+        except OSError:
+            return
+        if not matches:
+            return
+        with lock:
+            if counter[0] >= self.MAX_RESULTS:
+                return
+            counter[0] += len(matches)
+        results.put((path, matches))
+
+    @classmethod
+    def _collect(cls, text, pattern, first_line, matches):
+        """Appends (line, column, line text) matches of text; returns the line number after it."""
+        line_no = first_line
+        scanned = 0
+        for match in pattern.finditer(text):
+            start = match.start()
+            if match.end() == start:
+                continue
+            line_no += text.count('\n', scanned, start)
+            scanned = start
+            line_start = text.rfind('\n', 0, start) + 1
+            line_end = text.find('\n', start)
+            if line_end < 0:
+                line_end = len(text)
+            matches.append((line_no, start - line_start, text[line_start:line_end].strip()[:300]))
+            if len(matches) >= cls.MAX_FILE_MATCHES:
+                break
+        return first_line + text.count('\n')
+
+
+def extract_trigrams(path, max_size=2 << 20):
+    """Returns (path, mtime_ns, size, trigrams); trigrams is None for unindexable files."""
+    try:
+        st = os.stat(path)
+        if st.st_size > max_size:
+            return path, st.st_mtime_ns, st.st_size, None
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return path, 0, 0, None
+    if b'\0' in data[:8192]:
+        return path, st.st_mtime_ns, st.st_size, ()
+    data = data.lower()
+    grams = {data[i:i + 3] for i in range(len(data) - 2)}
+    return path, st.st_mtime_ns, st.st_size, [int.from_bytes(g, 'big') for g in grams]
+
+
+def query_trigrams(literal):
+    data = literal.lower().encode('utf-8')
+    grams = set()
+    for i in range(len(data) - 2):
+        gram = data[i:i + 3]
+        # Only ASCII is case-folded by the index, so other bytes cannot narrow safely.
+        if max(gram) < 0x80:
+            grams.add(int.from_bytes(gram, 'big'))
+    return grams
+
+
+def regex_literal_alternatives(pattern):
+    """Literal runs every match must contain, one list per top-level alternative."""
+    try:
+        parsed = sre_parse.parse(pattern)
+    except (re.error, RecursionError):
+        return None
+
+    def literals_of(items):
+        runs = []
+        current = []
+        for op, av in items:
+            if op is sre_parse.LITERAL:
+                current.append(chr(av))
+                continue
+            if current:
+                runs.append(''.join(current))
+                current = []
+            if op is sre_parse.SUBPATTERN:
+                runs.extend(literals_of(av[-1]))
+            elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+                runs.extend(literals_of(av[2]))
+        if current:
+            runs.append(''.join(current))
+        return runs
+
+    items = list(parsed)
+    if len(items) == 1 and items[0][0] is sre_parse.BRANCH:
+        alternatives = [literals_of(branch) for branch in items[0][1][1]]
+    else:
+        alternatives = [literals_of(items)]
+    for literals in alternatives:
+        if not any(query_trigrams(literal) for literal in literals):
+            return None
+    return alternatives
+
+
+class TrigramIndex(QObject):
+    """Persistent per-workspace trigram index used to narrow Find in Files candidates.
+
+    Postings are stored per segment as zlib-compressed delta-encoded file ids; edits
+    add small segments which are merged once there are too many of them.
+
+    The file set comes from ``files`` (the shared WorkspaceFileList in the IDE),
+    whose additions, removals and saves arrive through notify_changed. Nothing is
+    watched here; in-place writes from other programs are caught by an idle-time
+    sweep that re-stats known files a batch at a time.
+    """
+
+    ready = pyqtSignal()
+    progress = pyqtSignal(int, int)
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS files(
+            id INTEGER PRIMARY KEY, path TEXT UNIQUE, mtime_ns INTEGER, size INTEGER,
+            indexed INTEGER);
+        CREATE TABLE IF NOT EXISTS segments(id INTEGER PRIMARY KEY, files INTEGER);
+        CREATE TABLE IF NOT EXISTS postings(
+            tri INTEGER, seg INTEGER, count INTEGER, ids BLOB,
+            PRIMARY KEY(tri, seg)) WITHOUT ROWID;
+    """
+    SEGMENT_FILES = 5000
+    MAX_SEGMENTS = 16
+    NARROW_ENOUGH = 32
+    SWEEP_BATCH = 2000
+    # indexed column: 1 = postings stored, 0 = too large (always verified), -1 = binary.
+    INDEXED, UNINDEXED, BINARY = 1, 0, -1
+
+    def __init__(self, root, parent=None, files=None):
+        super().__init__(parent)
+        self.root = os.path.abspath(root)
+        self.file_source = files
+        digest = hashlib.sha1(self.root.encode('utf-8')).hexdigest()[:16]
+        self.db_path = os.path.join(app_data_dir('index'), f'{digest}.sqlite')
+        self.paths = {}
+        self.unindexed = set()
+        self.is_ready = False
+        self.last_query_ms = None
+        self._lock = threading.Lock()
+        self._changes = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._sweep_after = 0
+
+    def covers(self, path):
+        path = os.path.abspath(path)
+        return path == self.root or path.startswith(self.root + os.sep)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._main, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._changes.put(None)
+        if self._thread is not None:
+            self._thread.join(2)
+
+    def notify_changed(self, paths):
+        for path in paths:
+            if self.covers(path):
+                self._changes.put(os.path.abspath(path))
+
+    def _connect(self):
+        db = sqlite3.connect(self.db_path, timeout=30)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('PRAGMA synchronous=NORMAL')
+        return db
+
+    def _main(self):
+        try:
+            db = self._connect()
+        except sqlite3.Error:
+            return
+        try:
+            db.executescript(self.SCHEMA)
+            self._initial_sync(db)
+            if self._stop.is_set():
+                return
+            self.is_ready = True
+            self.ready.emit()
+            while not self._stop.is_set():
+                try:
+                    path = self._changes.get(timeout=1)
+                except queue.Empty:
+                    self._sweep(db)
+                    continue
+                if path is None:
+                    break
+                batch = {path}
+                deadline = time.monotonic() + 0.5
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        path = self._changes.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if path is None:
+                        return
+                    batch.add(path)
+                self._update(db, batch)
+        except sqlite3.Error:
+            pass
+        finally:
+            db.close()
+
+    def _initial_sync(self, db):
+        known = {}
+        for fid, path, mtime_ns, size, indexed in db.execute(
+                'SELECT id, path, mtime_ns, size, indexed FROM files'):
+            known[path] = (fid, mtime_ns, size, indexed)
+        if self.file_source is not None:
+            files = self.file_source(self._stop)
+        else:
+            files = WorkspaceIgnore.from_settings(self.root).walk(self._stop)
+        if files is None:
+            return
+        seen = set()
+        changed = []
+        for path in files:
+            seen.add(path)
+            entry = known.get(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            if entry is None or entry[1:3] != (st.st_mtime_ns, st.st_size):
+                changed.append(path)
+        if self._stop.is_set():
+            return
+        removed = [(entry[0],) for path, entry in known.items() if path not in seen]
+        with db:
+            db.executemany('DELETE FROM files WHERE id=?', removed)
+        with self._lock:
+            for path, (fid, _, _, indexed) in known.items():
+                if path in seen:
+                    self._remember(fid, path, indexed)
+        if changed:
+            workers = max(1, (os.cpu_count() or 2) - 1)
+            # Spawned workers avoid forking a process that already runs Qt threads.
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                for i in range(0, len(changed), self.SEGMENT_FILES):
+                    if self._stop.is_set():
+                        pool.shutdown(wait=False, cancel_futures=True)
+                        return
+                    chunk = changed[i:i + self.SEGMENT_FILES]
+                    self._write_segment(db, pool.map(extract_trigrams, chunk, chunksize=64))
+                    self.progress.emit(min(i + self.SEGMENT_FILES, len(changed)), len(changed))
+        self._compact(db)
+
+    def _update(self, db, paths):
+        ignore = WorkspaceIgnore.from_settings(self.root)
+        paths = set(paths)
+        for path in [p for p in paths if os.path.isdir(p)]:
+            paths.discard(path)
+            if not ignore.is_ignored(path, True):
+                rel = os.path.relpath(path, self.root).replace(os.sep, '/')
+                paths.update(ignore.walk(self._stop, start=rel))
+        existing = {}
+        for path in paths:
+            row = db.execute(
+                'SELECT mtime_ns, size FROM files WHERE path=?', (path,)).fetchone()
+            existing[path] = row
+        stale = []
+        gone = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                gone.append(path)
+                continue
+            if ignore.is_ignored(path):
+                continue
+            if existing[path] != (st.st_mtime_ns, st.st_size):
+                stale.append(path)
+        if gone:
+            with db:
+                db.executemany('DELETE FROM files WHERE path=?', [(p,) for p in gone])
+            with self._lock:
+                self._forget(gone)
+        if stale:
+            self._write_segment(db, map(extract_trigrams, stale))
+            self._compact(db)
+
+    def _sweep(self, db):
+        """Re-stats the next batch of indexed files; changed ones are re-indexed."""
+        rows = db.execute('SELECT id, path, mtime_ns, size FROM files WHERE id > ? ORDER BY id LIMIT ?',
+                          (self._sweep_after, self.SWEEP_BATCH)).fetchall()
+        self._sweep_after = rows[-1][0] if len(rows) == self.SWEEP_BATCH else 0
+        changed = []
+        for _, path, mtime_ns, size in rows:
+            try:
+                st = os.stat(path)
+            except OSError:
+                changed.append(path)
+                continue
+            if (st.st_mtime_ns, st.st_size) != (mtime_ns, size):
+                changed.append(path)
+        if changed:
+            self._update(db, changed)
+
+    def _remember(self, fid, path, indexed):
+        if indexed == self.INDEXED:
+            self.paths[fid] = path
+        elif indexed == self.UNINDEXED:
+            self.unindexed.add(path)
+
+    def _forget(self, paths):
+        paths = set(paths)
+        self.unindexed -= paths
+        for fid in [fid for fid, path in self.paths.items() if path in paths]:
+            del self.paths[fid]
+
+    def _write_segment(self, db, results):
+        postings = {}
+        entries = []
+        for path, mtime_ns, size, grams in results:
+            if not mtime_ns and not size and grams is None:
+                continue
+            entries.append((path, mtime_ns, size, grams))
+        if not entries:
+            return
+        added = []
+        with db:
+            db.executemany('DELETE FROM files WHERE path=?', [(e[0],) for e in entries])
+            for path, mtime_ns, size, grams in entries:
+                if grams is None:
+                    indexed = self.UNINDEXED
+                elif not grams:
+                    indexed = self.BINARY
+                else:
+                    indexed = self.INDEXED
+                fid = db.execute(
+                    'INSERT INTO files(path, mtime_ns, size, indexed) VALUES (?, ?, ?, ?)',
+                    (path, mtime_ns, size, indexed)).lastrowid
+                added.append((fid, path, indexed))
+                for gram in grams or ():
+                    ids = postings.get(gram)
+                    if ids is None:
+                        postings[gram] = array('I', [fid])
+                    else:
+                        ids.append(fid)
+            if postings:
+                self._store_postings(db, postings, len(entries))
+        with self._lock:
+            self._forget([path for _, path, _ in added])
+            for fid, path, indexed in added:
+                self._remember(fid, path, indexed)
+
+    @staticmethod
+    def encode_ids(ids):
+        deltas = array('I', ids)
+        for i in range(len(deltas) - 1, 0, -1):
+            deltas[i] -= deltas[i - 1]
+        return zlib.compress(deltas.tobytes(), 1)
+
+    @staticmethod
+    def decode_ids(blob):
+        deltas = array('I')
+        deltas.frombytes(zlib.decompress(blob))
+        return itertools.accumulate(deltas)
+
+    def _store_postings(self, db, postings, file_count):
+        seg = db.execute('INSERT INTO segments(files) VALUES (?)', (file_count,)).lastrowid
+        db.executemany(
+            'INSERT INTO postings(tri, seg, count, ids) VALUES (?, ?, ?, ?)',
+            ((gram, seg, len(ids), self.encode_ids(ids)) for gram, ids in postings.items()))
+
+    def _compact(self, db):
+        while self._merge_smallest(db):
+            pass
+
+    def _merge_smallest(self, db):
+        segments = db.execute('SELECT id, files FROM segments ORDER BY files').fetchall()
+        if len(segments) <= self.MAX_SEGMENTS:
+            return False
+        merge = []
+        total = 0
+        for seg, files in segments:
+            if len(merge) >= 2 and total + files > self.SEGMENT_FILES:
+                break
+            merge.append(seg)
+            total += files
+        with self._lock:
+            alive = set(self.paths)
+        marks = ','.join('?' * len(merge))
+        postings = {}
+        for gram, blob in db.execute(
+                f'SELECT tri, ids FROM postings WHERE seg IN ({marks})', merge):
+            ids = [fid for fid in self.decode_ids(blob) if fid in alive]
+            if ids:
+                postings.setdefault(gram, []).extend(ids)
+        with db:
+            db.execute(f'DELETE FROM postings WHERE seg IN ({marks})', merge)
+            db.execute(f'DELETE FROM segments WHERE id IN ({marks})', merge)
+            if postings:
+                self._store_postings(
+                    db, {gram: sorted(ids) for gram, ids in postings.items()}, total)
+        return True
+
+    def candidates(self, query, regex=False, root=None):
+        """Paths that may match; None when the query cannot be narrowed by trigrams."""
+        self.last_query_ms = None
+        if not self.is_ready:
+            return None
+        if regex:
+            alternatives = regex_literal_alternatives(query)
+        else:
+            alternatives = [[query]] if query_trigrams(query) else None
+        if alternatives is None:
+            return None
+        started = time.perf_counter()
+        try:
+            db = sqlite3.connect(self.db_path, timeout=5)
+        except sqlite3.Error:
+            return None
+        try:
+            found = set()
+            for literals in alternatives:
+                grams = set()
+                for literal in literals:
+                    grams |= query_trigrams(literal)
+                found |= self._lookup(db, grams)
+        except sqlite3.Error:
+            return None
+        finally:
+            db.close()
+        with self._lock:
+            paths = [self.paths[fid] for fid in found if fid in self.paths]
+            paths.extend(self.unindexed)
+        if root is not None:
+            prefix = os.path.abspath(root).rstrip(os.sep) + os.sep
+            paths = [p for p in paths if p.startswith(prefix)]
+        self.last_query_ms = (time.perf_counter() - started) * 1000
+        return sorted(paths)
+
+    def _lookup(self, db, grams):
+        grams = list(grams)
+        marks = ','.join('?' * len(grams))
+        counts = dict(db.execute(
+            f'SELECT tri, SUM(count) FROM postings WHERE tri IN ({marks}) GROUP BY tri', grams))
+        if len(counts) < len(grams):
+            return set()
+        found = None
+        for gram in sorted(counts, key=counts.get):
+            ids = set()
+            for (blob,) in db.execute('SELECT ids FROM postings WHERE tri=?', (gram,)):
+                ids.update(self.decode_ids(blob))
+            found = ids if found is None else found & ids
+            # Verification is exact, so stop reading postings once the set is small.
+            if len(found) <= self.NARROW_ENOUGH:
+                break
+        return found
+
+
+class FindInFilesPanel(QWidget):
+
+    open_location = pyqtSignal(str, int, int)
+
+    def __init__(self, root_provider, index_provider=None, parent=None):
+        super().__init__(parent)
+        self.root_provider = root_provider
+        self.index_provider = index_provider
+        self.used_index = None
+        self.search = FindInFilesSearch(self)
+        self.search_generation = -1
+        self.match_count = 0
+        self.file_count = 0
+        self.started_at = 0.0
+
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(300)
+        self.debounce.timeout.connect(self.start_search)
+
+        self.drain_timer = QTimer(self)
+        self.drain_timer.setInterval(50)
+        self.drain_timer.timeout.connect(self.drain)
+
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        row = QHBoxLayout()
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("جستجو در فایل‌های پروژه")
+        self.query_input.textChanged.connect(self.schedule_search)
+        self.query_input.returnPressed.connect(self.start_search)
+        row.addWidget(self.query_input, 1)
+
+        self.include_input = QLineEdit()
+        self.include_input.setPlaceholderText("*.py, *.txt")
+        self.include_input.setFixedWidth(140)
+        self.include_input.textChanged.connect(self.schedule_search)
+        row.addWidget(self.include_input)
+
+        self.case_check = QCheckBox("Aa")
+        self.word_check = QCheckBox("کلمه کامل")
+        self.regex_check = QCheckBox("Regex")
+        for check in (self.case_check, self.word_check, self.regex_check):
+            check.toggled.connect(self.schedule_search)
+            row.addWidget(check)
+
+        stop_btn = QPushButton("⏹️")
+        stop_btn.setFixedSize(30, 30)
+        stop_btn.clicked.connect(self.stop)
+        row.addWidget(stop_btn)
+        layout.addLayout(row)
+
+        self.results = QTreeWidget()
+        self.results.setHeaderHidden(True)
+        self.results.setUniformRowHeights(True)
+        self.results.itemActivated.connect(self.on_item_activated)
+        self.results.itemDoubleClicked.connect(self.on_item_activated)
+        layout.addWidget(self.results, 1)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+
+    def focus_query(self, text=None):
+        if text:
+            self.query_input.setText(text)
+        self.query_input.setFocus()
+        self.query_input.selectAll()
+
+    def schedule_search(self, *_):
+        self.search.cancel()
+        self.debounce.start()
+
+    def stop(self):
+        self.debounce.stop()
+        self.search.cancel()
+        self.drain_timer.stop()
+        self.status_label.setText(f"متوقف شد · {self.match_count} مورد در {self.file_count} فایل")
+
+    def start_search(self):
+        self.debounce.stop()
+        self.results.clear()
+        self.match_count = 0
+        self.file_count = 0
+        query = self.query_input.text()
+        if not query:
+            self.search.cancel()
+            self.drain_timer.stop()
+            self.status_label.setText("")
             return
-            
-        self.history.append(cmd)
-        self.history_index = len(self.history)
-        
-        self.output.appendPlainText(f"{self.current_dir}> {cmd}")
-        self.input.clear()
-        
-        if cmd.startswith('cd '):
-            self.change_dir(cmd[3:].strip())
-        elif cmd == 'pwd':
-            self.output.appendPlainText(self.current_dir)
-        elif cmd == 'ls' or cmd == 'dir':
-            self.list_files()
-        elif cmd == 'clear':
-            self.clear_output()
-        elif cmd.startswith('python '):
-            self.run_python(cmd[7:].strip())
-        elif cmd == 'help':
-            self.show_help()
+        try:
+            pattern = build_search_pattern(
+                query, self.regex_check.isChecked(), self.word_check.isChecked(),
+                self.case_check.isChecked())
+        except re.error as e:
+            self.search.cancel()
+            self.status_label.setText(f"عبارت نامعتبر: {e}")
+            return
+        include = [g.strip() for g in self.include_input.text().split(',') if g.strip()]
+        root = self.root_provider()
+        index = self.index_provider() if self.index_provider else None
+        files = None
+        self.used_index = None
+        if index is not None and index.is_ready and index.covers(root):
+            regex = self.regex_check.isChecked()
+            files = lambda: index.candidates(query, regex, root)
+            self.used_index = index
+        self.started_at = time.perf_counter()
+        self.search_generation = self.search.start(
+            WorkspaceIgnore.from_settings(root), pattern, include, files)
+        self.status_label.setText("در حال جستجو...")
+        self.drain_timer.start()
+
+    def drain(self):
+        if self.search_generation != self.search.generation:
+            return
+        results = self.search.results
+        deadline = time.perf_counter() + 0.012
+        self.results.setUpdatesEnabled(False)
+        try:
+            while time.perf_counter() < deadline:
+                try:
+                    path, matches = results.get_nowait()
+                except queue.Empty:
+                    break
+                if path is None:
+                    self.finish(truncated=matches)
+                    break
+                self.add_file_results(path, matches)
+        finally:
+            self.results.setUpdatesEnabled(True)
+        if self.drain_timer.isActive():
+            self.status_label.setText(
+                f"در حال جستجو... {self.match_count} مورد در {self.file_count} فایل")
+
+    def add_file_results(self, path, matches):
+        root = self.root_provider()
+        file_item = QTreeWidgetItem([f"{os.path.relpath(path, root)}  ({len(matches)})"])
+        file_item.setData(0, Qt.ItemDataRole.UserRole, (path, 1, 0))
+        children = []
+        for line_no, column, text in matches:
+            child = QTreeWidgetItem([f"{line_no}: {text}"])
+            child.setData(0, Qt.ItemDataRole.UserRole, (path, line_no, column))
+            children.append(child)
+        file_item.addChildren(children)
+        self.results.addTopLevelItem(file_item)
+        if self.file_count < 20:
+            file_item.setExpanded(True)
+        self.file_count += 1
+        self.match_count += len(matches)
+
+    def finish(self, truncated=False):
+        self.drain_timer.stop()
+        elapsed = time.perf_counter() - self.started_at
+        note = " (نتایج محدود شد)" if truncated else ""
+        if self.used_index is not None and self.used_index.last_query_ms is not None:
+            note += f" · ایندکس {self.used_index.last_query_ms:.0f} ms"
+        self.status_label.setText(
+            f"{self.match_count} مورد در {self.file_count} فایل · {elapsed:.2f} ثانیه{note}")
+
+    def on_item_activated(self, item, column=0):
+        data = item.data(0, Qt.ItemDataRole.UserRole)
+        if data:
+            path, line_no, col = data
+            self.open_location.emit(path, line_no, col)
+
+
+
+Symbol = namedtuple('Symbol', 'name kind line col container detail')
+
+
+def symbols_from_source(source):
+    """Classes, functions, module/class level assignments and imports of a module."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError, RecursionError):
+        return []
+    symbols = []
+
+    def add(name, kind, node, container, detail=''):
+        symbols.append(Symbol(name, kind, node.lineno, node.col_offset, container, detail))
+
+    def visit(body, container, scope):
+        for node in body:
+            if isinstance(node, ast.ClassDef):
+                add(node.name, 'class', node, container)
+                visit(node.body, f'{container}.{node.name}' if container else node.name, 'class')
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                add(node.name, 'method' if scope == 'class' else 'function', node, container)
+                visit(node.body, f'{container}.{node.name}' if container else node.name, 'function')
+            elif scope == 'function':
+                for field in ('body', 'orelse', 'finalbody'):
+                    visit(getattr(node, field, ()), container, scope)
+            elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+                targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+                for target in targets:
+                    for item in ast.walk(target):
+                        if isinstance(item, ast.Name):
+                            add(item.id, 'variable', item, container)
+            elif isinstance(node, ast.Import):
+                for alias in node.names:
+                    if alias.asname:
+                        add(alias.asname, 'import', node, container, alias.name)
+                    else:
+                        head = alias.name.split('.')[0]
+                        add(head, 'import', node, container, head)
+            elif isinstance(node, ast.ImportFrom):
+                module = '.' * node.level + (node.module or '')
+                for alias in node.names:
+                    if alias.name != '*':
+                        add(alias.asname or alias.name, 'import', node, container,
+                            f'{module}:{alias.name}')
+            else:
+                for field in ('body', 'orelse', 'finalbody'):
+                    visit(getattr(node, field, ()), container, scope)
+                for handler in getattr(node, 'handlers', ()):
+                    visit(handler.body, container, scope)
+
+    visit(tree.body, '', 'module')
+    return symbols
+
+
+IMPORT_STATEMENT_RE = re.compile(
+    r'^[ \t]*(?:from[ \t]+(\.*[\w.]*)[ \t]+)?import[ \t]+(\([^()]*\)?|[^\n#;]*)', re.M)
+IMPORT_ALIAS_RE = re.compile(r'\s*([A-Za-z_][\w.]*)(?:\s+as\s+([A-Za-z_]\w*))?\s*$')
+
+
+def scan_imports(source):
+    """{bound name: detail} of import statements, found line by line so unparsable buffers still resolve.
+
+    Details use the same form as symbols_from_source: ``module`` or ``module:name``.
+    """
+    imports = {}
+    for match in IMPORT_STATEMENT_RE.finditer(source):
+        module, names = match.groups()
+        for piece in names.strip('()').split(','):
+            alias = IMPORT_ALIAS_RE.match(piece)
+            if alias is None:
+                break
+            name, asname = alias.groups()
+            if module is not None:
+                if name != '*' and '.' not in name:
+                    imports[asname or name] = f'{module}:{name}'
+            elif asname:
+                imports[asname] = name
+            else:
+                imports[name.split('.')[0]] = name.split('.')[0]
+    return imports
+
+
+def find_module_spec(name):
+    """ModuleSpec for a dotted name, found without importing any parent package."""
+    parts = name.split('.')
+    spec = importlib.util.find_spec(parts[0])
+    for i in range(1, len(parts)):
+        locations = spec.submodule_search_locations if spec is not None else None
+        if not locations:
+            return None
+        spec = importlib.machinery.PathFinder.find_spec('.'.join(parts[:i + 1]), list(locations))
+    return spec
+
+
+MODULE_NAMES_SOURCE = r'''
+import importlib, json, sys
+print(json.dumps(dir(importlib.import_module(sys.argv[1]))))
+'''
+
+
+def introspect_module(name, timeout=10):
+    """dir() of a compiled module, imported in a child interpreter so its code never runs in the IDE."""
+    try:
+        result = subprocess.run([sys.executable, '-c', MODULE_NAMES_SOURCE, name],
+                                capture_output=True, timeout=timeout, cwd=tempfile.gettempdir())
+        return json.loads(result.stdout) if result.returncode == 0 else []
+    except (OSError, subprocess.SubprocessError, ValueError):
+        return []
+
+
+def parse_symbols(path):
+    """Returns (path, mtime_ns, size, symbols); symbols is None when the file is unreadable."""
+    try:
+        st = os.stat(path)
+        with open(path, 'rb') as f:
+            source = f.read()
+    except OSError:
+        return path, 0, 0, None
+    return path, st.st_mtime_ns, st.st_size, symbols_from_source(source)
+
+
+class SymbolIndex(QObject):
+    """Workspace-wide symbol table built from cached per-file AST parses."""
+
+    ready = pyqtSignal()
+    progress = pyqtSignal(int, int)
+    updated = pyqtSignal()
+
+    CACHE_VERSION = 1
+
+    def __init__(self, root, parent=None, files=None):
+        super().__init__(parent)
+        self.root = os.path.abspath(root)
+        self.file_source = files
+        digest = hashlib.sha1(self.root.encode('utf-8')).hexdigest()[:16]
+        self.db_path = os.path.join(
+            app_data_dir('symbols'), f'{digest}-v{self.CACHE_VERSION}.sqlite')
+        self.files = {}
+        self.by_name = {}
+        self.is_ready = False
+        self._lock = threading.Lock()
+        self._changes = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def covers(self, path):
+        path = os.path.abspath(path)
+        return path.startswith(self.root + os.sep)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._main, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._changes.put(None)
+        if self._thread is not None:
+            self._thread.join(2)
+
+    def notify_changed(self, paths):
+        for path in paths:
+            if path.endswith('.py') and self.covers(path):
+                self._changes.put(os.path.abspath(path))
+
+    def _main(self):
+        try:
+            db = sqlite3.connect(self.db_path, timeout=30)
+        except sqlite3.Error:
+            return
+        try:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('CREATE TABLE IF NOT EXISTS files('
+                       'path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, symbols TEXT)')
+            self._initial_sync(db)
+            if self._stop.is_set():
+                return
+            self.is_ready = True
+            self.ready.emit()
+            while not self._stop.is_set():
+                try:
+                    path = self._changes.get(timeout=1)
+                except queue.Empty:
+                    continue
+                if path is None:
+                    break
+                batch = {path}
+                while True:
+                    try:
+                        path = self._changes.get_nowait()
+                    except queue.Empty:
+                        break
+                    if path is None:
+                        return
+                    batch.add(path)
+                self._store(db, [parse_symbols(p) for p in sorted(batch)])
+                self.updated.emit()
+        except sqlite3.Error:
+            pass
+        finally:
+            db.close()
+
+    def _initial_sync(self, db):
+        cached = {}
+        for path, mtime_ns, size, symbols in db.execute(
+                'SELECT path, mtime_ns, size, symbols FROM files'):
+            cached[path] = (mtime_ns, size, symbols)
+        if self.file_source is not None:
+            files = self.file_source(self._stop)
+        else:
+            files = WorkspaceIgnore.from_settings(self.root).walk(self._stop)
+        if files is None:
+            return
+        loaded = []
+        changed = []
+        seen = set()
+        for path in files:
+            if not path.endswith('.py'):
+                continue
+            seen.add(path)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = cached.get(path)
+            if entry is not None and entry[:2] == (st.st_mtime_ns, st.st_size):
+                loaded.append((path, [Symbol(*s) for s in json.loads(entry[2])]))
+            else:
+                changed.append(path)
+        if self._stop.is_set():
+            return
+        with db:
+            db.executemany('DELETE FROM files WHERE path=?',
+                           [(p,) for p in cached if p not in seen])
+        with self._lock:
+            for path, symbols in loaded:
+                self._replace(path, symbols)
+        if not changed:
+            return
+        context = multiprocessing.get_context('spawn')
+        workers = max(1, (os.cpu_count() or 2) - 1)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            batch = []
+            for done, result in enumerate(pool.map(parse_symbols, changed, chunksize=32), 1):
+                if self._stop.is_set():
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    return
+                batch.append(result)
+                if len(batch) >= 500 or done == len(changed):
+                    self._store(db, batch)
+                    batch = []
+                    self.progress.emit(done, len(changed))
+
+    def _store(self, db, results):
+        with db:
+            for path, mtime_ns, size, symbols in results:
+                if symbols is None:
+                    db.execute('DELETE FROM files WHERE path=?', (path,))
+                else:
+                    db.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)',
+                               (path, mtime_ns, size, json.dumps(symbols)))
+        with self._lock:
+            for path, _, _, symbols in results:
+                self._replace(path, symbols)
+
+    def _replace(self, path, symbols):
+        for symbol in self.files.pop(path, ()):
+            entries = self.by_name.get(symbol.name)
+            if entries is not None:
+                entries[:] = [e for e in entries if e[0] != path]
+                if not entries:
+                    del self.by_name[symbol.name]
+        if symbols:
+            symbols = [Symbol(*s) for s in symbols]
+            self.files[path] = symbols
+            for symbol in symbols:
+                self.by_name.setdefault(symbol.name, []).append((path, symbol))
+
+    def lookup(self, name, include_imports=False):
+        with self._lock:
+            entries = list(self.by_name.get(name, ()))
+        if not include_imports:
+            entries = [e for e in entries if e[1].kind != 'import']
+        return entries
+
+    def definition_names(self):
+        with self._lock:
+            names = []
+            for name, entries in self.by_name.items():
+                for _, symbol in entries:
+                    if symbol.kind != 'import':
+                        names.append((name, symbol.kind))
+                        break
+            return names
+
+    def symbols_in(self, path):
+        with self._lock:
+            return list(self.files.get(path, ()))
+
+    def search(self, query, limit=200):
+        """Definitions whose names contain the query as a subsequence, best matches first."""
+        query = query.strip()
+        if not query:
+            return []
+        lowered = query.lower()
+        fuzzy = re.compile('.*?'.join(re.escape(c) for c in lowered))
+        with self._lock:
+            names = list(self.by_name)
+        ranked = []
+        for name in names:
+            low = name.lower()
+            if low.startswith(lowered):
+                rank = 0 if name.startswith(query) else 1
+            elif lowered in low:
+                rank = 2
+            elif fuzzy.search(low):
+                rank = 3
+            else:
+                continue
+            ranked.append((rank, len(name), name))
+        ranked.sort()
+        results = []
+        for _, _, name in ranked:
+            for path, symbol in self.lookup(name):
+                results.append((path, symbol))
+                if len(results) >= limit:
+                    return results
+        return results
+
+    def module_path(self, module, from_path=None):
+        """Workspace file for a (possibly relative) dotted module name, or None."""
+        stripped = module.lstrip('.')
+        level = len(module) - len(stripped)
+        if level:
+            if from_path is None:
+                return None
+            base = os.path.dirname(os.path.abspath(from_path))
+            for _ in range(level - 1):
+                base = os.path.dirname(base)
+            bases = [base]
+        else:
+            bases = [self.root]
+            if from_path is not None:
+                bases.append(os.path.dirname(os.path.abspath(from_path)))
+        parts = stripped.split('.') if stripped else []
+        for base in bases:
+            target = os.path.join(base, *parts)
+            for candidate in (target + '.py', os.path.join(target, '__init__.py')):
+                if parts and os.path.isfile(candidate):
+                    return candidate
+            if not parts and os.path.isfile(os.path.join(target, '__init__.py')):
+                return os.path.join(target, '__init__.py')
+        return None
+
+
+class SymbolSearchDialog(QDialog):
+
+    open_location = pyqtSignal(str, int, int)
+
+    KIND_ICONS = {'class': '🅲', 'function': 'ƒ', 'method': 'ƒ', 'variable': '𝑥', 'import': '⇲'}
+
+    def __init__(self, index, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.setWindowTitle("جستجوی نمادها")
+        self.resize(560, 420)
+
+        layout = QVBoxLayout()
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("نام کلاس، تابع یا متغیر")
+        self.query_input.textChanged.connect(lambda: self.debounce.start())
+        self.query_input.returnPressed.connect(self.accept_current)
+        layout.addWidget(self.query_input)
+
+        self.results = QListWidget()
+        self.results.itemActivated.connect(self.accept_current)
+        layout.addWidget(self.results, 1)
+        self.setLayout(layout)
+
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(120)
+        self.debounce.timeout.connect(self.refresh)
+
+    def set_query(self, text):
+        self.query_input.setText(text)
+        self.query_input.selectAll()
+        self.refresh()
+
+    def show_entries(self, entries):
+        self.results.clear()
+        for path, symbol in entries:
+            rel = os.path.relpath(path, self.index.root)
+            owner = f"{symbol.container}." if symbol.container else ""
+            item = QListWidgetItem(
+                f"{self.KIND_ICONS.get(symbol.kind, '')} {owner}{symbol.name}    {rel}:{symbol.line}")
+            item.setData(Qt.ItemDataRole.UserRole, (path, symbol.line, symbol.col))
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+
+    def refresh(self):
+        self.debounce.stop()
+        self.show_entries(self.index.search(self.query_input.text()))
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+            self.results.keyPressEvent(event)
+            return
+        super().keyPressEvent(event)
+
+    def accept_current(self, *_):
+        item = self.results.currentItem()
+        if item is None:
+            return
+        path, line, col = item.data(Qt.ItemDataRole.UserRole)
+        self.accept()
+        self.open_location.emit(path, line, col)
+
+
+def path_char_mask(text):
+    """64-bit set of the characters in text: a-z and 0-9 get their own bits, the rest share."""
+    mask = 0
+    for ch in set(text):
+        o = ord(ch)
+        if 97 <= o <= 122:
+            mask |= 1 << (o - 97)
+        elif 48 <= o <= 57:
+            mask |= 1 << (o - 22)
+        else:
+            mask |= 1 << (36 + o % 28)
+    return mask
+
+
+class WorkspaceFileList(QObject):
+    """The workspace file enumeration, cached on disk and kept current by diffs.
+
+    Walks run on a background thread and hand the GUI thread either a full list
+    (cache load, first walk) or the paths added and removed since the last one.
+    Lists only grow; removed paths become tombstones with an empty mask, so index
+    positions held by an in-flight QuickOpenSearch stay valid.
+
+    This is the only walker of a project: the trigram and symbol indexes start
+    from snapshot() and follow files_changed, which carries added, removed and
+    saved paths, and the Problems panel checks python_files().
+    """
+
+    changed = pyqtSignal()
+    loaded = pyqtSignal(object)
+    patched = pyqtSignal(object, object)
+    files_changed = pyqtSignal(list)
+
+    RESCAN_AFTER = 30.0
+    RESCAN_INTERVAL = 60.0
+
+    def __init__(self, root, parent=None):
+        super().__init__(parent)
+        self.root = os.path.abspath(root)
+        digest = hashlib.sha1(self.root.encode('utf-8')).hexdigest()[:16]
+        self.cache_path = os.path.join(app_data_dir('filelist'), f'{digest}.txt.z')
+        self.paths = []
+        self.lowers = []
+        self.masks = []
+        self.positions = {}
+        self.version = 0
+        self.scanned_at = 0.0
+        self.scanning = False
+        self._stop = threading.Event()
+        self._listed = threading.Event()
+        self._rels = []
+        self.loaded.connect(self.on_loaded)
+        self.patched.connect(self.on_scanned)
+        self.rescan_timer = QTimer(self)
+        self.rescan_timer.setSingleShot(True)
+        self.rescan_timer.setInterval(1000)
+        self.rescan_timer.timeout.connect(self.rescan)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(lambda _path: self.rescan_timer.start())
+        self.watcher.addPath(self.root)
+        # Files created by other programs below the root only show up on a walk.
+        self.periodic_timer = QTimer(self)
+        self.periodic_timer.setInterval(int(self.RESCAN_INTERVAL * 1000))
+        self.periodic_timer.timeout.connect(lambda: self.rescan(force=False))
+        self.periodic_timer.start()
+
+    def start(self):
+        self.scanning = True
+        threading.Thread(target=self._load_and_scan, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        self.periodic_timer.stop()
+
+    def snapshot(self, cancel=None):
+        """Absolute paths of the latest listing; blocks until there is one. Safe off the GUI thread.
+
+        Returns None when the list or ``cancel`` is stopped first.
+        """
+        while not self._listed.wait(0.2):
+            if self._stop.is_set() or (cancel is not None and cancel.is_set()):
+                return None
+        return [self.absolute(rel) for rel in self._rels]
+
+    def python_files(self):
+        """Absolute .py paths currently listed, or None before the first listing arrives."""
+        if not self.version:
+            return None
+        return [self.absolute(rel) for rel, mask in zip(self.paths, self.masks)
+                if mask and rel.endswith('.py')]
+
+    def absolute(self, rel):
+        return os.path.join(self.root, *rel.split('/'))
+
+    def rescan(self, force=True):
+        if self.scanning or (not force and time.monotonic() - self.scanned_at < self.RESCAN_AFTER):
+            return
+        self.scanning = True
+        known = set(self.positions)
+        threading.Thread(target=self._scan, args=(known,), daemon=True).start()
+
+    def notify_changed(self, paths):
+        """Records saved, created or deleted files and passes them on to files_changed."""
+        added = []
+        removed = []
+        covered = []
+        for path in paths:
+            path = os.path.abspath(path)
+            if not path.startswith(self.root + os.sep):
+                continue
+            covered.append(path)
+            rel = os.path.relpath(path, self.root).replace(os.sep, '/')
+            exists = os.path.isfile(path)
+            if exists and rel not in self.positions:
+                added.append(rel)
+            elif not exists and rel in self.positions:
+                removed.append(rel)
+        if added or removed:
+            self.apply_patch(self.entries(added), removed)
+        if covered:
+            self.files_changed.emit(covered)
+
+    @staticmethod
+    def entries(rels):
+        return [(rel, rel.lower(), path_char_mask(rel.lower())) for rel in rels]
+
+    def _walk(self):
+        ignore = WorkspaceIgnore.from_settings(self.root)
+        start = len(self.root) + 1
+        return [path[start:].replace(os.sep, '/') for path in ignore.walk(self._stop)]
+
+    def _load_and_scan(self):
+        try:
+            with open(self.cache_path, 'rb') as f:
+                cached = zlib.decompress(f.read()).decode('utf-8').split('\n')
+        except (OSError, zlib.error, UnicodeDecodeError):
+            cached = None
+        if cached and cached != ['']:
+            self._rels = cached
+            self._listed.set()
+            self.loaded.emit(self.entries(cached))
+            self._scan(set(cached))
+            return
+        rels = self._walk()
+        if self._stop.is_set():
+            return
+        self._rels = rels
+        self._listed.set()
+        self.loaded.emit(self.entries(rels))
+        self.patched.emit([], [])
+        self._save(rels)
+
+    def _scan(self, known):
+        rels = self._walk()
+        if self._stop.is_set():
+            return
+        self._rels = rels
+        fresh = set(rels)
+        added = [rel for rel in rels if rel not in known]
+        removed = [rel for rel in known if rel not in fresh]
+        self.patched.emit(self.entries(added), removed)
+        if added or removed:
+            self._save(rels)
+
+    def _save(self, rels):
+        try:
+            atomic_write_bytes(self.cache_path, zlib.compress('\n'.join(rels).encode('utf-8'), 1))
+        except OSError:
+            pass
+
+    def on_loaded(self, entries):
+        self.paths = [e[0] for e in entries]
+        self.lowers = [e[1] for e in entries]
+        self.masks = [e[2] for e in entries]
+        self.positions = {rel: i for i, rel in enumerate(self.paths)}
+        self.version += 1
+        self.changed.emit()
+
+    def on_scanned(self, added, removed):
+        self.scanning = False
+        self.scanned_at = time.monotonic()
+        self.apply_patch(added, removed)
+        if added or removed:
+            self.files_changed.emit([self.absolute(e[0]) for e in added] +
+                                    [self.absolute(rel) for rel in removed])
+
+    def apply_patch(self, added, removed):
+        if not added and not removed:
+            return
+        for rel in removed:
+            i = self.positions.pop(rel, None)
+            if i is not None:
+                self.lowers[i] = ''
+                self.masks[i] = 0
+        for rel, lower, mask in added:
+            if rel in self.positions:
+                continue
+            self.positions[rel] = len(self.paths)
+            self.paths.append(rel)
+            self.lowers.append(lower)
+            self.masks.append(mask)
+        self.version += 1
+        self.changed.emit()
+
+
+class QuickOpenSearch:
+    """Incremental fuzzy filter over a WorkspaceFileList.
+
+    step() scans candidates in chunks until a deadline and can be resumed. A search
+    whose query extends the previous one starts from that search's matches (plus
+    whatever it had not scanned yet) instead of the whole list; the character
+    bitset rejects most candidates before the subsequence regex runs.
+    """
+
+    CHUNK = 1024
+    LIMIT = 50
+
+    def __init__(self, files, query, previous=None, boosts=None):
+        self.files = files
+        self.query = ''.join(query.lower().split())
+        self.qmask = path_char_mask(self.query)
+        self.pattern = re.compile('.*?'.join(map(re.escape, self.query)))
+        self.boosts = boosts or {}
+        self.version = files.version
+        if previous is not None and previous.version == self.version and \
+                self.query.startswith(previous.query) and previous.query:
+            self.candidates = previous.matches + list(previous.candidates[previous.position:])
+        else:
+            self.candidates = range(len(files.paths))
+        self.matches = []
+        self.heap = []
+        self.position = 0
+        self.done = not self.query
+
+    def step(self, deadline):
+        """Scans until done or past deadline (perf_counter seconds); returns True when done."""
+        masks = self.files.masks
+        lowers = self.files.lowers
+        qmask = self.qmask
+        keep = qmask.__eq__
+        search = self.pattern.search
+        candidates = self.candidates
+        matches = self.matches
+        heap = self.heap
+        while self.position < len(candidates):
+            if time.perf_counter() > deadline:
+                return False
+            chunk = candidates[self.position:self.position + self.CHUNK]
+            self.position += len(chunk)
+            if isinstance(chunk, range):
+                bits = masks[chunk.start:chunk.stop]
+            else:
+                bits = map(masks.__getitem__, chunk)
+            for i in itertools.compress(chunk, map(keep, map(qmask.__and__, bits))):
+                match = search(lowers[i])
+                if match is None:
+                    continue
+                matches.append(i)
+                entry = (self.score(i, match), i)
+                if len(heap) < self.LIMIT:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+        self.done = True
+        return True
+
+    def score(self, i, match):
+        lower = self.files.lowers[i]
+        base = lower.rfind('/') + 1
+        start, end = match.span()
+        score = -(end - start) - len(lower) * 0.01 + self.boosts.get(i, 0)
+        if start >= base:
+            score += 100
+        elif self.pattern.search(lower, base) is not None:
+            score += 60
+        if lower.startswith(self.query, base):
+            score += 200
+        if start == base or lower[start - 1] in '/_-. ':
+            score += 10
+        return score
+
+    def results(self):
+        return [self.files.paths[i] for _, i in sorted(self.heap, reverse=True)]
+
+
+class QuickOpenDialog(QDialog):
+    """Ctrl+P palette: fuzzy file names, refined on every keystroke within a frame budget."""
+
+    open_file = pyqtSignal(str)
+
+    BUDGET = 0.007
+    RECENT_BOOST = 300
+
+    def __init__(self, files, recent, parent=None):
+        super().__init__(parent)
+        self.files = files
+        self.recent = [p for p in recent if p.startswith(files.root + os.sep)]
+        self.search = None
+        self.completed = {}
+        self.setWindowTitle("باز کردن سریع فایل")
+        self.resize(620, 440)
+
+        layout = QVBoxLayout()
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText("نام فایل")
+        self.query_input.textChanged.connect(self.start_search)
+        self.query_input.returnPressed.connect(self.accept_current)
+        layout.addWidget(self.query_input)
+
+        self.results = QListWidget()
+        self.results.setUniformItemSizes(True)
+        self.results.itemActivated.connect(self.accept_current)
+        layout.addWidget(self.results, 1)
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+        self.setLayout(layout)
+
+        self.step_timer = QTimer(self)
+        self.step_timer.setInterval(0)
+        self.step_timer.timeout.connect(self.continue_search)
+        files.changed.connect(self.on_files_changed)
+        self.start_search('')
+
+    def boosts(self):
+        boosts = {}
+        for rank, path in enumerate(self.recent):
+            rel = os.path.relpath(path, self.files.root).replace(os.sep, '/')
+            i = self.files.positions.get(rel)
+            if i is not None:
+                boosts[i] = max(0, self.RECENT_BOOST - rank * 5)
+        return boosts
+
+    def start_search(self, text):
+        self.step_timer.stop()
+        query = ''.join(text.lower().split())
+        if not query:
+            self.search = None
+            self.show_paths([os.path.relpath(p, self.files.root).replace(os.sep, '/')
+                             for p in self.recent if os.path.isfile(p)][:QuickOpenSearch.LIMIT])
+            self.status_label.setText(f"{len(self.files.positions)} فایل · اخیر")
+            return
+        cached = self.completed.get(query)
+        if cached is not None and cached.version == self.files.version:
+            self.search = cached
+        else:
+            self.search = QuickOpenSearch(self.files, query, self.search, self.boosts())
+        self.started_at = time.perf_counter()
+        self.continue_search()
+
+    def continue_search(self):
+        search = self.search
+        if search is None:
+            self.step_timer.stop()
+            return
+        started = time.perf_counter()
+        done = search.step(started + self.BUDGET)
+        self.show_paths(search.results())
+        if done:
+            self.step_timer.stop()
+            self.completed[search.query] = search
+            if len(self.completed) > 64:
+                self.completed.pop(next(iter(self.completed)))
+            self.status_label.setText(
+                f"{len(search.matches)} نتیجه از {len(self.files.positions)} فایل")
+        else:
+            self.step_timer.start()
+            self.status_label.setText(
+                f"در حال جستجو... {search.position}/{len(search.candidates)}")
+
+    def show_paths(self, paths):
+        self.results.setUpdatesEnabled(False)
+        self.results.clear()
+        for rel in paths:
+            name = rel.rsplit('/', 1)[-1]
+            item = QListWidgetItem(f"{name}    {rel}")
+            item.setData(Qt.ItemDataRole.UserRole, os.path.join(self.files.root, rel))
+            self.results.addItem(item)
+        if self.results.count():
+            self.results.setCurrentRow(0)
+        self.results.setUpdatesEnabled(True)
+
+    def on_files_changed(self):
+        self.completed.clear()
+        self.search = None
+        self.start_search(self.query_input.text())
+
+    def keyPressEvent(self, event):
+        if event.key() in (Qt.Key.Key_Down, Qt.Key.Key_Up, Qt.Key.Key_PageDown, Qt.Key.Key_PageUp):
+            self.results.keyPressEvent(event)
+            return
+        super().keyPressEvent(event)
+
+    def accept_current(self, *_):
+        item = self.results.currentItem()
+        if item is None:
+            return
+        self.accept()
+        self.open_file.emit(item.data(Qt.ItemDataRole.UserRole))
+
+    def done(self, result):
+        self.step_timer.stop()
+        self.files.changed.disconnect(self.on_files_changed)
+        super().done(result)
+
+
+class CompletionIndex:
+    """Case-folded sorted name table; prefixes are bisected, fuzzy matches scan one first-letter run."""
+
+    def __init__(self, entries=()):
+        kinds = {}
+        for name, kind in entries:
+            kinds.setdefault(name, kind)
+        items = sorted((name.lower(), name, kind) for name, kind in kinds.items())
+        self.keys = [item[0] for item in items]
+        self.names = [item[1] for item in items]
+        self.kinds = [item[2] for item in items]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def span(self, prefix):
+        lo = bisect.bisect_left(self.keys, prefix)
+        return lo, bisect.bisect_left(self.keys, prefix + '\uffff', lo)
+
+    def collect(self, prefix, out, deadline, is_stale, limit=200):
+        """Adds (rank, name, kind) tuples to out; returns False if the budget ran out."""
+        lowered = prefix.lower()
+        hide_private = not prefix.startswith('_')
+        lo, hi = self.span(lowered)
+        count = 0
+        for i in range(lo, hi):
+            if ((i - lo) & 255) == 255 and time.perf_counter() > deadline:
+                return False
+            name = self.names[i]
+            if hide_private and name.startswith('_'):
+                continue
+            out.append((0 if name.startswith(prefix) else 1, len(name), name, self.kinds[i]))
+            count += 1
+            if count >= limit:
+                return True
+        if len(lowered) < 2:
+            return True
+        fuzzy = re.compile('.*?'.join(re.escape(c) for c in lowered[1:]))
+        lo, hi = self.span(lowered[0])
+        for i in range(lo, hi):
+            if ((i - lo) & 255) == 0 and (time.perf_counter() > deadline or is_stale()):
+                return False
+            key = self.keys[i]
+            if key.startswith(lowered) or (hide_private and key.startswith('_')):
+                continue
+            match = fuzzy.search(key, 1)
+            if match is not None:
+                out.append((2 + match.end() - match.start() - len(lowered) + 1,
+                            len(key), self.names[i], self.kinds[i]))
+        return True
+
+
+class CompletionRequest:
+
+    def __init__(self, requester, generation, prefix, qualifier, context, document=None):
+        self.requester = requester
+        self.generation = generation
+        self.prefix = prefix
+        self.qualifier = qualifier
+        self.context = context
+        self.document = document
+        self.deadline = 0.0
+
+
+class CompletionEngine(QObject):
+    """Answers completion requests on a worker thread within a fixed time budget.
+
+    Every request supersedes the previous one; a request that is overtaken while
+    running stops at its next checkpoint and its results are dropped. Buffer
+    snapshots and modules are analysed on a loader thread, outside the budget;
+    a request that needs them is answered again once they are ready.
+    """
+
+    completed = pyqtSignal(object, int, str, list)
+
+    BUDGET = 0.020
+    MAX_RESULTS = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.symbol_index = None
+        self.builtins = CompletionIndex(
+            [(name, 'keyword') for name in PYTHON_KEYWORDS]
+            + [(name, 'builtin') for name in dir(builtins)])
+        self.project = CompletionIndex()
+        self.modules = {}
+        self.documents = {}
+        self._parsing = set()
+        self._loading = set()
+        self._waiting = None
+        self._requests = queue.Queue()
+        self._loader = ThreadPoolExecutor(max_workers=1)
+        self._rebuild = QTimer(self)
+        self._rebuild.setSingleShot(True)
+        self._rebuild.setInterval(500)
+        self._rebuild.timeout.connect(self.rebuild_project)
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def set_symbol_index(self, index):
+        self.symbol_index = index
+        self.modules.clear()
+        self.project = CompletionIndex()
+        if index is not None:
+            index.ready.connect(self._rebuild.start)
+            index.updated.connect(self._rebuild.start)
+
+    def rebuild_project(self):
+        index = self.symbol_index
+        if index is None:
+            return
+
+        def build():
+            names = index.definition_names()
+            if index is self.symbol_index:
+                self.project = CompletionIndex(names)
+        self._loader.submit(build)
+
+    def request(self, requester, prefix, qualifier, context, document=None):
+        self.generation += 1
+        self._requests.put(CompletionRequest(
+            requester, self.generation, prefix, qualifier, context, document))
+        return self.generation
+
+    def cancel(self):
+        self.generation += 1
+
+    def forget(self, requester):
+        self.documents.pop(id(requester), None)
+
+    def knows(self, requester, head, context=''):
+        """True if the last analysed snapshot of requester resolves the qualifier head."""
+        info = self.documents.get(id(requester))
+        if info is None:
+            return False
+        imports, classes = info
+        return context in classes if head == 'self' else head in imports
+
+    def _serve(self):
+        while True:
+            request = self._requests.get()
+            while True:
+                try:
+                    request = self._requests.get_nowait()
+                except queue.Empty:
+                    break
+            if request.generation != self.generation:
+                continue
+            request.deadline = time.perf_counter() + self.BUDGET
+            try:
+                items = self._complete(request)
+            except Exception:
+                items = None
+            if items is not None and request.generation == self.generation:
+                self.completed.emit(request.requester, request.generation, request.prefix, items)
+
+    def _complete(self, request):
+        is_stale = lambda: request.generation != self.generation
+        found = []
+        if request.qualifier:
+            members = self._members(request)
+            if members is None:
+                return None
+            members.collect(request.prefix, found, request.deadline, is_stale)
+        else:
+            local = CompletionIndex(
+                (word, 'text') for word in set(re.findall(r'[A-Za-z_]\w{2,}', request.context))
+                if word != request.prefix)
+            for rank_offset, index in ((-1, local), (0, self.builtins), (0, self.project)):
+                start = len(found)
+                if not index.collect(request.prefix, found, request.deadline, is_stale):
+                    break
+                for i in range(start, len(found)):
+                    rank, length, name, kind = found[i]
+                    found[i] = (rank + rank_offset, length, name, kind)
+        if is_stale():
+            return None
+        found.sort()
+        seen = set()
+        items = []
+        for _, _, name, kind in found:
+            if name not in seen:
+                seen.add(name)
+                items.append((name, kind))
+                if len(items) >= self.MAX_RESULTS:
+                    break
+        return items
+
+    def _members(self, request):
+        key = id(request.requester)
+        if request.document is not None:
+            self._parsing.add(key)
+            self._loader.submit(self._parse_document, key, request.document)
+            request.document = None
+        head, _, rest = request.qualifier.partition('.')
+        if key in self._parsing and not self.knows(request.requester, head, request.context):
+            self._waiting = request
+            return None
+        imports, classes = self.documents.get(key, ({}, {}))
+        if head == 'self' and not rest:
+            return CompletionIndex(
+                (name, 'member') for name in classes.get(request.context, ()))
+        target = imports.get(head)
+        if target is None:
+            return CompletionIndex()
+        module, _, attribute = target.partition(':')
+        names = [module, f'{module}.{attribute}'] if attribute else [module]
+        key = '.'.join(filter(None, [names[-1], rest]))
+        if key in self.modules:
+            return self.modules[key]
+        if key not in self._loading:
+            self._loading.add(key)
+            self._loader.submit(self._load_module, key)
+        self._waiting = request
+        return None
+
+    def _parse_document(self, key, text):
+        previous = self.documents.get(key)
+        self.documents[key] = self._document_info(text, previous[1] if previous else None)
+        self._parsing.discard(key)
+        self._retry()
+
+    def _retry(self):
+        request = self._waiting
+        if request is not None and request.generation == self.generation:
+            self._requests.put(request)
+
+    @staticmethod
+    def _document_info(text, previous_classes=None):
+        """Imports come from a line scan; classes fall back to the last parse while the buffer is broken."""
+        imports = scan_imports(text)
+        symbols = symbols_from_source(text)
+        if not symbols and previous_classes is not None:
+            return imports, previous_classes
+        classes = {}
+        for symbol in symbols:
+            if symbol.container and '.' not in symbol.container:
+                classes.setdefault(symbol.container, set()).add(symbol.name)
+        for match in re.finditer(r'\bself\.([A-Za-z_]\w*)\s*=', text):
+            for members in classes.values():
+                members.add(match.group(1))
+        return imports, classes
+
+    def _load_module(self, module):
+        names = []
+        index = self.symbol_index
+        path = index.module_path(module) if index is not None else None
+        try:
+            if path is not None:
+                names = [(s.name, s.kind) for s in index.symbols_in(path) or parse_symbols(path)[3] or []
+                         if not s.container]
+            elif module in sys.modules:
+                names = [(name, 'member') for name in dir(sys.modules[module])]
+            else:
+                spec = find_module_spec(module)
+                if spec is not None and spec.origin and spec.origin.endswith('.py'):
+                    with open(spec.origin, 'rb') as f:
+                        names = [(s.name, s.kind) for s in symbols_from_source(f.read())
+                                 if not s.container]
+                    for location in spec.submodule_search_locations or ():
+                        names.extend((info.name, 'module') for info in pkgutil.iter_modules([location]))
+                elif spec is not None:
+                    names = [(name, 'member') for name in introspect_module(module)]
+        except Exception:
+            names = []
+        self.modules[module] = CompletionIndex(
+            (name, kind) for name, kind in names if not name.startswith('__'))
+        self._loading.discard(module)
+        self._retry()
+
+
+class OutlineNode:
+
+    def __init__(self, name, kind, line, col, end_line, children=None):
+        self.name = name
+        self.kind = kind
+        self.line = line
+        self.col = col
+        self.end_line = end_line
+        self.children = children or []
+
+
+def outline_from_source(source):
+    """Nested OutlineNode list of classes and functions, or None if the source does not parse."""
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError, RecursionError):
+        return None
+
+    def build(body):
+        nodes = []
+        for node in body:
+            if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                kind = 'class' if isinstance(node, ast.ClassDef) else 'function'
+                nodes.append(OutlineNode(node.name, kind, node.lineno, node.col_offset,
+                                         node.end_lineno, build(node.body)))
+            else:
+                for field in ('body', 'orelse', 'finalbody'):
+                    nodes.extend(build(getattr(node, field, ())))
+                for handler in getattr(node, 'handlers', ()):
+                    nodes.extend(build(handler.body))
+        return nodes
+
+    return build(tree.body)
+
+
+class OutlineState:
+
+    def __init__(self):
+        self.nodes = []
+        self.generation = 0
+        self.parsed_generation = -1
+        self.block_count = 0
+        self.future = None
+
+
+class OutlineDock(QDockWidget):
+    """Class/function outline of the current tab, reparsed in a worker process when stale."""
+
+    parsed = pyqtSignal(object, int, object)
+
+    HEADER_RE = re.compile(r'\s*(?:@|class\b|def\b|async\s+def\b)')
+
+    def __init__(self, parent=None):
+        super().__init__("ساختار فایل", parent)
+        self.setObjectName("outline_dock")
+        self.tree = QTreeWidget()
+        self.tree.setHeaderHidden(True)
+        self.tree.itemClicked.connect(self.on_item_clicked)
+        self.tree.itemActivated.connect(self.on_item_clicked)
+        self.setWidget(self.tree)
+
+        self.editor = None
+        self.states = {}
+        self._pool = None
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(400)
+        self.debounce.timeout.connect(self.parse_current)
+        self.parsed.connect(self.on_parsed)
+        self.visibilityChanged.connect(self.on_visibility_changed)
+
+    def track(self, editor):
+        self.states[editor] = OutlineState()
+        editor.document().contentsChange.connect(
+            lambda position, removed, added, editor=editor:
+                self.on_contents_change(editor, position, removed, added))
+
+    def untrack(self, editor):
+        state = self.states.pop(editor, None)
+        if state is not None and state.future is not None:
+            state.future.cancel()
+        if editor is self.editor:
+            self.set_editor(None)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def set_editor(self, editor):
+        self.editor = editor
+        self.debounce.stop()
+        self.refresh()
+
+    def on_visibility_changed(self, visible):
+        if visible:
+            self.refresh()
+
+    def is_stale(self, state):
+        return state.parsed_generation != state.generation
+
+    def refresh(self):
+        state = self.states.get(self.editor)
+        if state is None:
+            self.tree.clear()
+            return
+        if self.is_stale(state) and self.isVisible():
+            self.parse_current()
+        self.populate(state.nodes)
+
+    def parse_current(self):
+        editor = self.editor
+        state = self.states.get(editor)
+        if state is None or not self.is_stale(state):
+            return
+        if state.future is not None:
+            state.future.cancel()
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        generation = state.generation
+        future = self._pool.submit(outline_from_source, editor.toPlainText())
+        state.future = future
+
+        def done(future, editor=editor, generation=generation):
+            if future.cancelled():
+                return
+            try:
+                nodes = future.result()
+            except Exception:
+                nodes = None
+            self.parsed.emit(editor, generation, nodes)
+        future.add_done_callback(done)
+
+    def on_parsed(self, editor, generation, nodes):
+        state = self.states.get(editor)
+        if state is None or state.generation != generation:
+            return
+        state.future = None
+        state.parsed_generation = generation
+        if nodes is None:
+            # Keep showing the last good outline while the buffer does not parse.
+            state.block_count = -1
+            return
+        state.nodes = nodes
+        state.block_count = editor.document().blockCount()
+        if editor is self.editor:
+            self.populate(nodes)
+
+    def on_contents_change(self, editor, position, removed, added):
+        state = self.states.get(editor)
+        if state is None:
+            return
+        if not self.is_stale(state) and self.shift_within_body(editor, state, position, added):
+            return
+        state.generation += 1
+        if editor is self.editor and self.isVisible():
+            self.debounce.start()
+
+    def shift_within_body(self, editor, state, position, added):
+        """Reuses the tree when an edit stays inside a single function body."""
+        doc = editor.document()
+        if state.block_count < 0:
+            return False
+        first = doc.findBlock(position).blockNumber() + 1
+        last = doc.findBlock(position + added).blockNumber() + 1
+        delta = doc.blockCount() - state.block_count
+        old_last = last - delta
+        if old_last < first:
+            return False
+        node = None
+        nodes = state.nodes
+        while True:
+            inner = next((n for n in nodes if n.line < first and old_last <= n.end_line), None)
+            if inner is None:
+                break
+            node = inner
+            nodes = inner.children
+        if node is None or node.kind != 'function':
+            return False
+        if any(first <= child.line <= old_last for child in self.iter_nodes(node.children)):
+            return False
+        block = doc.findBlockByNumber(first - 1)
+        for _ in range(first, last + 1):
+            text = block.text()
+            if text.strip():
+                indent = len(text) - len(text.lstrip())
+                if indent <= node.col or self.HEADER_RE.match(text):
+                    return False
+            block = block.next()
+        if delta:
+            self.shift(state.nodes, first, delta)
+            state.block_count = doc.blockCount()
+            if editor is self.editor:
+                self.populate(state.nodes)
+        return True
+
+    def iter_nodes(self, nodes):
+        for node in nodes:
+            yield node
+            yield from self.iter_nodes(node.children)
+
+    def shift(self, nodes, after_line, delta):
+        for node in self.iter_nodes(nodes):
+            if node.line > after_line:
+                node.line += delta
+            if node.end_line >= after_line:
+                node.end_line += delta
+
+    def populate(self, nodes):
+        self.tree.setUpdatesEnabled(False)
+        try:
+            self.tree.clear()
+            self.tree.addTopLevelItems(self.build_items(nodes))
+            self.tree.expandToDepth(0)
+        finally:
+            self.tree.setUpdatesEnabled(True)
+
+    def build_items(self, nodes):
+        items = []
+        for node in nodes:
+            icon = '🅲' if node.kind == 'class' else 'ƒ'
+            item = QTreeWidgetItem([f"{icon} {node.name}"])
+            item.setData(0, Qt.ItemDataRole.UserRole, node)
+            item.addChildren(self.build_items(node.children))
+            items.append(item)
+        return items
+
+    def on_item_clicked(self, item, column=0):
+        node = item.data(0, Qt.ItemDataRole.UserRole)
+        if node is not None and self.editor is not None:
+            self.editor.goto_line(node.line, node.col)
+            self.editor.setFocus()
+
+
+Diagnostic = namedtuple('Diagnostic', 'line col end_col severity message')
+
+BUILTIN_NAMES = frozenset(dir(builtins))
+MODULE_DUNDERS = frozenset({
+    '__name__', '__file__', '__doc__', '__spec__', '__loader__', '__package__',
+    '__path__', '__builtins__', '__annotations__', '__cached__', '__debug__', '__dict__',
+})
+COMPREHENSION_SCOPES = {
+    ast.ListComp: 'listcomp', ast.SetComp: 'setcomp', ast.DictComp: 'dictcomp',
+    ast.GeneratorExp: 'genexpr',
+}
+
+
+def analyze_source(source, filename='<buffer>'):
+    """Syntax errors, undefined names and unused imports of a module, sorted by position."""
+    try:
+        tree = ast.parse(source, filename)
+        top = symtable.symtable(source, filename, 'exec')
+    except SyntaxError as e:
+        return [Diagnostic(e.lineno or 1, max(0, (e.offset or 1) - 1), None, 'error',
+                           f"خطای نحوی: {e.msg}")]
+    except (ValueError, RecursionError) as e:
+        return [Diagnostic(1, 0, None, 'error', str(e))]
+
+    diagnostics = []
+    defined = {s.get_name() for s in top.get_symbols()
+               if s.is_assigned() or s.is_imported() or s.is_namespace()}
+    # ``global`` statements and walrus targets in module-level comprehensions
+    # bind module names from nested scopes.
+    nested = list(top.get_children())
+    while nested:
+        table = nested.pop()
+        defined.update(s.get_name() for s in table.get_symbols() if s.is_declared_global())
+        nested.extend(table.get_children())
+    star_import = any(isinstance(node, ast.ImportFrom) and any(a.name == '*' for a in node.names)
+                      for node in ast.walk(tree))
+    known = defined | BUILTIN_NAMES | MODULE_DUNDERS
+    used_globals = set()
+
+    def children_of(table):
+        children = {}
+        for child in table.get_children():
+            children.setdefault((child.get_name(), child.get_lineno()), []).append(child)
+        return children
+
+    def scope_of(node, children):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            lines = [node.lineno] + [d.lineno for d in node.decorator_list]
+            keys = [(node.name, line) for line in lines]
+        elif isinstance(node, ast.Lambda):
+            keys = [('lambda', node.lineno)]
+        elif type(node) in COMPREHENSION_SCOPES:
+            keys = [(COMPREHENSION_SCOPES[type(node)], node.lineno)]
         else:
-            self.run_system(cmd)
-            
-    def change_dir(self, path):
+            return None
+        for key in keys:
+            if children.get(key):
+                return children[key].pop(0)
+        return None
+
+    def check(node, table):
         try:
-            if path.startswith('~'):
-                path = os.path.expanduser(path)
-            new_path = os.path.abspath(os.path.join(self.current_dir, path))
-            if os.path.exists(new_path) and os.path.isdir(new_path):
-                self.current_dir = new_path
-                self.prompt.setText(f"{self.current_dir}>")
+            symbol = table.lookup(node.id)
+        except KeyError:
+            return
+        if table is not top and symbol.is_global():
+            used_globals.add(node.id)
+        if (table is top or symbol.is_global()) and node.id not in known and not star_import:
+            diagnostics.append(Diagnostic(node.lineno, node.col_offset, node.end_col_offset,
+                                          'error', f"نام تعریف‌نشده «{node.id}»"))
+
+    def visit(node, table, children):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, ast.Name):
+                if isinstance(child.ctx, ast.Load):
+                    check(child, table)
+                continue
+            scope = scope_of(child, children)
+            if scope is None:
+                visit(child, table, children)
+                continue
+            # Decorators, defaults, bases and the first iterable run in the enclosing scope.
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+                outer = [child.args] + list(getattr(child, 'decorator_list', []))
+                if getattr(child, 'returns', None) is not None:
+                    outer.append(child.returns)
+                inner = [child.body] if isinstance(child, ast.Lambda) else child.body
+            elif isinstance(child, ast.ClassDef):
+                outer = child.decorator_list + child.bases + child.keywords
+                inner = child.body
             else:
-                self.output.appendPlainText(f"دایرکتوری یافت نشد: {path}")
-        except Exception as e:
-            self.output.appendPlainText(f"خطا: {str(e)}")
-            
-    def list_files(self):
+                outer = [child.generators[0].iter]
+                inner = [g for g in child.generators]
+                inner[0] = ast.comprehension(target=inner[0].target, iter=ast.Constant(None),
+                                             ifs=inner[0].ifs, is_async=inner[0].is_async)
+                inner += [getattr(child, name) for name in ('elt', 'key', 'value')
+                          if hasattr(child, name)]
+            holder = ast.Module(body=[], type_ignores=[])
+            for item in outer:
+                holder.body = [item]
+                visit(holder, table, children)
+            inner_children = children_of(scope)
+            for item in inner:
+                holder.body = [item]
+                visit(holder, scope, inner_children)
+
+    visit(tree, top, children_of(top))
+
+    if os.path.basename(filename) != '__init__.py':
+        referenced = set()
+        for node in tree.body:
+            if isinstance(node, ast.Assign) and any(
+                    isinstance(t, ast.Name) and t.id == '__all__' for t in node.targets):
+                if isinstance(node.value, (ast.List, ast.Tuple)):
+                    referenced.update(e.value for e in node.value.elts
+                                    if isinstance(e, ast.Constant) and isinstance(e.value, str))
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.arg, ast.AnnAssign)):
+                annotations = [node.annotation]
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                annotations = [node.returns]
+            else:
+                continue
+            for annotation in filter(None, annotations):
+                for item in ast.walk(annotation):
+                    if isinstance(item, ast.Constant) and isinstance(item.value, str):
+                        try:
+                            expr = ast.parse(item.value, mode='eval')
+                        except SyntaxError:
+                            continue
+                        referenced.update(n.id for n in ast.walk(expr) if isinstance(n, ast.Name))
+        pending = list(tree.body)
+        while pending:
+            node = pending.pop()
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                continue
+            if isinstance(node, (ast.Import, ast.ImportFrom)):
+                if isinstance(node, ast.ImportFrom) and node.module == '__future__':
+                    continue
+                for alias in node.names:
+                    if alias.name == '*':
+                        continue
+                    bound = alias.asname or alias.name.split('.')[0]
+                    symbol = top.lookup(bound)
+                    if symbol.is_referenced() or bound in used_globals or bound in referenced:
+                        continue
+                    diagnostics.append(Diagnostic(
+                        getattr(alias, 'lineno', node.lineno),
+                        getattr(alias, 'col_offset', node.col_offset),
+                        getattr(alias, 'end_col_offset', None), 'warning',
+                        f"«{bound}» import شده ولی استفاده نشده است"))
+                continue
+            for field in ('body', 'orelse', 'finalbody'):
+                pending.extend(getattr(node, field, ()))
+            for handler in getattr(node, 'handlers', ()):
+                pending.extend(handler.body)
+
+    diagnostics.sort()
+    return diagnostics
+
+
+def analyze_file_bytes(data, filename):
+    try:
+        source = importlib.util.decode_source(data)
+    except (SyntaxError, UnicodeDecodeError, LookupError) as e:
+        return [Diagnostic(1, 0, None, 'error', f"خطای کدگذاری: {e}")]
+    return analyze_source(source, filename)
+
+
+class ProjectChecker:
+    """Analyses every .py file under a root in a process pool.
+
+    Results are cached by content hash in a store shared by the IDE and
+    ``--check``, so unchanged content is never analysed twice. The key also
+    records whether the file is a package ``__init__.py``, which the
+    analysis treats differently.
+    """
+
+    CACHE_VERSION = b'check-v1'
+    MAX_IN_FLIGHT = 256
+
+    def __init__(self, root, ignore=None, cache_path=None):
+        self.root = os.path.abspath(root)
+        self.ignore = ignore if ignore is not None else WorkspaceIgnore(self.root)
+        self.cache_path = cache_path or os.path.join(
+            app_data_dir('check'), f"cache-{self.CACHE_VERSION.decode()}.sqlite")
+        self.analysed = 0
+        self.cached = 0
+
+    def connect(self):
+        db = sqlite3.connect(self.cache_path, timeout=30)
+        db.execute('PRAGMA journal_mode=WAL')
+        db.execute('CREATE TABLE IF NOT EXISTS results(hash TEXT PRIMARY KEY, diagnostics TEXT)')
+        db.execute('CREATE TABLE IF NOT EXISTS stats('
+                   'path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, hash TEXT)')
+        return db
+
+    def python_files(self, cancel=None):
+        return (path for path in self.ignore.walk(cancel) if path.endswith('.py'))
+
+    def run(self, paths=None, cancel=None, on_result=None, workers=None, pool=None):
+        """Returns {path: [Diagnostic]}; on_result(path, diagnostics) is called as results arrive.
+
+        A caller-owned ``pool`` is reused and left running; otherwise one is
+        created for this run and shut down afterwards.
+        """
+        results = {}
+
+        def deliver(path, diagnostics):
+            results[path] = diagnostics
+            if on_result is not None:
+                on_result(path, diagnostics)
+
+        db = self.connect()
+        own_pool = pool is None
+        in_flight = {}
         try:
-            files = os.listdir(self.current_dir)
-            for f in sorted(files):
-                path = os.path.join(self.current_dir, f)
-                if os.path.isdir(path):
-                    self.output.appendPlainText(f"📁 {f}/")
-                else:
-                    self.output.appendPlainText(f"📄 {f}")
-        except Exception as e:
-            self.output.appendPlainText(f"خطا: {str(e)}")
-            
-    def run_python(self, script):
-        script_path = os.path.join(self.current_dir, script)
-        if os.path.exists(script_path):
-            self.output.appendPlainText(f"در حال اجرای {script}...")
-            thread = threading.Thread(target=self._run_python_thread, args=(script_path,))
-            thread.daemon = True
-            thread.start()
+            for path in (paths if paths is not None else self.python_files(cancel)):
+                if cancel is not None and cancel.is_set():
+                    break
+                entry = self._lookup(db, path)
+                if entry is None:
+                    continue
+                digest, diagnostics, data = entry
+                if diagnostics is not None:
+                    self.cached += 1
+                    deliver(path, diagnostics)
+                    continue
+                if pool is None:
+                    pool = ProcessPoolExecutor(
+                        max_workers=workers or os.cpu_count() or 2,
+                        mp_context=multiprocessing.get_context('spawn'))
+                in_flight[pool.submit(analyze_file_bytes, data, path)] = (path, digest)
+                if len(in_flight) >= self.MAX_IN_FLIGHT:
+                    self._collect(db, in_flight, deliver, FIRST_COMPLETED)
+            while in_flight and not (cancel is not None and cancel.is_set()):
+                self._collect(db, in_flight, deliver, FIRST_COMPLETED)
+        finally:
+            if own_pool and pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            else:
+                for future in in_flight:
+                    future.cancel()
+            db.close()
+        return results
+
+    def _lookup(self, db, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        data = None
+        row = db.execute('SELECT mtime_ns, size, hash FROM stats WHERE path=?', (path,)).fetchone()
+        if row is not None and row[:2] == (st.st_mtime_ns, st.st_size):
+            digest = row[2]
         else:
-            self.output.appendPlainText(f"فایل یافت نشد: {script}")
-            
-    def _run_python_thread(self, script_path):
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                return None
+            kind = b'init:' if os.path.basename(path) == '__init__.py' else b'module:'
+            digest = hashlib.sha256(self.CACHE_VERSION + kind + data).hexdigest()
+            with db:
+                db.execute('INSERT OR REPLACE INTO stats VALUES (?, ?, ?, ?)',
+                           (path, st.st_mtime_ns, st.st_size, digest))
+        cached = db.execute('SELECT diagnostics FROM results WHERE hash=?', (digest,)).fetchone()
+        if cached is not None:
+            return digest, [Diagnostic(*d) for d in json.loads(cached[0])], None
+        if data is None:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                return None
+        return digest, None, data
+
+    def _collect(self, db, in_flight, deliver, return_when):
+        done, _ = wait(list(in_flight), return_when=return_when)
+        rows = []
+        for future in done:
+            path, digest = in_flight.pop(future)
+            try:
+                diagnostics = future.result()
+            except Exception as e:
+                diagnostics = [Diagnostic(1, 0, None, 'error', f"تحلیل ناموفق: {e}")]
+            else:
+                rows.append((digest, json.dumps(diagnostics)))
+            self.analysed += 1
+            deliver(path, diagnostics)
+        with db:
+            db.executemany('INSERT OR REPLACE INTO results VALUES (?, ?)', rows)
+
+
+def run_check(root):
+    """Headless ``--check``: prints diagnostics and returns the process exit code."""
+    root = os.path.abspath(root)
+    if not os.path.isdir(root):
+        print(f"zenthflow: not a directory: {root}", file=sys.stderr)
+        return 2
+    checker = ProjectChecker(root)
+    started = time.perf_counter()
+    results = checker.run()
+    errors = warnings = 0
+    for path in sorted(results):
+        rel = os.path.relpath(path, root)
+        for d in results[path]:
+            print(f"{rel}:{d.line}:{d.col + 1}: {d.severity}: {d.message}")
+            if d.severity == 'error':
+                errors += 1
+            else:
+                warnings += 1
+    elapsed = time.perf_counter() - started
+    print(f"{len(results)} files, {errors} errors, {warnings} warnings "
+          f"({checker.analysed} analysed, {checker.cached} cached, {elapsed:.2f}s)",
+          file=sys.stderr)
+    return 1 if errors else 0
+
+
+class LiveDiagnostics(QObject):
+    """Analyses the active buffer in a worker process; only the newest job's result is applied."""
+
+    finished = pyqtSignal(object, int, list)
+
+    MAX_SHOWN = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.editor = None
+        self.editors = set()
+        self._future = None
+        self._pool = None
+        self.debounce = QTimer(self)
+        self.debounce.setSingleShot(True)
+        self.debounce.setInterval(300)
+        self.debounce.timeout.connect(self.run)
+        self.finished.connect(self.on_finished)
+
+    def track(self, editor):
+        self.editors.add(editor)
+        editor.document().contentsChanged.connect(
+            lambda editor=editor: self.schedule(editor))
+
+    def untrack(self, editor):
+        self.editors.discard(editor)
+        if editor is self.editor:
+            self.set_editor(None)
+
+    def set_editor(self, editor):
+        self.editor = editor
+        if editor is not None and editor.diagnostics_revision != editor.document().revision():
+            self.schedule(editor)
+
+    def schedule(self, editor):
+        if editor is not self.editor:
+            return
+        self.generation += 1
+        if self._future is not None:
+            self._future.cancel()
+            self._future = None
+        self.debounce.start()
+
+    def shutdown(self):
+        self.debounce.stop()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def run(self):
+        editor = self.editor
+        if editor is None:
+            return
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=1, mp_context=multiprocessing.get_context('spawn'))
+        generation = self.generation
+        revision = editor.document().revision()
+        self._future = self._pool.submit(
+            analyze_source, editor.toPlainText(), editor.file_path or '<buffer>')
+
+        def done(future):
+            if future.cancelled():
+                return
+            try:
+                diagnostics = future.result()
+            except Exception:
+                return
+            self.finished.emit((editor, revision), generation, diagnostics)
+        self._future.add_done_callback(done)
+
+    def on_finished(self, target, generation, diagnostics):
+        editor, revision = target
+        if generation != self.generation or editor not in self.editors:
+            return
+        self._future = None
+        editor.set_diagnostics(diagnostics[:self.MAX_SHOWN], revision)
+
+
+class ProblemsPanel(QWidget):
+
+    open_location = pyqtSignal(str, int, int)
+
+    def __init__(self, root_provider, files_provider=None, parent=None):
+        super().__init__(parent)
+        self.root_provider = root_provider
+        self.files_provider = files_provider
+        self.file_items = {}
+        self.results = queue.Queue()
+        self.generation = 0
+        self.checked_root = None
+        self.pending_recheck = set()
+        self._cancel = threading.Event()
+        self._pool = None
+
+        self.drain_timer = QTimer(self)
+        self.drain_timer.setInterval(100)
+        self.drain_timer.timeout.connect(self.drain)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        row = QHBoxLayout()
+        check_btn = QPushButton("▶ بررسی پروژه")
+        check_btn.clicked.connect(lambda: self.run_check())
+        row.addWidget(check_btn)
+        stop_btn = QPushButton("⏹️")
+        stop_btn.setFixedSize(30, 30)
+        stop_btn.clicked.connect(self.stop)
+        row.addWidget(stop_btn)
+        self.status_label = QLabel("")
+        row.addWidget(self.status_label, 1)
+        layout.addLayout(row)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderHidden(True)
+        self.tree.setUniformRowHeights(True)
+        self.tree.itemActivated.connect(self.on_item_activated)
+        self.tree.itemDoubleClicked.connect(self.on_item_activated)
+        layout.addWidget(self.tree, 1)
+        self.setLayout(layout)
+
+    def stop(self):
+        self._cancel.set()
+        self.generation += 1
+        self.pending_recheck.clear()
+        self.drain_timer.stop()
+        self.status_label.setText("متوقف شد")
+
+    def shutdown(self):
+        self._cancel.set()
+        self.drain_timer.stop()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def run_check(self, paths=None):
+        root = self.root_provider()
+        if paths is None:
+            self.tree.clear()
+            self.file_items.clear()
+            self.checked_root = root
+            self.pending_recheck.clear()
+            # The shared workspace list saves a walk; the checker walks itself when there is none.
+            if self.files_provider is not None:
+                paths = self.files_provider(root)
+        self._cancel.set()
+        self._cancel = threading.Event()
+        self.generation += 1
+        self.results = queue.Queue()
+        checker = ProjectChecker(root, WorkspaceIgnore.from_settings(root))
+        results = self.results
+        generation = self.generation
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=os.cpu_count() or 2, mp_context=multiprocessing.get_context('spawn'))
+        pool = self._pool
+
+        def work(cancel=self._cancel):
+            try:
+                checker.run(paths, cancel, lambda path, diagnostics: results.put((path, diagnostics)),
+                            pool=pool)
+            finally:
+                results.put((None, (checker.analysed, checker.cached)))
+        threading.Thread(target=work, daemon=True).start()
+        self.started_at = time.perf_counter()
+        self.status_label.setText("در حال بررسی...")
+        self.drain_timer.start()
+        return generation
+
+    def recheck(self, paths):
+        """Re-analyses saved files when the panel already shows results for their root.
+
+        Saves that arrive while a check is running are queued and checked
+        once it finishes.
+        """
+        root = self.checked_root
+        if root is None:
+            return
+        prefix = os.path.abspath(root) + os.sep
+        paths = [p for p in paths if p.endswith('.py') and os.path.abspath(p).startswith(prefix)]
+        for path in [p for p in paths if not os.path.isfile(p)]:
+            paths.remove(path)
+            self.show_file(path, [])
+        if not paths:
+            return
+        if self.drain_timer.isActive():
+            self.pending_recheck.update(paths)
+        else:
+            self.run_check(paths)
+
+    def drain(self):
+        deadline = time.perf_counter() + 0.012
+        self.tree.setUpdatesEnabled(False)
         try:
-            result = subprocess.run(
-                [sys.executable, script_path],
-                cwd=self.current_dir,
-                capture_output=True,
-                text=True
-            )
-            if result.stdout:
-                self.output.appendPlainText(result.stdout)
-            if result.stderr:
-                self.output.appendPlainText(f"خطا:\n{result.stderr}")
-        except Exception as e:
-            self.output.appendPlainText(f"خطا: {str(e)}")
-            
-    def run_system(self, cmd):
-        thread = threading.Thread(target=self._run_system_thread, args=(cmd,))
-        thread.daemon = True
-        thread.start()
-        
-    def _run_system_thread(self, cmd):
+            while time.perf_counter() < deadline:
+                try:
+                    path, diagnostics = self.results.get_nowait()
+                except queue.Empty:
+                    break
+                if path is None:
+                    self.finish(*diagnostics)
+                    break
+                self.show_file(path, diagnostics)
+        finally:
+            self.tree.setUpdatesEnabled(True)
+
+    def show_file(self, path, diagnostics):
+        old = self.file_items.pop(path, None)
+        if old is not None:
+            self.tree.takeTopLevelItem(self.tree.indexOfTopLevelItem(old))
+        if not diagnostics:
+            return
+        errors = sum(1 for d in diagnostics if d.severity == 'error')
+        rel = os.path.relpath(path, self.checked_root or self.root_provider())
+        item = QTreeWidgetItem([f"{rel}  ({errors} خطا، {len(diagnostics) - errors} هشدار)"])
+        item.setData(0, Qt.ItemDataRole.UserRole, (path, 1, 0))
+        children = []
+        for d in diagnostics:
+            icon = '⛔' if d.severity == 'error' else '⚠️'
+            child = QTreeWidgetItem([f"{icon} {d.line}:{d.col + 1}  {d.message}"])
+            child.setData(0, Qt.ItemDataRole.UserRole, (path, d.line, d.col))
+            children.append(child)
+        item.addChildren(children)
+        self.tree.addTopLevelItem(item)
+        self.file_items[path] = item
+
+    def finish(self, analysed, cached):
+        self.drain_timer.stop()
+        elapsed = time.perf_counter() - self.started_at
+        total = sum(item.childCount() for item in self.file_items.values())
+        self.status_label.setText(
+            f"{total} مشکل در {len(self.file_items)} فایل · "
+            f"{analysed} تحلیل، {cached} از حافظه · {elapsed:.2f} ثانیه")
+        if self.pending_recheck:
+            paths = sorted(self.pending_recheck)
+            self.pending_recheck.clear()
+            self.run_check(paths)
+
+    def on_item_activated(self, item, column=0):
+        data = item.data(0, Qt.ItemDataRole.UserRole)
+        if data:
+            self.open_location.emit(*data)
+
+
+ProfileEntry = namedtuple('ProfileEntry', 'name path line self_time total_time calls')
+
+
+class FlameNode:
+
+    def __init__(self, name, path, line):
+        self.name = name
+        self.path = path
+        self.line = line
+        self.value = 0.0
+        self.children = {}
+
+    def child(self, name, path, line):
+        node = self.children.get((name, path))
+        if node is None:
+            node = self.children[(name, path)] = FlameNode(name, path, line)
+        return node
+
+
+class ProfileResult:
+
+    def __init__(self, kind, entries, root):
+        self.kind = kind
+        self.entries = entries
+        self.root = root
+
+
+PY_SPY_FRAME = re.compile(r'^(.*?) \((.*?)(?::(\d+))?\)$')
+
+
+def load_collapsed_stacks(path, interval):
+    """ProfileResult from py-spy's raw (collapsed stack) output; one sample is `interval` seconds."""
+    root = FlameNode('all', None, 0)
+    self_samples = {}
+    total_samples = {}
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            stack, _, count = line.rstrip('\n').rpartition(' ')
+            if not stack or not count.isdigit():
+                continue
+            weight = int(count) * interval
+            root.value += weight
+            node = root
+            seen = set()
+            frame = None
+            for text in stack.split(';'):
+                match = PY_SPY_FRAME.match(text)
+                name, file, lineno = match.groups() if match else (text, '', None)
+                frame = (name, file, int(lineno or 0))
+                if frame not in seen:
+                    seen.add(frame)
+                    total_samples[frame] = total_samples.get(frame, 0.0) + weight
+                node = node.child(name, file, frame[2])
+                node.value += weight
+            if frame is not None:
+                self_samples[frame] = self_samples.get(frame, 0.0) + weight
+    entries = [ProfileEntry(name, file, line, self_samples.get((name, file, line), 0.0), total, None)
+               for (name, file, line), total in total_samples.items()]
+    return ProfileResult('py-spy', entries, root)
+
+
+def load_cprofile_stats(path, max_depth=64, min_fraction=0.001):
+    """ProfileResult from a cProfile dump; the flame tree is rebuilt from caller edges."""
+    import pstats
+    stats = pstats.Stats(path).stats
+    entries = []
+    callees = {}
+    for func, (cc, nc, tt, ct, callers) in stats.items():
+        file, line, name = func
+        entries.append(ProfileEntry(name, '' if file == '~' else file, line, tt, ct, nc))
+        for caller, edge in callers.items():
+            callees.setdefault(caller, []).append((func, edge[3]))
+    root = FlameNode('all', None, 0)
+    roots = [func for func, value in stats.items() if not value[4]]
+    root.value = sum(stats[func][3] for func in roots)
+    limit = root.value * min_fraction
+
+    def expand(parent, func, value, stack):
+        file, line, name = func
+        node = parent.child(name, '' if file == '~' else file, line)
+        node.value += value
+        if len(stack) >= max_depth:
+            return
+        children = [(callee, ct) for callee, ct in callees.get(func, ()) if callee not in stack]
+        total = sum(ct for _, ct in children)
+        scale = value / total if total > value and total else 1.0
+        stack.add(func)
+        for callee, ct in children:
+            if ct * scale >= limit:
+                expand(node, callee, ct * scale, stack)
+        stack.discard(func)
+
+    for func in roots:
+        expand(root, func, stats[func][3], set())
+    return ProfileResult('cProfile', entries, root)
+
+
+class ProfileRun:
+    """One "Run with Profiler": py-spy sampling when it is on PATH, cProfile otherwise."""
+
+    LABEL = "🔥"
+    SAMPLE_RATE = 200
+
+    def __init__(self):
+        self.sampler = shutil.which('py-spy')
+        self.kind = 'py-spy' if self.sampler else 'cProfile'
+        fd, self.output_path = tempfile.mkstemp(prefix='zenith-profile-')
+        os.close(fd)
+
+    def command(self, script_path):
+        if self.sampler:
+            return [self.sampler, 'record', '--format', 'raw', '--rate', str(self.SAMPLE_RATE),
+                    '--output', self.output_path, '--', sys.executable, script_path]
+        return [sys.executable, '-m', 'cProfile', '-o', self.output_path, script_path]
+
+    def load(self):
         try:
-            result = subprocess.run(
-                cmd,
-                cwd=self.current_dir,
-                capture_output=True,
-                text=True,
-                shell=True
-            )
-            if result.stdout:
-                self.output.appendPlainText(result.stdout)
-            if result.stderr:
-                self.output.appendPlainText(f"خطا:\n{result.stderr}")
-        except Exception as e:
-            self.output.appendPlainText(f"خطا: {str(e)}")
-            
-    def clear_output(self):
-        self.output.clear()
-        
-    def show_help(self):
-        help_text = """
-        دستورات موجود:
-        cd <path>    - تغییر دایرکتوری
-        pwd          - نمایش دایرکتوری جاری
-        ls/dir       - لیست فایل‌ها
-        clear        - پاک کردن صفحه
-        python <file>- اجرای فایل پایتون
-        help         - نمایش این راهنما
-        
-        کلیدهای میانبر:
-        Ctrl+Up      - دستور قبلی
-        Ctrl+Down    - دستور بعدی
-        """
-        self.output.appendPlainText(help_text)
-        
-    def history_up(self):
-        if self.history and self.history_index > 0:
-            self.history_index -= 1
-            self.input.setText(self.history[self.history_index])
-            
-    def history_down(self):
-        if self.history and self.history_index < len(self.history) - 1:
-            self.history_index += 1
-            self.input.setText(self.history[self.history_index])
+            if not os.path.getsize(self.output_path):
+                raise ValueError("نتیجه‌ای ثبت نشد")
+            if self.sampler:
+                return load_collapsed_stacks(self.output_path, 1.0 / self.SAMPLE_RATE)
+            return load_cprofile_stats(self.output_path)
+        except (OSError, EOFError, TypeError) as e:
+            raise ValueError(f"خواندن نتیجه ناموفق بود: {e}")
+        finally:
+            try:
+                os.unlink(self.output_path)
+            except OSError:
+                pass
+
+
+class SortableTreeItem(QTreeWidgetItem):
+    """Tree item that sorts on the value stored under SORT_ROLE when there is one."""
+
+    SORT_ROLE = Qt.ItemDataRole.UserRole + 1
+
+    def __lt__(self, other):
+        tree = self.treeWidget()
+        column = tree.sortColumn() if tree is not None else 0
+        mine = self.data(column, self.SORT_ROLE)
+        theirs = other.data(column, self.SORT_ROLE)
+        if mine is not None and theirs is not None:
+            return mine < theirs
+        return super().__lt__(other)
+
+
+class FlameGraph(QWidget):
+    """Top-down flame graph of a FlameNode tree; click a frame to open its source."""
+
+    open_location = pyqtSignal(str, int, int)
+
+    ROW_HEIGHT = 18
+    MIN_FRACTION = 0.0005
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.frames = []
+        self.total = 0.0
+        self.setMouseTracking(True)
+
+    def set_root(self, root):
+        self.frames = []
+        self.total = root.value
+        depth = 0
+        if self.total > 0:
+            stack = [(root, 0.0, 0)]
+            while stack:
+                node, start, level = stack.pop()
+                self.frames.append((start / self.total, node.value / self.total, level, node))
+                depth = max(depth, level + 1)
+                offset = start
+                for child in sorted(node.children.values(), key=lambda n: n.name):
+                    if child.value >= self.total * self.MIN_FRACTION:
+                        stack.append((child, offset, level + 1))
+                    offset += child.value
+        self.setMinimumHeight(depth * self.ROW_HEIGHT)
+        self.update()
+
+    def frame_color(self, name):
+        h = zlib.crc32(name.encode('utf-8', 'replace'))
+        return QColor(205 + h % 50, 80 + (h >> 8) % 130, 40 + (h >> 16) % 40)
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        metrics = QFontMetrics(self.font())
+        width = self.width()
+        clip = event.rect()
+        for x, w, level, node in self.frames:
+            px, pw, py = int(x * width), int(w * width), level * self.ROW_HEIGHT
+            if pw < 1 or py > clip.bottom() or py + self.ROW_HEIGHT < clip.top():
+                continue
+            painter.fillRect(px, py, max(pw - 1, 1), self.ROW_HEIGHT - 1, self.frame_color(node.name))
+            if pw > 30:
+                painter.setPen(QColor('#1e1e2e'))
+                text = metrics.elidedText(node.name, Qt.TextElideMode.ElideRight, pw - 6)
+                painter.drawText(px + 3, py, pw - 6, self.ROW_HEIGHT - 1,
+                                 int(Qt.AlignmentFlag.AlignVCenter), text)
+        painter.end()
+
+    def frame_at(self, pos):
+        level = pos.y() // self.ROW_HEIGHT
+        fraction = pos.x() / max(self.width(), 1)
+        for x, w, frame_level, node in self.frames:
+            if frame_level == level and x <= fraction < x + w:
+                return node
+        return None
+
+    def mouseMoveEvent(self, event):
+        node = self.frame_at(event.position().toPoint())
+        if node is not None and self.total:
+            where = f"{node.path}:{node.line}" if node.path else ""
+            QToolTip.showText(event.globalPosition().toPoint(),
+                              f"{node.name}\n{where}\n{node.value:.3f}s ({100 * node.value / self.total:.1f}%)",
+                              self)
         else:
-            self.history_index = len(self.history)
-            self.input.clear()
+            QToolTip.hideText()
+        super().mouseMoveEvent(event)
+
+    def mousePressEvent(self, event):
+        node = self.frame_at(event.position().toPoint())
+        if node is not None and node.path and os.path.isfile(node.path):
+            self.open_location.emit(node.path, max(node.line, 1), 0)
+        super().mousePressEvent(event)
+
+
+class ProfilerPanel(QWidget):
+    """Hotspot table and flame graph for the last "Run with Profiler"."""
+
+    open_location = pyqtSignal(str, int, int)
+    loaded = pyqtSignal(object, object)
+    result_ready = pyqtSignal()
+
+    MAX_ROWS = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.generation = 0
+        self.loaded.connect(self.on_loaded)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.status_label = QLabel("برای پروفایل، «اجرا با پروفایلر» را بزنید")
+        layout.addWidget(self.status_label)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.table = QTreeWidget()
+        self.table.setRootIsDecorated(False)
+        self.table.setUniformRowHeights(True)
+        self.table.setHeaderLabels(["تابع", "خودی (s)", "تجمعی (s)", "فراخوانی", "محل"])
+        self.table.setSortingEnabled(True)
+        self.table.itemActivated.connect(self.on_item_activated)
+        self.table.itemClicked.connect(self.on_item_activated)
+        splitter.addWidget(self.table)
+
+        self.flame = FlameGraph()
+        self.flame.open_location.connect(self.open_location)
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setWidget(self.flame)
+        splitter.addWidget(scroll)
+        layout.addWidget(splitter, 1)
+        self.setLayout(layout)
+
+    def track(self, run, job):
+        self.generation += 1
+        generation = self.generation
+        self.status_label.setText(f"در حال پروفایل {job.label} با {run.kind}...")
+        if job.error:
+            self.load(run, generation)
+        else:
+            job.finished.connect(lambda _code: self.load(run, generation))
+
+    def load(self, run, generation):
+        def work():
+            try:
+                self.loaded.emit(generation, run.load())
+            except ValueError as e:
+                self.loaded.emit(generation, str(e))
+        threading.Thread(target=work, daemon=True).start()
+
+    def on_loaded(self, generation, result):
+        if generation != self.generation:
+            return
+        if isinstance(result, str):
+            self.status_label.setText(f"پروفایل ناموفق: {result}")
+            return
+        self.show_result(result)
+        self.result_ready.emit()
+
+    def show_result(self, result):
+        entries = sorted(result.entries, key=lambda e: e.self_time, reverse=True)[:self.MAX_ROWS]
+        self.table.setSortingEnabled(False)
+        self.table.clear()
+        items = []
+        for entry in entries:
+            where = f"{os.path.basename(entry.path)}:{entry.line}" if entry.path else "built-in"
+            calls = "" if entry.calls is None else str(entry.calls)
+            item = SortableTreeItem([entry.name, f"{entry.self_time:.3f}", f"{entry.total_time:.3f}",
+                                     calls, where])
+            item.setData(0, Qt.ItemDataRole.UserRole, (entry.path, entry.line, 0) if entry.path else None)
+            item.setData(1, SortableTreeItem.SORT_ROLE, entry.self_time)
+            item.setData(2, SortableTreeItem.SORT_ROLE, entry.total_time)
+            item.setData(3, SortableTreeItem.SORT_ROLE, entry.calls or 0)
+            item.setToolTip(4, entry.path)
+            items.append(item)
+        self.table.addTopLevelItems(items)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(1, Qt.SortOrder.DescendingOrder)
+        self.table.resizeColumnToContents(0)
+        self.flame.set_root(result.root)
+        self.status_label.setText(
+            f"{result.kind} · {result.root.value:.2f}s · {len(result.entries)} تابع")
+
+    def on_item_activated(self, item, column=0):
+        data = item.data(0, Qt.ItemDataRole.UserRole)
+        if data and os.path.isfile(data[0]):
+            self.open_location.emit(*data)
 
 
+MEMORY_TRACER_SOURCE = r'''
+import json, os, runpy, sys, threading, time, tracemalloc
 
-class FileExplorer(QWidget):
+output_path, interval, script = sys.argv[1], float(sys.argv[2]), sys.argv[3]
+sys.argv = sys.argv[3:]
+sys.path[0] = os.path.dirname(os.path.abspath(script))
+filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, "<frozen *>"),
+           tracemalloc.Filter(False, "<string>")]
+started = time.perf_counter()
+lock = threading.Lock()
+stop = threading.Event()
+previous = None
+
+
+def frame(stat):
+    return [stat.traceback[0].filename, stat.traceback[0].lineno]
+
+
+def record(final=False):
+    global previous
+    with lock:
+        snapshot = tracemalloc.take_snapshot().filter_traces(filters)
+        current, peak = tracemalloc.get_traced_memory()
+        top = [frame(s) + [s.size, s.count] for s in snapshot.statistics("lineno")[:30]]
+        growth = []
+        if previous is not None:
+            growth = [frame(d) + [d.size_diff, d.count_diff]
+                      for d in snapshot.compare_to(previous, "lineno")[:30] if d.size_diff]
+        previous = snapshot
+        line = json.dumps({"elapsed": time.perf_counter() - started, "current": current, "peak": peak,
+                           "top": top, "growth": growth, "final": final})
+        with open(output_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+
+def sample():
+    while not stop.wait(interval):
+        record()
+
+
+tracemalloc.start()
+threading.Thread(target=sample, daemon=True).start()
+namespace = None
+try:
+    # Holding the script's globals keeps the final snapshot representative of its end state.
+    namespace = runpy.run_path(script, run_name="__main__")
+finally:
+    stop.set()
+    record(final=True)
+    tracemalloc.stop()
+'''
+
+MemorySnapshot = namedtuple('MemorySnapshot', 'elapsed current peak top growth final')
+
+
+def format_bytes(size):
+    for unit in ('B', 'K', 'M'):
+        if abs(size) < 1024:
+            return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}G"
+
+
+class MemoryTraceRun:
+    """One "Run with memory tracing": tracemalloc snapshots appended as JSON lines while it runs."""
+
+    LABEL = "🧠"
+    kind = 'tracemalloc'
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.offset = 0
+        self.partial = b''
+        fd, self.output_path = tempfile.mkstemp(prefix='zenith-memory-', suffix='.jsonl')
+        os.close(fd)
+
+    def command(self, script_path):
+        return [sys.executable, '-c', MEMORY_TRACER_SOURCE, self.output_path,
+                str(self.interval), script_path]
+
+    def read_new(self):
+        """Snapshots written since the last call; a half-written last line waits for the next one."""
+        try:
+            with open(self.output_path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read()
+        except OSError:
+            return []
+        self.offset += len(data)
+        lines = (self.partial + data).split(b'\n')
+        self.partial = lines.pop()
+        snapshots = []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            snapshots.append(MemorySnapshot(
+                record['elapsed'], record['current'], record['peak'],
+                [tuple(entry) for entry in record['top']],
+                [tuple(entry) for entry in record['growth']], record['final']))
+        return snapshots
+
+    def cleanup(self):
+        try:
+            os.unlink(self.output_path)
+        except OSError:
+            pass
+
+
+class MemoryPanel(QWidget):
+    """Snapshot timeline and top allocating lines of the last memory-traced run."""
+
+    open_location = pyqtSignal(str, int, int)
+    annotations_changed = pyqtSignal(object)
+
+    POLL_MS = 500
 
-    
-    file_open_request = pyqtSignal(str)
-    
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.run = None
+        self.snapshots = []
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(self.POLL_MS)
+        self.poll_timer.timeout.connect(self.poll)
         self.setup_ui()
-        
+
     def setup_ui(self):
         layout = QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
-        
-        toolbar = QToolBar()
-        refresh_btn = QPushButton("🔄")
-        refresh_btn.setFixedSize(30, 30)
-        refresh_btn.clicked.connect(self.refresh)
-        toolbar.addWidget(refresh_btn)
-        
-        new_file_btn = QPushButton("📄")
-        new_file_btn.setFixedSize(30, 30)
-        new_file_btn.clicked.connect(self.new_file)
-        toolbar.addWidget(new_file_btn)
-        
-        new_folder_btn = QPushButton("📁")
-        new_folder_btn.setFixedSize(30, 30)
-        new_folder_btn.clicked.connect(self.new_folder)
-        toolbar.addWidget(new_folder_btn)
-        
-        layout.addWidget(toolbar)
-        
+        self.status_label = QLabel("برای ردیابی حافظه، «اجرا با ردیابی حافظه» را بزنید")
+        layout.addWidget(self.status_label)
 
-        self.tree = QTreeView()
-        self.model = QFileSystemModel()
-        self.model.setRootPath(os.getcwd())
-        self.tree.setModel(self.model)
-        self.tree.setRootIndex(self.model.index(os.getcwd()))
-        self.tree.setHeaderHidden(True)
-        self.tree.setAnimated(True)
-        self.tree.setIndentation(20)
-        self.tree.doubleClicked.connect(self.on_double_click)
-        
-        layout.addWidget(self.tree)
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.timeline = QTreeWidget()
+        self.timeline.setRootIsDecorated(False)
+        self.timeline.setUniformRowHeights(True)
+        self.timeline.setHeaderLabels(["زمان", "فعلی", "اوج", "تغییر"])
+        self.timeline.currentItemChanged.connect(self.on_snapshot_selected)
+        splitter.addWidget(self.timeline)
+
+        self.lines = QTreeWidget()
+        self.lines.setRootIsDecorated(False)
+        self.lines.setUniformRowHeights(True)
+        self.lines.setHeaderLabels(["محل", "اندازه", "بلوک‌ها", "رشد"])
+        self.lines.setSortingEnabled(True)
+        self.lines.itemActivated.connect(self.on_item_activated)
+        self.lines.itemClicked.connect(self.on_item_activated)
+        splitter.addWidget(self.lines)
+        splitter.setStretchFactor(1, 2)
+        layout.addWidget(splitter, 1)
         self.setLayout(layout)
-        
-    def set_root(self, path):
-        self.tree.setRootIndex(self.model.index(path))
-        
-    def refresh(self):
-        self.model.setRootPath(os.getcwd())
-        
-    def new_file(self):
-        path, ok = QInputDialog.getText(self, "فایل جدید", "نام فایل:")
-        if ok and path:
-            if not path.endswith('.py'):
-                path += '.py'
-            full_path = os.path.join(self.model.rootPath(), path)
-            try:
-                with open(full_path, 'w', encoding='utf-8') as f:
-                    f.write('# -*- coding: utf-8 -*-\n\n')
-                self.refresh()
-            except Exception as e:
-                QMessageBox.critical(self, "خطا", str(e))
-                
-    def new_folder(self):
-        name, ok = QInputDialog.getText(self, "پوشه جدید", "نام پوشه:")
-        if ok and name:
-            try:
-                os.mkdir(os.path.join(self.model.rootPath(), name))
-                self.refresh()
-            except Exception as e:
-                QMessageBox.critical(self, "خطا", str(e))
-                
-    def on_double_click(self, index):
-        path = self.model.filePath(index)
-        if os.path.isfile(path) and path.endswith('.py'):
-            self.file_open_request.emit(path)
 
+    def track(self, run, job):
+        if self.run is not None:
+            self.run.cleanup()
+        self.run = run
+        self.snapshots = []
+        self.timeline.clear()
+        self.lines.clear()
+        self.annotations_changed.emit({})
+        self.status_label.setText(f"در حال ردیابی حافظه {job.label}...")
+        if job.error:
+            self.finish(run)
+        else:
+            job.finished.connect(lambda _code: self.finish(run))
+            self.poll_timer.start()
 
+    def finish(self, run):
+        if run is not self.run:
+            return
+        self.poll_timer.stop()
+        self.poll()
+        run.cleanup()
+        if not self.snapshots:
+            self.status_label.setText("ردیابی حافظه ناموفق: نتیجه‌ای ثبت نشد")
 
-class OutputPanel(QWidget):
-   
-    
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)
-        
-        self.output = QPlainTextEdit()
-        self.output.setReadOnly(True)
-        self.output.setFont(QFont("Courier New", 10))
-        layout.addWidget(self.output)
-        
-        clear_btn = QPushButton("🗑️ پاک کردن")
-        clear_btn.clicked.connect(self.output.clear)
-        layout.addWidget(clear_btn)
-        
-        self.setLayout(layout)
-        
-    def append(self, text):
-        self.output.appendPlainText(text)
+    def poll(self):
+        snapshots = self.run.read_new() if self.run is not None else []
+        if not snapshots:
+            return
+        follow = self.timeline.currentItem() is None or \
+            self.timeline.indexOfTopLevelItem(self.timeline.currentItem()) == len(self.snapshots) - 1
+        for snapshot in snapshots:
+            previous = self.snapshots[-1].current if self.snapshots else 0
+            label = "پایان" if snapshot.final else f"{snapshot.elapsed:.1f}s"
+            item = QTreeWidgetItem([label, format_bytes(snapshot.current), format_bytes(snapshot.peak),
+                                    ("+" if snapshot.current >= previous else "") +
+                                    format_bytes(snapshot.current - previous)])
+            self.snapshots.append(snapshot)
+            self.timeline.addTopLevelItem(item)
+        if follow:
+            self.timeline.setCurrentItem(self.timeline.topLevelItem(len(self.snapshots) - 1))
+        latest = self.snapshots[-1]
+        self.status_label.setText(
+            f"tracemalloc · اوج {format_bytes(max(s.peak for s in self.snapshots))} · "
+            f"فعلی {format_bytes(latest.current)} · {len(self.snapshots)} snapshot")
+        annotations = {}
+        for path, line, size, _count in latest.top:
+            annotations.setdefault(path, {})[line] = format_bytes(size)
+        self.annotations_changed.emit(annotations)
+
+    def on_snapshot_selected(self, item, _previous=None):
+        if item is None:
+            return
+        snapshot = self.snapshots[self.timeline.indexOfTopLevelItem(item)]
+        growth = {(path, line): diff for path, line, diff, _count in snapshot.growth}
+        rows = {(path, line): (size, count) for path, line, size, count in snapshot.top}
+        for key in growth:
+            rows.setdefault(key, (None, None))
+        self.lines.setSortingEnabled(False)
+        self.lines.clear()
+        items = []
+        for (path, line), (size, count) in rows.items():
+            diff = growth.get((path, line), 0)
+            item = SortableTreeItem([
+                f"{os.path.basename(path)}:{line}", "" if size is None else format_bytes(size),
+                "" if count is None else str(count),
+                (("+" if diff > 0 else "") + format_bytes(diff)) if diff else ""])
+            item.setToolTip(0, path)
+            item.setData(0, Qt.ItemDataRole.UserRole, (path, line, 0))
+            item.setData(1, SortableTreeItem.SORT_ROLE, size or 0)
+            item.setData(2, SortableTreeItem.SORT_ROLE, count or 0)
+            item.setData(3, SortableTreeItem.SORT_ROLE, diff)
+            items.append(item)
+        self.lines.addTopLevelItems(items)
+        self.lines.setSortingEnabled(True)
+        self.lines.sortByColumn(1, Qt.SortOrder.DescendingOrder)
+        self.lines.resizeColumnToContents(0)
 
+    def on_item_activated(self, item, column=0):
+        data = item.data(0, Qt.ItemDataRole.UserRole)
+        if data and os.path.isfile(data[0]):
+            self.open_location.emit(*data)
 
 
 class SettingsDialog(QDialog):
@@ -842,14 +7336,82 @@ class SettingsDialog(QDialog):
         auto_layout = QHBoxLayout()
         self.auto_save = QCheckBox("فعال")
         auto_layout.addWidget(self.auto_save)
-        self.auto_interval = QSpinBox()
-        self.auto_interval.setRange(10, 300)
-        self.auto_interval.setSuffix(" ثانیه")
-        auto_layout.addWidget(self.auto_interval)
+        auto_layout.addWidget(QLabel("تاخیر پس از آخرین تایپ:"))
+        self.auto_delay = QSpinBox()
+        self.auto_delay.setRange(1, 300)
+        self.auto_delay.setSuffix(" ثانیه")
+        auto_layout.addWidget(self.auto_delay)
         auto_group.setLayout(auto_layout)
         layout.addWidget(auto_group)
         
       
+        highlight_group = QGroupBox("هایلایت فایل‌های بزرگ")
+        highlight_layout = QHBoxLayout()
+        highlight_layout.addWidget(QLabel("بودجه زمانی هر برش:"))
+        self.highlight_slice = QSpinBox()
+        self.highlight_slice.setRange(1, 100)
+        self.highlight_slice.setSuffix(" ms")
+        highlight_layout.addWidget(self.highlight_slice)
+        highlight_group.setLayout(highlight_layout)
+        layout.addWidget(highlight_group)
+        
+        viewer_group = QGroupBox("فایل‌های حجیم")
+        viewer_layout = QHBoxLayout()
+        viewer_layout.addWidget(QLabel("نمایش فقط خواندنی بالاتر از:"))
+        self.viewer_threshold = QSpinBox()
+        self.viewer_threshold.setRange(1, 4096)
+        self.viewer_threshold.setSuffix(" MB")
+        viewer_layout.addWidget(self.viewer_threshold)
+        viewer_group.setLayout(viewer_layout)
+        layout.addWidget(viewer_group)
+        
+        exclude_group = QGroupBox("فایل‌های نادیده گرفته شده")
+        exclude_layout = QHBoxLayout()
+        self.exclude_patterns = QLineEdit()
+        self.exclude_patterns.setPlaceholderText("*.log, data/, out/")
+        exclude_layout.addWidget(self.exclude_patterns)
+        exclude_group.setLayout(exclude_layout)
+        layout.addWidget(exclude_group)
+        
+        output_group = QGroupBox("خروجی و ترمینال")
+        output_layout = QHBoxLayout()
+        output_layout.addWidget(QLabel("حداکثر خطوط:"))
+        self.output_max_lines = QSpinBox()
+        self.output_max_lines.setRange(100, 1000000)
+        self.output_max_lines.setSingleStep(1000)
+        output_layout.addWidget(self.output_max_lines)
+        self.output_spill = QCheckBox("ذخیره کل خروجی روی دیسک")
+        output_layout.addWidget(self.output_spill)
+        output_group.setLayout(output_layout)
+        layout.addWidget(output_group)
+        
+        jobs_group = QGroupBox("اجرای برنامه‌ها")
+        jobs_layout = QHBoxLayout()
+        jobs_layout.addWidget(QLabel("حداکثر همزمان:"))
+        self.max_jobs = QSpinBox()
+        self.max_jobs.setRange(1, 32)
+        jobs_layout.addWidget(self.max_jobs)
+        jobs_layout.addWidget(QLabel("مهلت زمانی:"))
+        self.job_timeout = QSpinBox()
+        self.job_timeout.setRange(0, 86400)
+        self.job_timeout.setSuffix(" ثانیه")
+        self.job_timeout.setSpecialValueText("نامحدود")
+        jobs_layout.addWidget(self.job_timeout)
+        jobs_group.setLayout(jobs_layout)
+        layout.addWidget(jobs_group)
+        
+        warm_group = QGroupBox("مفسر گرم (اجرای سریع)")
+        warm_layout = QHBoxLayout()
+        self.warm_pool = QCheckBox("فعال")
+        self.warm_pool.setEnabled(WarmInterpreterPool.supported)
+        warm_layout.addWidget(self.warm_pool)
+        warm_layout.addWidget(QLabel("ماژول‌های پیش‌بارگذاری:"))
+        self.warm_preload = QLineEdit()
+        self.warm_preload.setPlaceholderText("numpy, pandas")
+        warm_layout.addWidget(self.warm_preload)
+        warm_group.setLayout(warm_layout)
+        layout.addWidget(warm_group)
+        
         line_group = QGroupBox("شماره خط")
         line_layout = QHBoxLayout()
         self.show_line_numbers = QCheckBox("نمایش شماره خطوط")
@@ -876,45 +7438,249 @@ class SettingsDialog(QDialog):
         self.font_size.setValue(settings.value("font_size", 11, type=int))
         self.dark_theme.setChecked(settings.value("dark_theme", True, type=bool))
         self.auto_save.setChecked(settings.value("auto_save", True, type=bool))
-        self.auto_interval.setValue(settings.value("auto_interval", 30, type=int))
+        self.auto_delay.setValue(settings.value("auto_save_delay", 2, type=int))
         self.show_line_numbers.setChecked(settings.value("show_line_numbers", True, type=bool))
+        self.highlight_slice.setValue(settings.value("highlight_slice_ms", 8, type=int))
+        self.viewer_threshold.setValue(settings.value("viewer_threshold_mb", 64, type=int))
+        self.exclude_patterns.setText(settings.value("exclude_patterns", "", type=str))
+        self.output_max_lines.setValue(settings.value("output_max_lines", 10000, type=int))
+        self.output_spill.setChecked(settings.value("output_spill", False, type=bool))
+        self.max_jobs.setValue(settings.value("max_jobs", 4, type=int))
+        self.job_timeout.setValue(settings.value("job_timeout", 0, type=int))
+        self.warm_pool.setChecked(settings.value("warm_pool", False, type=bool))
+        self.warm_preload.setText(settings.value("warm_preload", "", type=str))
         
     def save_settings(self):
         settings = QSettings("ZenithFlow", "IDE")
         settings.setValue("font_size", self.font_size.value())
         settings.setValue("dark_theme", self.dark_theme.isChecked())
         settings.setValue("auto_save", self.auto_save.isChecked())
-        settings.setValue("auto_interval", self.auto_interval.value())
+        settings.setValue("auto_save_delay", self.auto_delay.value())
         settings.setValue("show_line_numbers", self.show_line_numbers.isChecked())
+        settings.setValue("highlight_slice_ms", self.highlight_slice.value())
+        settings.setValue("viewer_threshold_mb", self.viewer_threshold.value())
+        settings.setValue("exclude_patterns", self.exclude_patterns.text())
+        settings.setValue("output_max_lines", self.output_max_lines.value())
+        settings.setValue("output_spill", self.output_spill.isChecked())
+        settings.setValue("max_jobs", self.max_jobs.value())
+        settings.setValue("job_timeout", self.job_timeout.value())
+        settings.setValue("warm_pool", self.warm_pool.isChecked())
+        settings.setValue("warm_preload", self.warm_preload.text())
         self.accept()
 
 
 
+class RecoveryJournal:
+    """Compact per-session journal of unsaved buffers, written on a background thread.
+
+    Every session owns recovery/<pid>-<start time>/ with a lock file; a clean
+    exit removes the directory, so any directory whose process is gone was
+    left behind by a crash.
+    """
+
+    LOCK_NAME = "session.lock"
+    SUFFIX = ".zfr"
+
+    def __init__(self, root=None):
+        self.root = root or app_data_dir("recovery")
+        self.session_dir = os.path.join(self.root, f"{os.getpid()}-{int(time.time())}")
+        os.makedirs(self.session_dir, exist_ok=True)
+        with open(os.path.join(self.session_dir, self.LOCK_NAME), 'w', encoding='utf-8') as f:
+            f.write(str(os.getpid()))
+
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._writer, daemon=True)
+        self._thread.start()
+
+    def write(self, doc_id, path, title, text):
+        with self._lock:
+            self._pending[doc_id] = (path, title, text)
+        self._wakeup.set()
+
+    def discard(self, doc_id):
+        with self._lock:
+            self._pending[doc_id] = None
+        self._wakeup.set()
+
+    def close(self):
+        self._stopping = True
+        self._wakeup.set()
+        self._thread.join(5)
+        shutil.rmtree(self.session_dir, ignore_errors=True)
+
+    def _entry_path(self, doc_id):
+        return os.path.join(self.session_dir, doc_id + self.SUFFIX)
+
+    def _writer(self):
+        while True:
+            self._wakeup.wait()
+            self._wakeup.clear()
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            for doc_id, entry in pending.items():
+                try:
+                    if entry is None:
+                        os.remove(self._entry_path(doc_id))
+                    else:
+                        atomic_write_bytes(self._entry_path(doc_id), self.encode(doc_id, *entry))
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    print(f"recovery journal: {e}", file=sys.stderr)
+            if self._stopping:
+                return
+
+    @staticmethod
+    def encode(doc_id, path, title, text):
+        header = json.dumps({
+            'id': doc_id, 'path': path, 'title': title, 'time': time.time()
+        }).encode('utf-8')
+        return struct.pack('>I', len(header)) + header + zlib.compress(text.encode('utf-8'), 6)
+
+    @staticmethod
+    def decode(data):
+        (length,) = struct.unpack_from('>I', data)
+        header = json.loads(data[4:4 + length].decode('utf-8'))
+        header['text'] = zlib.decompress(data[4 + length:]).decode('utf-8')
+        return header
+
+    @staticmethod
+    def _process_alive(pid):
+        if pid == os.getpid():
+            return True
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except (PermissionError, OSError):
+            return True
+        return True
+
+    def orphaned_sessions(self):
+        sessions = []
+        for name in os.listdir(self.root):
+            directory = os.path.join(self.root, name)
+            if directory == self.session_dir or not os.path.isdir(directory):
+                continue
+            try:
+                with open(os.path.join(directory, self.LOCK_NAME), encoding='utf-8') as f:
+                    pid = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                pid = 0
+            if pid and self._process_alive(pid):
+                continue
+            sessions.append(directory)
+        return sessions
+
+    def load_entries(self, directory):
+        entries = []
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(self.SUFFIX):
+                continue
+            try:
+                with open(os.path.join(directory, name), 'rb') as f:
+                    entries.append(self.decode(f.read()))
+            except (OSError, ValueError, zlib.error, struct.error) as e:
+                print(f"recovery journal: skipping {name}: {e}", file=sys.stderr)
+        return entries
+
+
+class AutoSaveEngine(QObject):
+    """Debounced, per-document auto-save; documents that are not being edited cost nothing."""
+
+    def __init__(self, journal, delay_ms=2000, parent=None):
+        super().__init__(parent)
+        self.journal = journal
+        self.delay_ms = delay_ms
+        self.save_to_disk = True
+        self._timers = {}
+
+    def track(self, editor):
+        editor.recovery_id = uuid.uuid4().hex
+        editor.document().contentsChanged.connect(lambda editor=editor: self.touch(editor))
+        editor.saveFinished.connect(
+            lambda path, ok, message, automatic, editor=editor: self._on_saved(editor, ok))
+
+    def untrack(self, editor):
+        timer = self._timers.pop(editor.recovery_id, None)
+        if timer is not None:
+            timer.stop()
+            timer.deleteLater()
+        self.journal.discard(editor.recovery_id)
+
+    def set_delay(self, delay_ms):
+        self.delay_ms = delay_ms
+
+    def touch(self, editor):
+        timer = self._timers.get(editor.recovery_id)
+        if timer is None:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda editor=editor: self._flush(editor))
+            self._timers[editor.recovery_id] = timer
+        timer.start(self.delay_ms)
+
+    def _flush(self, editor):
+        timer = self._timers.pop(editor.recovery_id, None)
+        if timer is not None:
+            timer.deleteLater()
+        if not editor.document().isModified():
+            self.journal.discard(editor.recovery_id)
+            return
+        title = os.path.basename(editor.file_path) if editor.file_path else "بدون نام"
+        self.journal.write(editor.recovery_id, editor.file_path, title, editor.toPlainText())
+        if self.save_to_disk and editor.file_path and not editor.recovered:
+            editor.save_file(automatic=True)
+
+    def _on_saved(self, editor, ok):
+        if ok and not editor.document().isModified():
+            self.journal.discard(editor.recovery_id)
+
+
+
 class MainWindow(QMainWindow):
   
     
     def __init__(self):
         super().__init__()
+        self.settings = QSettings("ZenithFlow", "IDE")
+        ThemeManager.set_theme('dark' if self.settings.value("dark_theme", True, type=bool) else 'light')
         self.theme_manager = ThemeManager()
         self.theme_manager.apply_theme(QApplication.instance())
         
-        self.settings = QSettings("ZenithFlow", "IDE")
         self.current_file = None
+
+        self.journal = RecoveryJournal()
+        self.auto_saver = AutoSaveEngine(
+            self.journal, self.settings.value("auto_save_delay", 2, type=int) * 1000, self)
+        self.auto_saver.save_to_disk = self.settings.value("auto_save", True, type=bool)
+        self.project_index = None
+        self.symbol_index = None
+        self.file_list = None
+        self.completion_engine = CompletionEngine(self)
+        self.live_diagnostics = LiveDiagnostics(self)
+        self.process_manager = ProcessManager(self)
+        self.process_manager.job_finished.connect(self.on_job_finished)
+        self.memory_annotations = {}
         
         self.setup_window()
         self.create_menubar()
         self.setup_ui()
         self.setup_statusbar()
         self.setup_shortcuts()
-        
-    
-        self.auto_save_timer = QTimer()
-        self.auto_save_timer.timeout.connect(self.auto_save)
-        auto_interval = self.settings.value("auto_interval", 30, type=int)
-        self.auto_save_timer.start(auto_interval * 1000)
+        self.warm_pool = None
+        self.configure_warm_pool()
         
        
         self.show_splash()
+        QTimer.singleShot(0, self.offer_recovery)
+        last_folder = self.settings.value("last_folder", "", type=str)
+        if last_folder and os.path.isdir(last_folder):
+            self.explorer.set_root(last_folder)
+            self.set_project_root(last_folder)
         
     def setup_window(self):
         self.setWindowTitle("ZenithFlow IDE - Python IDE")
@@ -949,22 +7715,52 @@ class MainWindow(QMainWindow):
         self.tabs = QTabWidget()
         self.tabs.setTabsClosable(True)
         self.tabs.tabCloseRequested.connect(self.close_tab)
+        self.tabs.currentChanged.connect(self.on_tab_changed)
         center_layout.addWidget(self.tabs, 1)
+
+        self.find_bar = FindBar()
+        center_layout.addWidget(self.find_bar)
         
         
         self.bottom_panel = QTabWidget()
         
         self.output = OutputPanel()
+        self.output.output.scrollback_requested.connect(self.open_file)
         self.bottom_panel.addTab(self.output, "📟 خروجی")
         
-        self.terminal = PythonTerminal()
+        self.terminal = TerminalTabs(self.process_manager)
+        self.terminal.scrollback_requested.connect(self.open_file)
         self.bottom_panel.addTab(self.terminal, "💻 ترمینال")
+
+        self.find_in_files = FindInFilesPanel(
+            self.workspace_root, lambda: self.project_index)
+        self.find_in_files.open_location.connect(self.open_location)
+        self.bottom_panel.addTab(self.find_in_files, "🔎 جستجو در فایل‌ها")
+
+        self.problems = ProblemsPanel(self.workspace_root, self.workspace_python_files)
+        self.problems.open_location.connect(self.open_location)
+        self.bottom_panel.addTab(self.problems, "⚠️ مشکلات")
+
+        self.profiler = ProfilerPanel()
+        self.profiler.open_location.connect(self.open_location)
+        self.profiler.result_ready.connect(lambda: self.bottom_panel.setCurrentWidget(self.profiler))
+        self.bottom_panel.addTab(self.profiler, "🔥 پروفایلر")
+
+        self.memory = MemoryPanel()
+        self.memory.open_location.connect(self.open_location)
+        self.memory.annotations_changed.connect(self.set_memory_annotations)
+        self.bottom_panel.addTab(self.memory, "🧠 حافظه")
         
         self.bottom_panel.setMaximumHeight(250)
         center_layout.addWidget(self.bottom_panel)
         
         center.setLayout(center_layout)
         layout.addWidget(center, 1)
+
+        self.outline = OutlineDock(self)
+        self.outline.setAllowedAreas(
+            Qt.DockWidgetArea.LeftDockWidgetArea | Qt.DockWidgetArea.RightDockWidgetArea)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.outline)
         
         central.setLayout(layout)
         
@@ -999,6 +7795,14 @@ class MainWindow(QMainWindow):
         run_btn.triggered.connect(self.run_file)
         toolbar.addAction(run_btn)
         
+        profile_btn = QAction("🔥 اجرا با پروفایلر", self)
+        profile_btn.triggered.connect(self.profile_file)
+        toolbar.addAction(profile_btn)
+        
+        memory_btn = QAction("🧠 اجرا با ردیابی حافظه", self)
+        memory_btn.triggered.connect(self.memory_trace_file)
+        toolbar.addAction(memory_btn)
+        
         stop_btn = QAction("⏹️ توقف", self)
         stop_btn.triggered.connect(self.stop_execution)
         toolbar.addAction(stop_btn)
@@ -1028,6 +7832,11 @@ class MainWindow(QMainWindow):
         open_action.triggered.connect(self.open_file_dialog)
         file_menu.addAction(open_action)
         
+        quick_open_action = QAction("باز کردن سریع...", self)
+        quick_open_action.setShortcut("Ctrl+P")
+        quick_open_action.triggered.connect(self.show_quick_open)
+        file_menu.addAction(quick_open_action)
+        
         open_folder_action = QAction("باز کردن پوشه...", self)
         open_folder_action.triggered.connect(self.open_folder_dialog)
         file_menu.addAction(open_folder_action)
@@ -1101,6 +7910,23 @@ class MainWindow(QMainWindow):
         replace_action.setShortcut("Ctrl+H")
         replace_action.triggered.connect(self.replace)
         edit_menu.addAction(replace_action)
+
+        find_in_files_action = QAction("جستجو در فایل‌ها", self)
+        find_in_files_action.setShortcut("Ctrl+Shift+F")
+        find_in_files_action.triggered.connect(self.show_find_in_files)
+        edit_menu.addAction(find_in_files_action)
+
+        edit_menu.addSeparator()
+
+        definition_action = QAction("رفتن به تعریف", self)
+        definition_action.setShortcut("F12")
+        definition_action.triggered.connect(self.goto_definition)
+        edit_menu.addAction(definition_action)
+
+        symbols_action = QAction("جستجوی نمادها", self)
+        symbols_action.setShortcut("Ctrl+T")
+        symbols_action.triggered.connect(self.show_symbol_search)
+        edit_menu.addAction(symbols_action)
         
         
         view_menu = menubar.addMenu("نمایش")
@@ -1114,6 +7940,11 @@ class MainWindow(QMainWindow):
         toggle_terminal_action.setShortcut("Ctrl+`")
         toggle_terminal_action.triggered.connect(self.toggle_terminal)
         view_menu.addAction(toggle_terminal_action)
+
+        toggle_outline_action = QAction("ساختار فایل", self)
+        toggle_outline_action.setShortcut("Ctrl+Shift+O")
+        toggle_outline_action.triggered.connect(self.toggle_outline)
+        view_menu.addAction(toggle_outline_action)
         
         view_menu.addSeparator()
         
@@ -1172,6 +8003,7 @@ class MainWindow(QMainWindow):
     def setup_shortcuts(self):
         
         QShortcut(QKeySequence("Ctrl+`"), self, self.toggle_terminal)
+        QShortcut(QKeySequence("Ctrl+Shift+`"), self, self.new_terminal)
         QShortcut(QKeySequence("Ctrl+B"), self, self.toggle_explorer)
         
     def show_splash(self):
@@ -1187,13 +8019,58 @@ class MainWindow(QMainWindow):
         splash.close()
         
     def get_current_editor(self):
-        return self.tabs.currentWidget()
+        widget = self.tabs.currentWidget()
+        return widget if isinstance(widget, PythonEditor) else None
+
+    def editors(self):
+        for i in range(self.tabs.count()):
+            widget = self.tabs.widget(i)
+            if isinstance(widget, PythonEditor):
+                yield i, widget
         
     def new_file(self):
         editor = PythonEditor()
+        self.add_editor_tab(editor)
+
+    def add_editor_tab(self, editor):
+        self.auto_saver.track(editor)
+        self.outline.track(editor)
+        self.live_diagnostics.track(editor)
+        editor.set_completion_engine(self.completion_engine)
         editor.cursorChanged.connect(self.update_status)
-        index = self.tabs.addTab(editor, "بدون نام")
+        editor.saveFinished.connect(self.on_save_finished)
+        editor.document().modificationChanged.connect(
+            lambda _modified, editor=editor: self.update_tab_title(editor))
+        index = self.tabs.addTab(editor, "")
+        self.update_tab_title(editor)
         self.tabs.setCurrentIndex(index)
+
+    def update_tab_title(self, editor):
+        index = self.tabs.indexOf(editor)
+        if index < 0:
+            return
+        title = os.path.basename(editor.file_path) if editor.file_path else "بدون نام"
+        if editor.document().isModified():
+            title += " ●"
+        self.tabs.setTabText(index, title)
+
+    def on_save_finished(self, path, ok, message, automatic=False):
+        editor = self.sender()
+        if isinstance(editor, PythonEditor):
+            self.update_tab_title(editor)
+        if ok:
+            self.status.showMessage(f"{os.path.basename(path)}: {message}", 3000)
+            # The file list fans the save out to the indexes and the Problems panel.
+            if self.file_list is not None and self.file_list.root == os.path.abspath(self.workspace_root()):
+                self.file_list.notify_changed([path])
+            else:
+                self.problems.recheck([path])
+        elif automatic:
+            # Background saves must not interrupt typing; the journal still holds the text.
+            self.status.showMessage(
+                f"ذخیره خودکار {os.path.basename(path)} ناموفق بود: {message}", 10000)
+        else:
+            QMessageBox.critical(self, "خطا", f"خطا در ذخیره فایل: {message}")
         
     def open_file_dialog(self):
         path, _ = QFileDialog.getOpenFileName(
@@ -1210,25 +8087,101 @@ class MainWindow(QMainWindow):
                 self.tabs.setCurrentIndex(i)
                 return
                 
+        threshold = self.settings.value("viewer_threshold_mb", 64, type=int) << 20
+        try:
+            size = os.path.getsize(path)
+        except OSError as e:
+            QMessageBox.critical(self, "خطا", f"خطا در باز کردن فایل: {str(e)}")
+            return
+        if size > threshold:
+            try:
+                viewer = LargeFileViewer(path)
+            except (OSError, ValueError) as e:
+                QMessageBox.critical(self, "خطا", f"خطا در باز کردن فایل: {str(e)}")
+                return
+            self.tabs.addTab(viewer, f"🔒 {os.path.basename(path)}")
+            self.tabs.setCurrentIndex(self.tabs.count() - 1)
+            self.remember_recent(path)
+            return
+                
         editor = PythonEditor()
         if editor.load_file(path):
-            editor.cursorChanged.connect(self.update_status)
-            self.tabs.addTab(editor, os.path.basename(path))
-            self.tabs.setCurrentIndex(self.tabs.count() - 1)
-            self.explorer.set_root(os.path.dirname(path))
+            self.add_editor_tab(editor)
+            self.remember_recent(path)
+            # Keep the explorer (and its expanded folders) when the file already lives under it.
+            root = os.path.abspath(self.explorer.root_path())
+            if not os.path.abspath(path).startswith(os.path.join(root, '')):
+                self.explorer.set_root(os.path.dirname(path))
+            if self.project_index is not None:
+                self.file_list.notify_changed([path])
             
     def open_folder_dialog(self):
         path = QFileDialog.getExistingDirectory(self, "باز کردن پوشه")
         if path:
             self.explorer.set_root(path)
+            self.set_project_root(path)
+            self.settings.setValue("last_folder", path)
+
+    def set_project_root(self, path):
+        if self.project_index is not None:
+            if self.project_index.root == os.path.abspath(path):
+                return
+            self.project_index.stop()
+            self.project_index.deleteLater()
+            self.symbol_index.stop()
+            self.symbol_index.deleteLater()
+        self.start_file_list(path)
+        self.symbol_index = SymbolIndex(path, self, self.file_list.snapshot)
+        self.file_list.files_changed.connect(self.symbol_index.notify_changed)
+        self.completion_engine.set_symbol_index(self.symbol_index)
+        self.symbol_index.start()
+        self.project_index = TrigramIndex(path, self, self.file_list.snapshot)
+        self.file_list.files_changed.connect(self.project_index.notify_changed)
+        self.project_index.progress.connect(
+            lambda done, total: self.status.showMessage(f"ایندکس پروژه: {done}/{total}", 2000))
+        self.project_index.ready.connect(
+            lambda: self.status.showMessage("ایندکس پروژه آماده است", 3000))
+        self.project_index.start()
+
+    def workspace_root(self):
+        """The opened project folder; search and checks stay scoped to it whatever the explorer shows."""
+        if self.project_index is not None:
+            return self.project_index.root
+        return self.explorer.root_path()
+
+    def workspace_python_files(self, root):
+        if self.file_list is None or self.file_list.root != os.path.abspath(root):
+            return None
+        return self.file_list.python_files()
+
+    def start_file_list(self, path):
+        if self.file_list is not None:
+            self.file_list.stop()
+            self.file_list.deleteLater()
+        self.file_list = WorkspaceFileList(path, self)
+        self.file_list.files_changed.connect(self.problems.recheck)
+        self.file_list.start()
+
+    def show_quick_open(self):
+        root = os.path.abspath(self.workspace_root())
+        if self.file_list is None or (self.project_index is None and self.file_list.root != root):
+            self.start_file_list(root)
+        else:
+            self.file_list.rescan(force=False)
+        dialog = QuickOpenDialog(self.file_list, self.settings.value("recent_files", [], type=list), self)
+        dialog.open_file.connect(self.open_file)
+        dialog.exec()
+
+    def remember_recent(self, path):
+        path = os.path.abspath(path)
+        recent = [p for p in self.settings.value("recent_files", [], type=list) if p != path]
+        self.settings.setValue("recent_files", [path] + recent[:99])
             
     def save_file(self):
         editor = self.get_current_editor()
         if editor:
             if editor.file_path:
-                if editor.save_file():
-                    self.tabs.setTabText(self.tabs.currentIndex(), 
-                                        os.path.basename(editor.file_path))
+                editor.save_file()
             else:
                 self.save_file_as()
                 
@@ -1242,12 +8195,10 @@ class MainWindow(QMainWindow):
                 if not path.endswith('.py'):
                     path += '.py'
                 if editor.save_file(path):
-                    self.tabs.setTabText(self.tabs.currentIndex(), 
-                                        os.path.basename(path))
+                    self.update_tab_title(editor)
                     
     def save_all_files(self):
-        for i in range(self.tabs.count()):
-            editor = self.tabs.widget(i)
+        for i, editor in list(self.editors()):
             if editor.document().isModified():
                 if editor.file_path:
                     editor.save_file()
@@ -1255,13 +8206,9 @@ class MainWindow(QMainWindow):
                     self.tabs.setCurrentIndex(i)
                     self.save_file_as()
                     
-    def auto_save(self):
-        if self.settings.value("auto_save", True, type=bool):
-            self.save_all_files()
-                    
     def close_tab(self, index):
         editor = self.tabs.widget(index)
-        if editor.document().isModified():
+        if isinstance(editor, PythonEditor) and editor.document().isModified():
             reply = QMessageBox.question(
                 self, "ذخیره فایل",
                 f"فایل ذخیره نشده است. ذخیره شود؟",
@@ -1277,8 +8224,19 @@ class MainWindow(QMainWindow):
                 else:
                     self.tabs.setCurrentIndex(index)
                     self.save_file_as()
+                failed = editor.flush_saves()
+                if failed or editor.document().isModified():
+                    if failed:
+                        QMessageBox.critical(self, "خطا", f"خطا در ذخیره فایل: {failed[0].error}")
+                    return
                     
+        if isinstance(editor, PythonEditor):
+            self.auto_saver.untrack(editor)
+            self.outline.untrack(editor)
+            self.live_diagnostics.untrack(editor)
+        editor.dispose()
         self.tabs.removeTab(index)
+        editor.deleteLater()
         
     def close_current_tab(self):
         self.close_tab(self.tabs.currentIndex())
@@ -1287,13 +8245,69 @@ class MainWindow(QMainWindow):
         editor = self.get_current_editor()
         if editor and editor.file_path:
             self.output.append(f"در حال اجرای {os.path.basename(editor.file_path)}...")
-            self.terminal.run_python(os.path.basename(editor.file_path))
+            self.terminal.run_python(editor.file_path)
             self.bottom_panel.setCurrentIndex(1)  
         else:
             QMessageBox.warning(self, "خطا", "لطفاً فایل را ذخیره کنید")
             
+    def configure_warm_pool(self):
+        enabled = self.settings.value("warm_pool", False, type=bool) and WarmInterpreterPool.supported
+        preload = WarmInterpreterPool.parse_preload(self.settings.value("warm_preload", "", type=str))
+        if not enabled:
+            if self.warm_pool is not None:
+                self.warm_pool.shutdown()
+            self.warm_pool = None
+        elif self.warm_pool is None:
+            self.warm_pool = WarmInterpreterPool(preload)
+        else:
+            self.warm_pool.set_preload(preload)
+        if self.warm_pool is not None:
+            self.warm_pool.is_ready()
+        self.terminal.set_warm_pool(self.warm_pool)
+
+    def profile_file(self):
+        editor = self.get_current_editor()
+        if not editor or not editor.file_path:
+            QMessageBox.warning(self, "خطا", "لطفاً فایل را ذخیره کنید")
+            return
+        run = ProfileRun()
+        job = self.terminal.run_python(editor.file_path, run)
+        if job is not None:
+            self.output.append(f"در حال پروفایل {os.path.basename(editor.file_path)} با {run.kind}...")
+            self.profiler.track(run, job)
+            self.bottom_panel.setCurrentWidget(self.terminal)
+
+    def memory_trace_file(self):
+        editor = self.get_current_editor()
+        if not editor or not editor.file_path:
+            QMessageBox.warning(self, "خطا", "لطفاً فایل را ذخیره کنید")
+            return
+        run = MemoryTraceRun()
+        job = self.terminal.run_python(editor.file_path, run)
+        if job is not None:
+            self.output.append(f"در حال ردیابی حافظه {os.path.basename(editor.file_path)}...")
+            self.memory.track(run, job)
+            self.bottom_panel.setCurrentWidget(self.memory)
+
+    def set_memory_annotations(self, annotations):
+        self.memory_annotations = {os.path.normcase(os.path.abspath(path)): lines
+                                   for path, lines in annotations.items()}
+        for _, editor in self.editors():
+            self.apply_memory_annotations(editor)
+
+    def apply_memory_annotations(self, editor):
+        if editor is None:
+            return
+        path = os.path.normcase(os.path.abspath(editor.file_path)) if editor.file_path else None
+        editor.set_gutter_annotations(self.memory_annotations.get(path, {}))
+
     def stop_execution(self):
-        self.output.append("⏹️ توقف اجرا")
+        jobs = len(self.process_manager.running) + len(self.process_manager.pending)
+        self.process_manager.stop_all()
+        self.output.append(f"⏹️ توقف اجرا ({jobs} فرایند)" if jobs else "⏹️ فرایندی در حال اجرا نیست")
+
+    def on_job_finished(self, job):
+        self.output.append(job.report(), 'stderr' if job.error or job.exit_code else 'info')
         
     def toggle_terminal(self):
         if self.bottom_panel.isVisible():
@@ -1301,6 +8315,14 @@ class MainWindow(QMainWindow):
         else:
             self.bottom_panel.show()
             
+    def new_terminal(self):
+        self.bottom_panel.show()
+        self.bottom_panel.setCurrentWidget(self.terminal)
+        self.terminal.new_terminal()
+
+    def toggle_outline(self):
+        self.outline.setVisible(not self.outline.isVisible())
+
     def toggle_explorer(self):
         if self.explorer.isVisible():
             self.explorer.hide()
@@ -1338,12 +8360,111 @@ class MainWindow(QMainWindow):
     def find(self):
         editor = self.get_current_editor()
         if editor:
-            QMessageBox.information(self, "جستجو", "این قابلیت در حال توسعه است")
+            self.find_bar.open(editor, replace=False)
             
     def replace(self):
         editor = self.get_current_editor()
         if editor:
-            QMessageBox.information(self, "جایگزینی", "این قابلیت در حال توسعه است")
+            self.find_bar.open(editor, replace=True)
+
+    def show_find_in_files(self):
+        editor = self.get_current_editor()
+        selected = editor.textCursor().selectedText() if editor else ""
+        self.bottom_panel.show()
+        self.bottom_panel.setCurrentWidget(self.find_in_files)
+        self.find_in_files.focus_query(selected if '\u2029' not in selected else None)
+
+    def open_location(self, path, line, column=0):
+        self.open_file(path)
+        editor = self.get_current_editor()
+        if editor is not None and editor.file_path == path:
+            editor.goto_line(line, column)
+            editor.setFocus()
+
+    def word_under_cursor(self, editor):
+        cursor = editor.textCursor()
+        block = cursor.block().text()
+        column = cursor.positionInBlock()
+        for match in re.finditer(r'[A-Za-z_]\w*', block):
+            if match.start() <= column <= match.end():
+                return match.group()
+        return ''
+
+    def goto_definition(self):
+        editor = self.get_current_editor()
+        if editor is None:
+            return
+        name = self.word_under_cursor(editor)
+        if not name:
+            return
+        line = editor.textCursor().blockNumber() + 1
+        local = [s for s in symbols_from_source(editor.toPlainText()) if s.name == name]
+        definitions = [s for s in local if s.kind != 'import' and s.line != line]
+        if definitions:
+            target = min(definitions, key=lambda s: (s.line > line, abs(s.line - line)))
+            editor.goto_line(target.line, target.col)
+            return
+        index = self.symbol_index
+        if index is None:
+            self.status.showMessage(f"تعریفی برای «{name}» یافت نشد (پوشه‌ای باز نشده است)", 3000)
+            return
+        for symbol in local:
+            if symbol.kind == 'import' and self.goto_import(index, editor.file_path, symbol):
+                return
+        entries = index.lookup(name)
+        if len(entries) == 1:
+            path, symbol = entries[0]
+            self.open_location(path, symbol.line, symbol.col)
+        elif entries:
+            self.show_symbol_search(name, entries)
+        else:
+            self.status.showMessage(f"تعریفی برای «{name}» یافت نشد", 3000)
+
+    def goto_import(self, index, from_path, symbol):
+        module, _, attribute = symbol.detail.partition(':')
+        path = index.module_path(module, from_path)
+        if attribute:
+            if path is not None:
+                symbols = index.symbols_in(path) or parse_symbols(path)[3] or []
+                for candidate in symbols:
+                    if candidate.name == attribute and candidate.kind != 'import' \
+                            and not candidate.container:
+                        self.open_location(path, candidate.line, candidate.col)
+                        return True
+            submodule = f"{module}.{attribute}" if module.strip('.') else module + attribute
+            path = index.module_path(submodule, from_path)
+        if path is None:
+            return False
+        self.open_location(path, 1, 0)
+        return True
+
+    def show_symbol_search(self, query=None, entries=None):
+        if self.symbol_index is None:
+            self.status.showMessage("برای جستجوی نمادها ابتدا یک پوشه باز کنید", 3000)
+            return
+        dialog = SymbolSearchDialog(self.symbol_index, self)
+        dialog.open_location.connect(self.open_location)
+        if entries is not None:
+            dialog.query_input.setText(query)
+            dialog.show_entries(entries)
+        elif query:
+            dialog.set_query(query)
+        else:
+            editor = self.get_current_editor()
+            if editor is not None:
+                dialog.set_query(self.word_under_cursor(editor))
+        dialog.exec()
+
+    def on_tab_changed(self, index):
+        self.apply_memory_annotations(self.get_current_editor())
+        self.outline.set_editor(self.get_current_editor())
+        self.live_diagnostics.set_editor(self.get_current_editor())
+        if self.find_bar.isVisible():
+            editor = self.get_current_editor()
+            if editor is None:
+                self.find_bar.close_bar()
+            else:
+                self.find_bar.set_editor(editor)
             
     def zoom_in(self):
         editor = self.get_current_editor()
@@ -1372,8 +8493,28 @@ class MainWindow(QMainWindow):
                 editor.setFont(font)
                 
          
-            interval = self.settings.value("auto_interval", 30, type=int)
-            self.auto_save_timer.setInterval(interval * 1000)
+            self.auto_saver.set_delay(self.settings.value("auto_save_delay", 2, type=int) * 1000)
+            self.auto_saver.save_to_disk = self.settings.value("auto_save", True, type=bool)
+
+            slice_ms = self.settings.value("highlight_slice_ms", 8, type=int)
+            for _, editor in self.editors():
+                editor.highlight_scheduler.set_slice_ms(slice_ms)
+
+            self.process_manager.configure(self.settings.value("max_jobs", 4, type=int),
+                                           self.settings.value("job_timeout", 0, type=int))
+
+            self.configure_warm_pool()
+
+            for view in [self.output.output] + [t.output for t in self.terminal.terminals()]:
+                view.configure(self.settings.value("output_max_lines", 10000, type=int),
+                               self.settings.value("output_spill", False, type=bool))
+
+            theme_name = 'dark' if self.settings.value("dark_theme", True, type=bool) else 'light'
+            if ThemeManager.set_theme(theme_name):
+                self.theme_manager = ThemeManager()
+                self.theme_manager.apply_theme(QApplication.instance())
+                for i in range(self.tabs.count()):
+                    self.tabs.widget(i).apply_theme()
                 
     def show_about(self):
         QMessageBox.about(
@@ -1398,8 +8539,8 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
      
         modified = False
-        for i in range(self.tabs.count()):
-            editor = self.tabs.widget(i)
+        for _, editor in self.editors():
+            editor.flush_saves()
             if editor.document().isModified():
                 modified = True
                 break
@@ -1414,12 +8555,196 @@ class MainWindow(QMainWindow):
                 event.ignore()
                 return
                 
+        FileSaveWorker.wait_all()
+        self.journal.close()
+        self.outline.shutdown()
+        self.live_diagnostics.shutdown()
+        self.problems.shutdown()
+        self.output.output.dispose()
+        self.terminal.shutdown()
+        self.process_manager.stop_all()
+        self.explorer.model.shutdown()
+        if self.file_list is not None:
+            self.file_list.stop()
+        if self.warm_pool is not None:
+            self.warm_pool.shutdown()
+        if self.project_index is not None:
+            self.project_index.stop()
+            self.symbol_index.stop()
         event.accept()
 
+    def offer_recovery(self):
+        sessions = self.journal.orphaned_sessions()
+        entries = []
+        for directory in sessions:
+            entries.extend(self.journal.load_entries(directory))
+        if entries:
+            names = "\n".join(f"• {entry['title']}" for entry in entries)
+            reply = QMessageBox.question(
+                self, "بازیابی",
+                f"برنامه به‌طور ناگهانی بسته شده بود. این فایل‌ها بازیابی شوند؟\n\n{names}",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+            )
+            if reply == QMessageBox.StandardButton.Yes:
+                for entry in entries:
+                    self.restore_entry(entry)
+        for directory in sessions:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def restore_entry(self, entry):
+        editor = PythonEditor()
+        editor.set_text_progressive(entry['text'])
+        editor.file_path = entry.get('path')
+        editor.recovered = True
+        self.add_editor_tab(editor)
+        editor.document().setModified(True)
+        # Re-journals the text under this session; recovered buffers never auto-save to disk.
+        self.auto_saver.touch(editor)
+        self.status.showMessage(
+            "متن بازیابی شد؛ برای نوشتن روی فایل آن را صریحاً ذخیره کنید (Ctrl+S)", 10000)
+
+
+
+def benchmark_highlighters(path=None, min_lines=20000, repeat=3):
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            text = f.read()
+    else:
+        with open(os.path.abspath(__file__), 'r', encoding='utf-8') as f:
+            text = f.read()
+    lines = text.split('\n')
+    while len(lines) < min_lines:
+        lines = lines + lines
+    text = '\n'.join(lines)
+
+    results = []
+    for highlighter_class in (RuleListHighlighter, PythonHighlighter):
+        document = QTextDocument()
+        document.setPlainText(text)
+        highlighter = highlighter_class(document)
+        best = None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            highlighter.rehighlight()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        blocks = document.blockCount()
+        results.append((highlighter_class.__name__, blocks, best, blocks / best))
+    return results
+
+
+def benchmark_gutter(lines=20000, steps=400):
+    editor = PythonEditor()
+    editor.resize(900, 700)
+    editor.set_text_progressive('\n'.join(f"value_{n} = {n}" for n in range(lines)))
+    editor.show()
+    QApplication.processEvents()
+
+    scrollbar = editor.verticalScrollBar()
+    step = max(1, scrollbar.maximum() // steps)
+    timings = []
+    for n in range(steps):
+        scrollbar.setValue(min(scrollbar.maximum(), n * step))
+        start = time.perf_counter()
+        editor.line_number_area.repaint()
+        timings.append(time.perf_counter() - start)
+    editor.dispose()
+    timings.sort()
+    mean = sum(timings) / len(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    return len(timings), mean, p95
+
+
+def benchmark_find(lines=300000, lines_per_file=250, queries=None):
+    """Find in Files over a generated workspace, with and without the trigram index."""
+    queries = queries or [('needle_marker', False), ('token_4242', False),
+                          (r'func_1\d+_8\b', True), ('return value * 249', False)]
+    workspace = tempfile.mkdtemp(prefix='zenthflow-bench-')
+    store = tempfile.mkdtemp(prefix='zenthflow-bench-index-')
+    index = None
+    try:
+        for n in range(lines // lines_per_file):
+            directory = os.path.join(workspace, f'pkg{n % 32}')
+            os.makedirs(directory, exist_ok=True)
+            body = [f"def func_{n}_{i}(value):  # token_{(n * lines_per_file + i) % 9973}"
+                    if i % 2 == 0 else f"    return value * {i}" for i in range(lines_per_file)]
+            if n % 400 == 7:
+                body[lines_per_file // 2] = "needle_marker = True"
+            with open(os.path.join(directory, f'mod{n}.py'), 'w', encoding='utf-8') as f:
+                f.write('\n'.join(body) + '\n')
+
+        index = TrigramIndex(workspace)
+        index.db_path = os.path.join(store, 'index.sqlite')
+        started = time.perf_counter()
+        index.start()
+        while not index.is_ready:
+            QApplication.processEvents()
+            time.sleep(0.01)
+        build = time.perf_counter() - started
+        ignore = WorkspaceIgnore(workspace)
+
+        def run(pattern, files):
+            search = FindInFilesSearch()
+            started = time.perf_counter()
+            search.start(ignore, pattern, None, files)
+            matches = 0
+            while True:
+                path, found = search.results.get()
+                if path is None:
+                    break
+                matches += len(found)
+            return time.perf_counter() - started, matches
+
+        results = []
+        for query, regex in queries:
+            pattern = build_search_pattern(query, regex)
+            candidates = index.candidates(query, regex, workspace)
+            indexed, matches = run(pattern, (lambda: index.candidates(query, regex, workspace))
+                                   if candidates is not None else None)
+            full, full_matches = run(pattern, None)
+            assert matches == full_matches, (query, matches, full_matches)
+            results.append((query, None if candidates is None else len(candidates),
+                            index.last_query_ms, indexed, full, matches))
+        return build, results
+    finally:
+        if index is not None:
+            index.stop()
+        shutil.rmtree(workspace, ignore_errors=True)
+        shutil.rmtree(store, ignore_errors=True)
 
 
 def main():
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(prog="zenthflow")
+    parser.add_argument("--benchmark", choices=["highlight", "gutter", "find"],
+                        help="run a micro-benchmark and exit")
+    parser.add_argument("--bench-file", help="source file used by --benchmark")
+    parser.add_argument("--check", metavar="DIR",
+                        help="analyse every .py file under DIR without starting the GUI")
+    args, qt_args = parser.parse_known_args()
+
+    if args.check:
+        sys.exit(run_check(args.check))
+
+    if args.benchmark:
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+        app = QApplication(sys.argv[:1] + qt_args)
+        if args.benchmark == "highlight":
+            for name, blocks, elapsed, rate in benchmark_highlighters(args.bench_file):
+                print(f"{name:24} {blocks} blocks  {elapsed * 1000:9.1f} ms  {rate:12.0f} blocks/s")
+        elif args.benchmark == "gutter":
+            steps, mean, p95 = benchmark_gutter()
+            print(f"gutter paint: {steps} scroll steps  mean {mean * 1000:.3f} ms  p95 {p95 * 1000:.3f} ms")
+        elif args.benchmark == "find":
+            build, results = benchmark_find()
+            print(f"trigram index build: {build:.2f} s")
+            for query, candidates, lookup_ms, indexed, full, matches in results:
+                narrowed = "not narrowed" if candidates is None else f"{candidates} candidates"
+                lookup = "" if lookup_ms is None else f" (lookup {lookup_ms:.1f} ms)"
+                print(f"{query!r:18} {matches:6} matches  {narrowed:18}  indexed {indexed * 1000:8.1f} ms"
+                      f"{lookup}  full scan {full * 1000:8.1f} ms")
+        return
+
+    app = QApplication(sys.argv[:1] + qt_args)
     
   
     font = QFont("Courier New", 10)